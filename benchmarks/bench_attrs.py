@@ -0,0 +1,56 @@
+'''Times __eq__ and copy() on a 20-attribute Base class.
+
+The "uncached" case gives the object its own _groups, which bypasses the
+per-class attribute cache of BaseType.
+
+Usage: python benchmarks/bench_attrs.py [--number=N] [--repeat=R]
+'''
+
+from copy import copy
+from benchutil import compare, arg
+from syn.base.b import Base, Attr
+
+#-------------------------------------------------------------------------------
+# Classes
+
+N_ATTRS = 20
+
+
+class Wide(Base):
+    _attrs = {'a{:02}'.format(k): Attr(int, group='eq_exclude' if k % 5 == 0
+                                       else None)
+              for k in range(N_ATTRS)}
+
+
+def make():
+    return Wide(**{attr: k for k, attr in enumerate(sorted(Wide._attrs))})
+
+
+#-------------------------------------------------------------------------------
+# Main
+
+
+def main():
+    number = arg('number', 10000)
+    repeat = arg('repeat', 5)
+
+    a, b = make(), make()
+    c, d = make(), make()
+    for obj in (c, d):
+        obj._groups = copy(Wide._groups)
+
+    print('__eq__:')
+    compare([('uncached', lambda: c == d),
+             ('cached', lambda: a == b)],
+            number=number, repeat=repeat, baseline='uncached')
+    print('')
+
+    print('copy:')
+    compare([('uncached', c.copy),
+             ('cached', a.copy)],
+            number=number, repeat=repeat, baseline='uncached')
+
+if __name__ == '__main__':
+    main()
+
+#-------------------------------------------------------------------------------
@@ -0,0 +1,55 @@
+'''Compares the size and speed of the binary codec in syn.serialize with
+pickling the output of syn.types.serialize.
+
+Usage: python benchmarks/bench_codec.py [--number=N] [--repeat=R] [--records=M]
+'''
+
+import pickle
+from benchutil import compare, arg
+from syn.types import serialize, deserialize
+from syn.serialize import dumps, loads
+from syn.base.b import Base, Attr
+
+#-------------------------------------------------------------------------------
+# Classes
+
+
+class Record(Base):
+    _attrs = dict(id = Attr(int),
+                  name = Attr(str),
+                  tags = Attr(list))
+
+
+#-------------------------------------------------------------------------------
+# Main
+
+
+def main():
+    number = arg('number', 10)
+    repeat = arg('repeat', 3)
+    records = arg('records', 1000)
+
+    data = [Record(id=k, name='rec{}'.format(k), tags=[k, 2.5 * k])
+            for k in range(records)]
+    pickled = pickle.dumps(serialize(data), 2)
+    encoded = dumps(data)
+    print('size ({} records):'.format(records))
+    print('pickle(serialize)  {:>9} bytes'.format(len(pickled)))
+    print('dumps              {:>9} bytes  ({:.2f}x smaller)'
+          .format(len(encoded), len(pickled) / float(len(encoded))))
+
+    print('\nencode:')
+    compare([('pickle(serialize)', lambda: pickle.dumps(serialize(data), 2)),
+             ('dumps', lambda: dumps(data))],
+            number=number, repeat=repeat, baseline='pickle(serialize)')
+
+    print('\ndecode:')
+    compare([('deserialize(unpickle)',
+              lambda: deserialize(pickle.loads(pickled))),
+             ('loads', lambda: loads(encoded))],
+            number=number, repeat=repeat, baseline='deserialize(unpickle)')
+
+if __name__ == '__main__':
+    main()
+
+#-------------------------------------------------------------------------------
@@ -0,0 +1,43 @@
+'''Compares coercing records one at a time and with Base.coerce_many().
+
+Usage: python benchmarks/bench_coerce.py [--number=N] [--repeat=R] [--rows=M]
+'''
+
+from benchutil import compare, arg
+from syn.base.b import Base, Attr
+
+#-------------------------------------------------------------------------------
+# Classes
+
+
+class Record(Base):
+    _attrs = dict(a = Attr(int),
+                  b = Attr(float),
+                  c = Attr(str),
+                  d = Attr(int, optional=True))
+
+
+def rows(n):
+    return [dict(a=str(k), b=k, c='abc', d=k) for k in range(n)]
+
+
+#-------------------------------------------------------------------------------
+# Main
+
+
+def main():
+    number = arg('number', 10)
+    repeat = arg('repeat', 5)
+    data = rows(arg('rows', 10000))
+
+    print('coerce {} rows:'.format(len(data)))
+    compare([('coerce', lambda: [Record.coerce(row) for row in data]),
+             ('coerce_many', lambda: Record.coerce_many(data)),
+             ('coerce_many (lazy)', 
+              lambda: list(Record.coerce_many(data, lazy=True)))],
+            number=number, repeat=repeat, baseline='coerce')
+
+if __name__ == '__main__':
+    main()
+
+#-------------------------------------------------------------------------------
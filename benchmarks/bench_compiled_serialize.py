@@ -0,0 +1,54 @@
+'''Compares compiled and generic serialization of Base objects.
+
+Usage: python benchmarks/bench_compiled_serialize.py [--number=N] [--repeat=R]
+'''
+
+from benchutil import compare, arg
+from syn.five import STR
+from syn.types import serialize, deserialize
+from syn.base.b import Base, Attr
+
+#-------------------------------------------------------------------------------
+# Classes
+
+
+class Record(Base):
+    _attrs = dict(a = Attr(int),
+                  b = Attr(float),
+                  c = Attr(STR),
+                  d = Attr(bool),
+                  e = Attr(None),
+                  f = Attr(list))
+
+class RecordGeneric(Record):
+    _opts = dict(compile_serialize = False)
+
+
+#-------------------------------------------------------------------------------
+# Main
+
+
+def main():
+    number = arg('number', 20000)
+    repeat = arg('repeat', 5)
+
+    kwargs = dict(a=1, b=2.0, c=u'abc', d=True, e=None, f=[1, 2])
+    obj = Record(**kwargs)
+    gen = RecordGeneric(**kwargs)
+    ser = serialize(obj)
+    sgen = serialize(gen)
+
+    print('serialize:')
+    compare([('generic', lambda: serialize(gen)),
+             ('compiled', lambda: serialize(obj))],
+            number=number, repeat=repeat, baseline='generic')
+
+    print('\ndeserialize:')
+    compare([('generic', lambda: deserialize(sgen)),
+             ('compiled', lambda: deserialize(ser))],
+            number=number, repeat=repeat, baseline='generic')
+
+if __name__ == '__main__':
+    main()
+
+#-------------------------------------------------------------------------------
@@ -0,0 +1,57 @@
+'''Compares generic and fast copies of Node objects and trees.
+
+Usage: python benchmarks/bench_copy.py [--number=N] [--repeat=R] [--nodes=M]
+'''
+
+from copy import deepcopy
+from benchutil import compare, arg
+from syn.tree.b import Node
+
+#-------------------------------------------------------------------------------
+# Classes
+
+
+class FastNode(Node):
+    pass
+
+class GenericNode(Node):
+    _opts = dict(fast_copy = False)
+    __deepcopy__ = None # Fall back to __reduce_ex__
+
+
+def build(cls, nodes, branching=4):
+    level = [cls() for k in range(nodes - nodes // branching)]
+    while len(level) > 1:
+        level = [cls(*level[k:k + branching])
+                 for k in range(0, len(level), branching)]
+    return level[0]
+
+
+#-------------------------------------------------------------------------------
+# Main
+
+
+def main():
+    number = arg('number', 10000)
+    repeat = arg('repeat', 5)
+    nodes = arg('nodes', 1000)
+
+    fast = FastNode(*[FastNode() for k in range(5)])
+    gen = GenericNode(*[GenericNode() for k in range(5)])
+    print('copy:')
+    compare([('generic', gen.copy),
+             ('fast', fast.copy)],
+            number=number, repeat=repeat, baseline='generic')
+    print('')
+
+    fast = build(FastNode, nodes)
+    gen = build(GenericNode, nodes)
+    print('deepcopy ({} nodes):'.format(fast._node_count))
+    compare([('generic', lambda: deepcopy(gen)),
+             ('iterative', lambda: deepcopy(fast))],
+            number=max(number // nodes, 1), repeat=repeat, baseline='generic')
+
+if __name__ == '__main__':
+    main()
+
+#-------------------------------------------------------------------------------
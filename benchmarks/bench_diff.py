@@ -0,0 +1,38 @@
+'''Times diff() on a large tree with a few differences, compared with a
+single full deep_comp() pass over equal trees.  Finding every
+difference with deep_comp() or find_ne() takes one such pass per
+difference.
+
+Usage: python benchmarks/bench_diff.py [--number=N] [--repeat=R] [--size=M]
+'''
+
+from copy import deepcopy
+from benchutil import compare, arg
+from syn.types import diff, deep_comp
+
+#-------------------------------------------------------------------------------
+# Main
+
+
+def main():
+    number = arg('number', 3)
+    repeat = arg('repeat', 3)
+    size = arg('size', 1000)
+
+    A = [dict(id=k, values=[k, k + 1.5], tags=dict(a=str(k)))
+         for k in range(size)]
+    C = deepcopy(A)
+    B = deepcopy(A)
+    for k in range(0, size, size // 10):
+        B[k]['values'][1] += 1
+    del B[size // 2]
+
+    print('{} differences in {} records'.format(len(list(diff(A, B))), size))
+    compare([('deep_comp', lambda: deep_comp(A, C)),
+             ('diff', lambda: list(diff(A, B)))],
+            number=number, repeat=repeat, baseline='deep_comp')
+
+if __name__ == '__main__':
+    main()
+
+#-------------------------------------------------------------------------------
@@ -0,0 +1,42 @@
+'''Compares Type.type_dispatch for unregistered types with a scan of the
+registry (the previous fallback).
+
+Usage: python benchmarks/bench_dispatch.py [--number=N] [--repeat=R]
+'''
+
+from collections import OrderedDict
+from benchutil import compare, arg
+from syn.base_utils import nearest_base
+from syn.types import Type, TYPE_REGISTRY, DISPATCH_CACHE
+
+#-------------------------------------------------------------------------------
+# Classes
+
+
+class MyDict(OrderedDict):
+    pass
+
+
+def scan(typ):
+    return TYPE_REGISTRY[nearest_base(typ, TYPE_REGISTRY.keys())]
+
+
+#-------------------------------------------------------------------------------
+# Main
+
+
+def main():
+    number = arg('number', 100000)
+    repeat = arg('repeat', 5)
+
+    print('type_dispatch ({} registered types):'.format(len(TYPE_REGISTRY)))
+    compare([('registry scan', lambda: scan(MyDict)),
+             ('cached', lambda: Type.type_dispatch(MyDict)),
+             ('registered', lambda: Type.type_dispatch(dict))],
+            number=number, repeat=repeat, baseline='registry scan')
+    print(DISPATCH_CACHE.stats())
+
+if __name__ == '__main__':
+    main()
+
+#-------------------------------------------------------------------------------
@@ -0,0 +1,55 @@
+'''Times Mapping._find_ne() on large dicts whose keys or values differ, compared
+with the previous implementation, which checked key membership one key
+at a time and rebuilt the key sets for KeyDifferences.
+
+Usage: python benchmarks/bench_find_ne_mapping.py [--number=N] [--repeat=R] [--size=M]
+'''
+
+from benchutil import compare, arg
+from syn.types import Dict, KeyDifferences, DiffersAtKey
+
+#-------------------------------------------------------------------------------
+# Utilities
+
+
+def old_find_ne(A, B, func):
+    for key, value in A.items():
+        if key not in B:
+            a = set(A.keys())
+            b = set(B.keys())
+            return KeyDifferences(A, B, a.difference(b).union(b.difference(a)))
+        if not func(value, B[key]):
+            return DiffersAtKey(A, B, key)
+    return KeyDifferences(A, B)
+
+def equal(a, b):
+    return a == b
+
+#-------------------------------------------------------------------------------
+# Main
+
+
+def main():
+    number = arg('number', 3)
+    repeat = arg('repeat', 3)
+    size = arg('size', 1000000)
+
+    A = {k: k for k in range(size)}
+    B = dict(A)
+    B[size - 1] = None
+    C = dict(A)
+    del C[size - 1]
+    C[-1] = size
+    D = dict(A)
+    D[-1] = size
+
+    for name, other in (('values', B), ('keys', C), ('lengths', D)):
+        print('{} differ:'.format(name))
+        compare([('old', lambda: old_find_ne(A, other, equal)),
+                 ('_find_ne', lambda: Dict(A)._find_ne(other, equal))],
+                number=number, repeat=repeat, baseline='old')
+
+if __name__ == '__main__':
+    main()
+
+#-------------------------------------------------------------------------------
@@ -0,0 +1,45 @@
+'''Compares tuple-based, streaming, and cached hashing of Base objects.
+
+Usage: python benchmarks/bench_hash.py [--number=N] [--repeat=R]
+'''
+
+from benchutil import compare, arg
+from syn.base.b import Base, Attr
+
+#-------------------------------------------------------------------------------
+# Classes
+
+
+class Streamed(Base):
+    _opts = dict(make_hashable = True)
+    _attrs = dict(args = Attr(tuple),
+                  name = Attr(str),
+                  weights = Attr(list),
+                  limit = Attr(int))
+
+class Cached(Streamed):
+    _opts = dict(cache_hash = True)
+
+
+#-------------------------------------------------------------------------------
+# Main
+
+
+def main():
+    number = arg('number', 20000)
+    repeat = arg('repeat', 5)
+
+    kwargs = dict(args=('a', 'b', 'c'), name='c1', weights=[1, 2, 3, 4],
+                  limit=10)
+    s = Streamed(**kwargs)
+    c = Cached(**kwargs)
+
+    compare([('tuple', lambda: hash(s._hashable())),
+             ('streaming', lambda: hash(s)),
+             ('cached', lambda: hash(c))],
+            number=number, repeat=repeat, baseline='tuple')
+
+if __name__ == '__main__':
+    main()
+
+#-------------------------------------------------------------------------------
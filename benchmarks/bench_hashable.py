@@ -0,0 +1,47 @@
+'''Times hashable() on nested containers with shared values, and on
+generic objects compared with hashing their serialization (the previous
+fallback).
+
+Usage: python benchmarks/bench_hashable.py [--number=N] [--repeat=R]
+'''
+
+from benchutil import compare, arg
+from syn.types import hashable, serialize
+
+#-------------------------------------------------------------------------------
+# Classes
+
+
+class Plain(object):
+    __hash__ = None
+
+    def __init__(self, a, b):
+        self.a = a
+        self.b = b
+
+
+#-------------------------------------------------------------------------------
+# Main
+
+
+def main():
+    number = arg('number', 200)
+    repeat = arg('repeat', 5)
+
+    shared = [list(range(100)) for k in range(10)]
+    nested = [dict(a=shared, b=[shared, shared]) for k in range(10)]
+    plain = [Plain(k, [k, dict(c=k)]) for k in range(100)]
+
+    print('nested containers with shared values:')
+    compare([('hashable', lambda: hashable(nested))],
+            number=number, repeat=repeat)
+
+    print('\ngeneric objects:')
+    compare([('hashable(serialize)', lambda: hashable(serialize(plain))),
+             ('hashable', lambda: hashable(plain))],
+            number=number, repeat=repeat, baseline='hashable(serialize)')
+
+if __name__ == '__main__':
+    main()
+
+#-------------------------------------------------------------------------------
@@ -0,0 +1,91 @@
+'''Measures the import time of the syn subpackages, and checks it against
+the budget in import_budget.yml.
+
+Each module is imported in a fresh interpreter.  Where supported (Python
+3.7+), the cumulative time reported by "python -X importtime" is used;
+otherwise the wall-clock time of the import statement is measured.
+
+Usage: python benchmarks/bench_import.py [--repeat=R] [--python=EXE]
+
+Exits with status 1 if any module exceeds its budget.
+'''
+
+import os
+import re
+import sys
+import yaml
+import subprocess
+from benchutil import arg, DIR
+
+ROOT = os.path.dirname(DIR)
+BUDGET = os.path.join(DIR, 'import_budget.yml')
+
+IMPORTTIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)\s*$')
+
+WALLCLOCK = '''
+import time
+t = time.time()
+import {0}
+print((time.time() - t) * 1e6)
+'''
+
+#-------------------------------------------------------------------------------
+# Measurement
+
+
+def supports_importtime(python):
+    cmd = [python, '-c',
+           'import sys; print(sys.version_info >= (3, 7))']
+    return subprocess.check_output(cmd).decode().strip() == 'True'
+
+
+def import_time(python, module, importtime=True):
+    '''Returns the time (in microseconds) taken to import module in a
+    fresh interpreter.
+    '''
+    if importtime:
+        cmd = [python, '-X', 'importtime', '-c', 'import ' + module]
+        proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE)
+        _, err = proc.communicate()
+        for line in err.decode().splitlines():
+            m = IMPORTTIME.match(line)
+            if m and m.group(3) == module:
+                return int(m.group(2))
+        raise RuntimeError('No import time reported for ' + module)
+
+    cmd = [python, '-c', WALLCLOCK.format(module)]
+    out = subprocess.check_output(cmd, cwd=ROOT, stderr=subprocess.STDOUT)
+    return float(out.decode().split()[-1])
+
+
+#-------------------------------------------------------------------------------
+# Main
+
+
+def main():
+    repeat = arg('repeat', 3)
+    python = arg('python', sys.executable, str)
+    importtime = supports_importtime(python)
+
+    with open(BUDGET, 'r') as f:
+        budget = yaml.safe_load(f)
+
+    failed = []
+    width = max(len(mod) for mod in budget)
+    for mod in sorted(budget):
+        t = min(import_time(python, mod, importtime) for k in range(repeat))
+        t /= 1000.
+        ok = t <= budget[mod]
+        print('{:<{}}  {:>8.1f} ms  (budget {:>4} ms)  {}'
+              .format(mod, width, t, budget[mod], 'ok' if ok else 'OVER'))
+        if not ok:
+            failed.append(mod)
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
+
+#-------------------------------------------------------------------------------
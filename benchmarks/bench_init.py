@@ -0,0 +1,59 @@
+'''Compares compiled and generic Base.__init__.
+
+Usage: python benchmarks/bench_init.py [--number=N] [--repeat=R]
+'''
+
+from benchutil import compare, arg
+from syn.five import STR
+from syn.base.b import Base, Attr, init_hook
+
+#-------------------------------------------------------------------------------
+# Classes
+
+
+class Plain(Base):
+    _opts = dict(args = ('a', 'b'))
+    _attrs = dict(a = Attr(int),
+                  b = Attr(float, 1.0),
+                  c = Attr(STR, u''),
+                  d = Attr(list, init=lambda self: list()))
+
+class PlainGeneric(Plain):
+    _opts = dict(compile_init = False)
+
+
+class Full(Plain):
+    _opts = dict(coerce_args = True,
+                 optional_none = True,
+                 init_validate = True)
+    _attrs = dict(e = Attr(int, optional=True),
+                  f = Attr(int, call=lambda x=0: x))
+
+    @init_hook
+    def _count(self):
+        self.d.append(self.a)
+
+class FullGeneric(Full):
+    _opts = dict(compile_init = False)
+
+
+#-------------------------------------------------------------------------------
+# Main
+
+
+def main():
+    number = arg('number', 20000)
+    repeat = arg('repeat', 5)
+
+    for name, cls, gen in [('plain', Plain, PlainGeneric),
+                           ('full', Full, FullGeneric)]:
+        print('{}:'.format(name))
+        compare([('generic', lambda: gen(1, 2.0, c=u'x')),
+                 ('compiled', lambda: cls(1, 2.0, c=u'x'))],
+                number=number, repeat=repeat, baseline='generic')
+        print('')
+
+if __name__ == '__main__':
+    main()
+
+#-------------------------------------------------------------------------------
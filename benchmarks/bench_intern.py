@@ -0,0 +1,50 @@
+'''Times syn.type.a Type.dispatch() on repeated specs, which returns
+interned type objects, compared with building a new type object each
+time (the previous behavior).  Also declares a class with many
+attributes, which dispatches the type of each.
+
+Usage: python benchmarks/bench_intern.py [--number=N] [--repeat=R]
+'''
+
+from benchutil import compare, arg
+from syn.base.b import Base, Attr
+from syn.type.a import Type
+
+#-------------------------------------------------------------------------------
+# Utilities
+
+
+def declare():
+    class Record(Base):
+        _attrs = {'a{}'.format(k): Attr((int, float)) for k in range(20)}
+    return Record
+
+#-------------------------------------------------------------------------------
+# Main
+
+
+def main():
+    number = arg('number', 100000)
+    repeat = arg('repeat', 5)
+
+    for spec in (int, (int, float)):
+        print('dispatch({}):'.format(spec))
+        compare([('new', lambda: Type._dispatch(spec)),
+                 ('interned', lambda: Type.dispatch(spec))],
+                number=number, repeat=repeat, baseline='new')
+
+    # Type objects now hash by value, so caches keyed on them are shared
+    cache = {}
+    for k in range(1000):
+        cache.setdefault(Type.dispatch((int, float)), k)
+        cache.setdefault(Type._dispatch((int, float)), k)
+    print('distinct cache keys for 2000 equal specs: {}'.format(len(cache)))
+
+    print('class declaration:')
+    compare([('declare', declare)], number=max(number // 100, 1),
+            repeat=repeat)
+
+if __name__ == '__main__':
+    main()
+
+#-------------------------------------------------------------------------------
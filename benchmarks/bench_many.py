@@ -0,0 +1,41 @@
+'''Times query_many() on a column of values, compared with calling
+query() on each value.  If NumPy is importable, also times
+query_many() on the same column as an array.
+
+Usage: python benchmarks/bench_many.py [--number=N] [--repeat=R] [--size=M]
+'''
+
+from benchutil import compare, arg
+from syn.type.a import TypeType, ValuesType, MultiType
+
+#-------------------------------------------------------------------------------
+# Main
+
+
+def main():
+    number = arg('number', 10)
+    repeat = arg('repeat', 3)
+    size = arg('size', 100000)
+
+    values = [k % 100 for k in range(size)]
+    try:
+        import numpy
+        array = numpy.array(values)
+    except ImportError:
+        array = None
+
+    for name, typ in (('TypeType', TypeType(int)),
+                      ('ValuesType', ValuesType(list(range(100)))),
+                      ('MultiType', MultiType((int, float)))):
+        print('{}:'.format(name))
+        cases = [('query', lambda: [typ.query(value) for value in values]),
+                 ('query_many', lambda: typ.query_many(values))]
+        if array is not None:
+            cases.append(('query_many (array)',
+                          lambda: typ.query_many(array)))
+        compare(cases, number=number, repeat=repeat, baseline='query')
+
+if __name__ == '__main__':
+    main()
+
+#-------------------------------------------------------------------------------
@@ -0,0 +1,69 @@
+'''Times the creation of Base subclasses and the import of syn.python.
+
+Usage: python benchmarks/bench_meta.py [--number=N] [--repeat=R]
+'''
+
+import sys
+import subprocess
+from benchutil import compare, arg, DIR
+from syn.base.b import Base, Attr, init_hook
+
+#-------------------------------------------------------------------------------
+# Classes
+
+
+class Parent(Base):
+    '''A parent class.'''
+    _attrs = dict(a = Attr(int, doc='attr a'),
+                  b = Attr(float, 1.5, optional=True))
+    _opts = dict(args = ('a', 'b'))
+
+    @init_hook
+    def _hook(self):
+        pass
+
+
+def define():
+    class Child(Parent):
+        _attrs = dict(c = Attr(int, 0))
+    return Child
+
+
+def define_and_doc():
+    return define().__doc__
+
+
+IMPORT = '''
+import time
+t = time.time()
+import syn.python
+print(time.time() - t)
+'''
+
+def import_time():
+    out = subprocess.check_output([sys.executable, '-c', IMPORT],
+                                  cwd=DIR + '/..')
+    return float(out.decode().split()[-1])
+
+
+#-------------------------------------------------------------------------------
+# Main
+
+
+def main():
+    number = arg('number', 1000)
+    repeat = arg('repeat', 5)
+
+    print('class creation:')
+    compare([('define', define),
+             ('define + __doc__', define_and_doc)],
+            number=number, repeat=repeat, baseline='define + __doc__')
+    print('')
+
+    t = min(import_time() for k in range(repeat))
+    print('import syn.python: {:.3f} s'.format(t))
+
+if __name__ == '__main__':
+    main()
+
+#-------------------------------------------------------------------------------
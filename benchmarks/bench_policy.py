@@ -0,0 +1,50 @@
+'''Times validate() on an object whose List attribute holds many Base
+objects, under each validation policy.
+
+Usage: python benchmarks/bench_policy.py [--number=N] [--repeat=R] [--size=M]
+'''
+
+from benchutil import compare, arg
+from syn.base.b import Base, Attr
+from syn.type.a import List, ValidateFirst, ValidateSample, ValidateNone, \
+    ValidateIncremental
+
+#-------------------------------------------------------------------------------
+# Classes
+
+
+class Item(Base):
+    _attrs = dict(a = Attr(int))
+
+def holder(policy=None):
+    class Holder(Base):
+        _attrs = dict(items = Attr(List(Item), policy=policy))
+    return Holder
+
+
+#-------------------------------------------------------------------------------
+# Main
+
+
+def main():
+    number = arg('number', 10)
+    repeat = arg('repeat', 3)
+    size = arg('size', 100000)
+
+    items = [Item(a=k) for k in range(size)]
+    cases = []
+    for name, policy in (('all', None),
+                         ('first-100', ValidateFirst(100)),
+                         ('sample-100', ValidateSample(100)),
+                         ('none', ValidateNone()),
+                         ('incremental', ValidateIncremental())):
+        obj = holder(policy)(items=list(items))
+        obj.validate()
+        cases.append((name, obj.validate))
+
+    compare(cases, number=number, repeat=repeat, baseline='all')
+
+if __name__ == '__main__':
+    main()
+
+#-------------------------------------------------------------------------------
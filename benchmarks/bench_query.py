@@ -0,0 +1,50 @@
+'''Times MultiType.query() with 10 alternatives on a value that matches
+none of them, compared with the previous implementation, which called
+check() on each alternative and caught the TypeError it raised.
+
+Usage: python benchmarks/bench_query.py [--number=N] [--repeat=R]
+'''
+
+from benchutil import compare, arg
+from syn.type.a import MultiType, ValuesType, List, Tuple
+
+#-------------------------------------------------------------------------------
+# Utilities
+
+
+def old_query(multi, value):
+    try:
+        for typ in multi.types:
+            try:
+                typ.check(value)
+                return True
+            except TypeError:
+                pass
+        raise TypeError("Value '{}' is not any valid type: {}"
+                        .format(value, multi.typestr))
+    except TypeError:
+        return False
+
+#-------------------------------------------------------------------------------
+# Main
+
+
+def main():
+    number = arg('number', 20000)
+    repeat = arg('repeat', 5)
+
+    t = MultiType((int, float, bytes, list, dict, ValuesType([1, 2, 3]),
+                   ValuesType(['a', 'b']), List(int), Tuple((int, int)),
+                   type(None)))
+    assert len(t.types) == 10 and not t.is_typelist
+    value = (1.5, 'abc')
+    assert not t.query(value) and not old_query(t, value)
+
+    compare([('check', lambda: old_query(t, value)),
+             ('query', lambda: t.query(value))],
+            number=number, repeat=repeat, baseline='check')
+
+if __name__ == '__main__':
+    main()
+
+#-------------------------------------------------------------------------------
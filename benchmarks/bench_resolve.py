@@ -0,0 +1,47 @@
+'''Compares deserialization of many records using the cached class
+resolver with resolving each class by importing its module (the previous
+behavior).
+
+Usage: python benchmarks/bench_resolve.py [--number=N] [--repeat=R]
+'''
+
+from importlib import import_module
+from benchutil import compare, arg
+from syn.types import serialize, deserialize, ClassResolver
+from syn.base.b import Base, Attr
+
+#-------------------------------------------------------------------------------
+# Classes
+
+
+class Record(Base):
+    _attrs = dict(a = Attr(int),
+                  b = Attr(list))
+
+
+class ImportResolver(ClassResolver):
+    def resolve(self, mod, name):
+        return getattr(import_module(mod), name)
+
+
+#-------------------------------------------------------------------------------
+# Main
+
+
+def main():
+    number = arg('number', 10)
+    repeat = arg('repeat', 5)
+
+    data = serialize([Record(a=k, b=[k, (k, str(k))]) for k in range(1000)])
+    allow = ClassResolver(allow_list=True)
+    allow.register(Record, mod=__name__)
+    print('deserialize (1000 records):')
+    compare([('import', lambda: deserialize(data, resolver=ImportResolver())),
+             ('cached', lambda: deserialize(data)),
+             ('allow-list', lambda: deserialize(data, resolver=allow))],
+            number=number, repeat=repeat, baseline='import')
+
+if __name__ == '__main__':
+    main()
+
+#-------------------------------------------------------------------------------
@@ -0,0 +1,86 @@
+'''Compares serialize() and serialize_graph() on a Tree, in which every
+node is referenced by the tree as well as by its parent.
+
+Usage: python benchmarks/bench_serialize.py [--number=N] [--repeat=R]
+           [--nodes=M] [--plain=0|1]
+
+By default, serialize() is only timed for trees of up to 10000 nodes, as
+its output grows with the depth of the tree times the number of nodes.
+'''
+
+import sys
+import time
+from benchutil import compare, arg
+from syn.tree.b import Node, Tree
+from syn.types import serialize, serialize_graph, deserialize_graph
+
+#-------------------------------------------------------------------------------
+# Utilities
+
+
+def build(nodes, branching=4):
+    level = [Node() for k in range(nodes - nodes // branching)]
+    while len(level) > 1:
+        level = [Node(*level[k:k + branching])
+                 for k in range(0, len(level), branching)]
+    return Tree(level[0])
+
+
+def size(obj):
+    '''Returns the number of dicts and lists in obj.'''
+    ret = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif isinstance(obj, list):
+            stack.extend(obj)
+        else:
+            continue
+        ret += 1
+    return ret
+
+
+#-------------------------------------------------------------------------------
+# Main
+
+
+def main():
+    number = arg('number', 1)
+    repeat = arg('repeat', 3)
+    nodes = arg('nodes', 100000)
+    plain = arg('plain', int(nodes <= 10000))
+
+    t = time.time()
+    tree = build(nodes)
+    print('{} node tree built in {:.2f} s'.format(len(tree.nodes),
+                                                  time.time() - t))
+
+    ser = serialize_graph(tree)
+    print('serialize_graph size: {} containers'.format(size(ser)))
+    cases = []
+    if plain:
+        try:
+            print('serialize size: {} containers'
+                  .format(size(serialize(tree))))
+            cases.append(('serialize', lambda: serialize(tree)))
+        except RuntimeError:
+            print('serialize: recursion limit ({}) exceeded'
+                  .format(sys.getrecursionlimit()))
+    print('')
+
+    print('serialize:')
+    cases.append(('serialize_graph', lambda: serialize_graph(tree)))
+    compare(cases, number=number, repeat=repeat, baseline='serialize')
+    print('')
+
+    root = serialize_graph(tree.root)
+    print('deserialize (root node):')
+    compare([('deserialize_graph', lambda: deserialize_graph(root))],
+            number=number, repeat=repeat)
+
+if __name__ == '__main__':
+    main()
+
+#-------------------------------------------------------------------------------
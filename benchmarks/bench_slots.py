@@ -0,0 +1,88 @@
+'''Measures memory per node of a Node tree with and without _opts.slots.
+
+Usage: python benchmarks/bench_slots.py [--nodes=N] [--branching=B]
+
+Each case is measured in a separate interpreter process.
+'''
+
+import gc
+import sys
+import subprocess
+from benchutil import arg
+from syn.tree.b import Node
+
+try:
+    import tracemalloc
+except ImportError: # pragma: no cover
+    tracemalloc = None
+    import resource
+
+#-------------------------------------------------------------------------------
+# Classes
+
+
+class DictNode(Node):
+    pass
+
+class SlotsNode(Node):
+    _opts = dict(slots = True)
+
+CASES = dict(dict = DictNode, slots = SlotsNode)
+
+
+#-------------------------------------------------------------------------------
+# Measurement
+
+
+def build(cls, nodes, branching):
+    '''Builds a tree of cls with (about) the given number of nodes.'''
+    level = [cls() for k in range(nodes - nodes // branching)]
+    while len(level) > 1:
+        level = [cls(*level[k:k + branching])
+                 for k in range(0, len(level), branching)]
+    return level[0]
+
+
+def usage():
+    if tracemalloc is not None:
+        return tracemalloc.get_traced_memory()[0]
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def measure(cls, nodes, branching):
+    gc.collect()
+    before = usage()
+    root = build(cls, nodes, branching)
+    gc.collect()
+    after = usage()
+    count = root._node_count
+    del root
+    gc.collect()
+    return count, (after - before) / float(count)
+
+
+#-------------------------------------------------------------------------------
+# Main
+
+
+def main():
+    nodes = arg('nodes', 1000000)
+    branching = arg('branching', 10)
+    case = arg('case', '', str)
+
+    if not case:
+        for name in sorted(CASES):
+            subprocess.check_call([sys.executable] + sys.argv + 
+                                  ['--case=' + name])
+        return
+
+    if tracemalloc is not None:
+        tracemalloc.start()
+
+    count, per = measure(CASES[case], nodes, branching)
+    print('{:<6} {:>9} nodes  {:>8.1f} bytes/node'.format(case, count, per))
+
+if __name__ == '__main__':
+    main()
+
+#-------------------------------------------------------------------------------
@@ -0,0 +1,83 @@
+'''Compares the peak memory used to write and read a large collection of
+Base objects as one object (dump/load) and one record per element
+(dump_iter/load_iter).
+
+Usage: python benchmarks/bench_stream.py [--records=N]
+
+Requires tracemalloc (Python 3.4+).
+'''
+
+import os
+import tempfile
+import tracemalloc
+from benchutil import arg
+from syn.serialize import dump, load, dump_iter, load_iter
+from syn.base.b import Base, Attr
+
+#-------------------------------------------------------------------------------
+# Classes
+
+
+class Record(Base):
+    _attrs = dict(id = Attr(int),
+                  tags = Attr(list))
+
+
+#-------------------------------------------------------------------------------
+# Utilities
+
+
+def records(n):
+    for k in range(n):
+        yield Record(id=k, tags=[k, 2.5 * k, 'tag'])
+
+def peak(func, *args):
+    tracemalloc.start()
+    func(*args)
+    ret = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return ret
+
+def write_list(path, n):
+    with open(path, 'wb') as f:
+        dump(list(records(n)), f)
+
+def read_list(path):
+    with open(path, 'rb') as f:
+        for obj in load(f):
+            pass
+
+def write_iter(path, n):
+    with open(path, 'wb') as f:
+        dump_iter(records(n), f)
+
+def read_iter(path):
+    with open(path, 'rb') as f:
+        for obj in load_iter(f):
+            pass
+
+#-------------------------------------------------------------------------------
+# Main
+
+
+def main():
+    n = arg('records', 20000)
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+
+    try:
+        print('peak memory ({} records):'.format(n))
+        for name, write, read in [('dump/load', write_list, read_list),
+                                  ('dump_iter/load_iter', write_iter,
+                                   read_iter)]:
+            w = peak(write, path, n)
+            r = peak(read, path)
+            print('{:<20} write {:>8.1f} KB  read {:>8.1f} KB'
+                  .format(name, w / 1024., r / 1024.))
+    finally:
+        os.remove(path)
+
+if __name__ == '__main__':
+    main()
+
+#-------------------------------------------------------------------------------
@@ -0,0 +1,46 @@
+'''Compares compiled and generic Base.validate().
+
+Usage: python benchmarks/bench_validate.py [--number=N] [--repeat=R]
+'''
+
+from benchutil import compare, arg
+from syn.five import STR
+from syn.base.b import Base, Attr
+
+#-------------------------------------------------------------------------------
+# Classes
+
+
+class Validated(Base):
+    _opts = dict(optional_none = True)
+    _attrs = dict(a = Attr(int),
+                  b = Attr((int, float)),
+                  c = Attr(STR, optional=True),
+                  d = Attr(None),
+                  e = Attr(list),
+                  f = Attr(dict, optional=True))
+
+class ValidatedGeneric(Validated):
+    _opts = dict(compile_validate = False)
+
+
+#-------------------------------------------------------------------------------
+# Main
+
+
+def main():
+    number = arg('number', 20000)
+    repeat = arg('repeat', 5)
+
+    kwargs = dict(a=1, b=2.0, c=u'abc', d=None, e=[])
+    obj = Validated(**kwargs)
+    gen = ValidatedGeneric(**kwargs)
+
+    compare([('generic', gen.validate),
+             ('compiled', obj.validate)],
+            number=number, repeat=repeat, baseline='generic')
+
+if __name__ == '__main__':
+    main()
+
+#-------------------------------------------------------------------------------
@@ -0,0 +1,51 @@
+'''Times ValuesType.check() on a list of 200 string values, compared
+with the previous implementation, which scanned the list, and
+Set.generate() on a wrapped set of 1000 integers, compared with
+SetWrapper.sample(), which copies the set to a list on each call.
+
+Usage: python benchmarks/bench_values.py [--number=N] [--repeat=R]
+'''
+
+from benchutil import compare, arg
+from syn.type.a import ValuesType, Set
+from syn.sets.b import SetWrapper
+
+#-------------------------------------------------------------------------------
+# Utilities
+
+
+def old_check(typ, value):
+    if value not in typ.values:
+        raise TypeError('Invalid value: {}'.format(value))
+
+#-------------------------------------------------------------------------------
+# Main
+
+
+def main():
+    number = arg('number', 20000)
+    repeat = arg('repeat', 5)
+
+    t = ValuesType(['value{}'.format(k) for k in range(200)])
+    value = 'value199'
+    old_check(t, value)
+    t.check(value)
+
+    print('ValuesType.check')
+    compare([('scan', lambda: old_check(t, value)),
+             ('index', lambda: t.check(value))],
+            number=number, repeat=repeat, baseline='scan')
+
+    node = SetWrapper(set(range(1000)))
+    s = Set(node)
+    assert s.size == 1000
+
+    print('\nSet.generate')
+    compare([('sample', lambda: node.sample()),
+             ('index', lambda: s.generate())],
+            number=number // 10, repeat=repeat, baseline='sample')
+
+if __name__ == '__main__':
+    main()
+
+#-------------------------------------------------------------------------------
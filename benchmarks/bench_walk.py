@@ -0,0 +1,63 @@
+'''Times walk() over a list of nested records, compared with
+ValueExplorer.depth_first(), and reports the peak memory of walking a
+large mapping with the default max_buffer, with no limit, with a small
+limit, and with a pre-built OrderIndex.
+
+Usage: python benchmarks/bench_walk.py [--number=N] [--repeat=R] [--size=M]
+
+The memory comparison requires tracemalloc (Python 3.4+).
+'''
+
+from benchutil import compare, arg
+from syn.types import ValueExplorer, OrderIndex, walk
+
+#-------------------------------------------------------------------------------
+# Utilities
+
+
+def exhaust(it):
+    for item in it:
+        pass
+
+def peak(func):
+    import tracemalloc
+    tracemalloc.start()
+    func()
+    ret = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return ret
+
+#-------------------------------------------------------------------------------
+# Main
+
+
+def main():
+    number = arg('number', 3)
+    repeat = arg('repeat', 3)
+    size = arg('size', 1000)
+
+    A = [dict(id=k, values=[k, k + 1.5], tags=dict(a=str(k)))
+         for k in range(size)]
+    compare([('depth_first',
+              lambda: exhaust(ValueExplorer(A).depth_first())),
+             ('walk', lambda: exhaust(walk(A)))],
+            number=number, repeat=repeat, baseline='depth_first')
+
+    try:
+        import tracemalloc
+    except ImportError:
+        return
+
+    D = {str(k): k for k in range(size * 100)}
+    index = OrderIndex(D)
+    for name, kwargs in (('default', {}),
+                         ('unbounded', dict(max_buffer=None)),
+                         ('max_buffer', dict(max_buffer=1000)),
+                         ('index', dict(index=index))):
+        nbytes = peak(lambda: exhaust(walk(D, **kwargs)))
+        print('{:<12} {:>10} bytes peak'.format(name, nbytes))
+
+if __name__ == '__main__':
+    main()
+
+#-------------------------------------------------------------------------------
@@ -0,0 +1,46 @@
+'''Shared helpers for the benchmark scripts in this directory.'''
+
+import os
+import sys
+import timeit
+
+DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(DIR))
+
+#-------------------------------------------------------------------------------
+# Timing
+
+
+def best_of(func, number=10000, repeat=5):
+    '''Returns the best time (in seconds) per call of func.'''
+    times = timeit.repeat(func, number=number, repeat=repeat)
+    return min(times) / number
+
+
+def compare(cases, number=10000, repeat=5, baseline=None):
+    '''Times each (name, func) pair in cases and prints a summary table.
+
+    If given, baseline is the name of the case to which the others are
+    compared.
+    '''
+    results = [(name, best_of(func, number, repeat)) for name, func in cases]
+    base = dict(results).get(baseline)
+
+    width = max(len(name) for name, _ in results)
+    for name, t in results:
+        line = '{:<{}}  {:>10.3f} us'.format(name, width, t * 1e6)
+        if base:
+            line += '  ({:.2f}x)'.format(base / t)
+        print(line)
+    return results
+
+
+def arg(name, default, typ=int):
+    '''Returns the value of --name=value from sys.argv, or default.'''
+    prefix = '--{}='.format(name)
+    for item in sys.argv[1:]:
+        if item.startswith(prefix):
+            return typ(item[len(prefix):])
+    return default
+
+#-------------------------------------------------------------------------------
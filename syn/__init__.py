@@ -1 +1,9 @@
-__import__('pkg_resources').declare_namespace(__name__)
+# Importing pkg_resources is slow, so it is only used to declare the
+# namespace if something has already imported it; installs made with
+# namespace_packages (see setup.py) also set up the namespace on startup
+import sys
+if 'pkg_resources' in sys.modules:
+    sys.modules['pkg_resources'].declare_namespace(__name__)
+else:
+    __path__ = __import__('pkgutil').extend_path(__path__, __name__)
+del sys
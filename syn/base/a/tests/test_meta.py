@@ -222,6 +222,14 @@ def test_meta():
 
     assert D._opts == dict(x = 1, y = 3.4, z = 'abc')
 
+    # Inherited attr specifications do not share mutable defaults
+    class E(B):
+        _attrs = dict(f = Attr(int))
+
+    assert E._attrs.defaults['d'] is not B._attrs.defaults['d']
+    E._attrs.defaults['d'].append(3)
+    assert B._attrs.defaults['d'] == [1, 2]
+
 #-------------------------------------------------------------------------------
 # Test _seq_opts propagation
 
@@ -1,15 +1,18 @@
 import os
+import sys
 import six
 from copy import copy
-from jinja2 import Template
+from itertools import islice
 from operator import itemgetter
-from collections import Mapping
+from collections import Mapping, defaultdict
 from .meta import Attr, Attrs, Meta, create_hook, preserve_attr_data, \
-    pre_create_hook
+    pre_create_hook, HOOK_TYPES
+from .codegen import SERIALIZE_KWARGS
 from syn.base_utils import AttrDict, ReflexiveDict, message, get_mod, \
-    get_typename, SeqDict, callables, istr, rgetattr, get_fullname
+    get_typename, SeqDict, istr, rgetattr, get_fullname, getfunc
+from syn.type.a import AnyType, TypeType
 from syn.types import Type, pairs, estr, DiffersAtAttribute, hashable, \
-    SER_KEYS, serialize
+    SER_KEYS, serialize, CLASS_RESOLVER
 
 #-------------------------------------------------------------------------------
 # Templates
@@ -17,10 +20,21 @@ from syn.types import Type, pairs, estr, DiffersAtAttribute, hashable, \
 DIR = os.path.dirname(os.path.abspath(__file__))
 TEMPLATES = os.path.join(DIR, 'templates')
 
-with open(os.path.join(TEMPLATES, 'class.j2'), 'r') as f:
-    CLASS_TEMPLATE = Template(f.read())
-    CLASS_TEMPLATE.environment.trim_blocks = True
-    CLASS_TEMPLATE.environment.lstrip_blocks = True
+_CLASS_TEMPLATE = []
+
+def class_template():
+    '''Returns the (cached) class documentation template.
+
+    Jinja2 is only imported the first time documentation is rendered.
+    '''
+    if not _CLASS_TEMPLATE:
+        from jinja2 import Template
+        with open(os.path.join(TEMPLATES, 'class.j2'), 'r') as f:
+            template = Template(f.read())
+            template.environment.trim_blocks = True
+            template.environment.lstrip_blocks = True
+        _CLASS_TEMPLATE.append(template)
+    return _CLASS_TEMPLATE[0]
 
 #-------------------------------------------------------------------------------
 # Hook Decorators
@@ -49,6 +63,52 @@ def setstate_hook(f):
     f.is_setstate_hook = _SetstateHook
     return f
 
+HOOK_TYPES.update(is_init_hook = _InitHook,
+                  is_coerce_hook = _CoerceHook,
+                  is_setstate_hook = _SetstateHook)
+
+#-------------------------------------------------------------------------------
+# Utilities
+
+_MISSING = object()
+_EQ_EXCLUDE = ('eq_exclude',)
+_HASH_EXCLUDE = ('hash_exclude',)
+_HASH_CACHE = '_hash_cache_'
+_HASH_MASK = (sys.maxsize << 1) + 1
+
+def _attr_candidates(obj, include=(), exclude=()):
+    '''Returns the sorted attributes of obj's class that are selected by
+    the include and exclude groups.
+
+    Results are cached per class, unless obj has its own _groups.
+    '''
+    groups = obj._groups
+    cls = type(obj)
+    cache = None
+    if groups is cls._groups:
+        key = (tuple(include), tuple(exclude))
+        cache = cls._data.attrs_cache
+        if key in cache:
+            return cache[key]
+
+    if include and exclude:
+        raise TypeError('Cannot specify both include and exclude')
+
+    if exclude:
+        exclude = groups.union(*exclude)
+    else:
+        exclude = set()
+
+    if include:
+        exclude = groups.complement(*include)
+
+    ret = tuple(sorted(attr for attr in obj._attrs.types
+                       if attr not in exclude))
+    if cache is not None:
+        cache[key] = ret
+    return ret
+
+
 #-------------------------------------------------------------------------------
 # Base
 
@@ -70,14 +130,21 @@ class Base(object):
                             'update_trigger')
     _opts = AttrDict(args = (),
                      autodoc = True,
+                     cache_hash = False,
                      coerce_args = False,
+                     compile_init = True,
+                     compile_serialize = True,
+                     compile_validate = True,
+                     fast_copy = False,
                      id_equality = False,
                      init_validate = False,
+                     iterative_eq = False,
                      make_hashable = False,
                      make_type_object = True,
                      optional_none = False,
                      repr_template = '',
-                     register_subclasses = False)
+                     register_subclasses = False,
+                     slots = False)
     _seq_opts = SeqDict(coerce_hooks = (),
                         init_hooks = (),
                         init_order = (),
@@ -89,6 +156,10 @@ class Base(object):
                                             'setstate_hooks'))
 
     def __init__(self, *args, **kwargs):
+        _init = self._data.compiled_init
+        if _init:
+            return _init(self, *args, **kwargs)
+
         _args = self._opts.args
 
         for key in self._attrs.defaults:
@@ -154,12 +225,23 @@ class Base(object):
         if self._opts.id_equality:
             return self is other
 
+        if self is other:
+            return True
+
         if type(self) is not type(other):
             return False
 
-        dct1 = self.to_dict(exclude=['eq_exclude'])
-        dct2 = other.to_dict(exclude=['eq_exclude'])
-        return dct1 == dct2
+        if self._opts.iterative_eq:
+            return self._eq_iterative(other)
+
+        for attr in _attr_candidates(self, exclude=_EQ_EXCLUDE):
+            a = getattr(self, attr, _MISSING)
+            b = getattr(other, attr, _MISSING)
+            if a is b:
+                continue
+            if a is _MISSING or b is _MISSING or not a == b:
+                return False
+        return True
 
     __hash__ = None
 
@@ -208,6 +290,118 @@ class Base(object):
                  for attr, val in dct.items()}
         return cls(**attrs)
 
+    @classmethod
+    def coerce_many(cls, values, errors=None, lazy=False, chunk_size=1000,
+                    **kwargs):
+        '''Coerces each item of values, as coerce() would.
+
+        The attribute types are looked up once per chunk of chunk_size
+        items, and each attribute is coerced across the whole chunk before
+        the objects are created.  If errors is a list, an (index,
+        exception) pair is appended to it for each item that cannot be
+        coerced, and the item is skipped; otherwise the first such
+        exception is raised.  If lazy is True, a generator is returned.
+        '''
+        ret = cls._coerce_many(values, errors, chunk_size, kwargs)
+        if lazy:
+            return ret
+        return list(ret)
+
+    @classmethod
+    def _coerce_many(cls, values, errors, chunk_size, kwargs):
+        it = iter(values)
+        index = 0
+        while True:
+            chunk = list(islice(it, chunk_size))
+            if not chunk:
+                break
+
+            for k, (obj, e) in enumerate(cls._coerce_chunk(chunk, kwargs)):
+                if e is None:
+                    yield obj
+                elif errors is None:
+                    raise e
+                else:
+                    errors.append((index + k, e))
+            index += len(chunk)
+
+    @classmethod
+    def _coerce_chunk(cls, chunk, kwargs):
+        '''Returns an (object, exception) pair for each item of chunk.'''
+        n = len(chunk)
+        objs = [None] * n
+        errs = [None] * n
+
+        # Subclasses that customize coerce() are coerced item by item
+        if getfunc(cls.coerce) is not getfunc(Base.coerce):
+            for k, value in enumerate(chunk):
+                try:
+                    objs[k] = cls.coerce(value, **kwargs)
+                except Exception as e:
+                    errs[k] = e
+            return list(zip(objs, errs))
+
+        rows = {k: cls._dict_from_mapping(value) 
+                for k, value in enumerate(chunk)
+                if isinstance(value, Mapping)}
+
+        def fail(k, e):
+            errs[k] = e
+            rows.pop(k, None)
+
+        hooks = cls._data.coerce_hooks
+        if hooks:
+            for k, dct in list(rows.items()):
+                try:
+                    for hook in hooks:
+                        hook(dct)
+                except Exception as e:
+                    fail(k, e)
+
+        if not cls._opts.coerce_args:
+            columns = defaultdict(list)
+            for k, dct in rows.items():
+                for attr in dct:
+                    columns[attr].append(k)
+
+            types = cls._attrs.types
+            for attr, ks in columns.items():
+                if attr not in types:
+                    for k in ks:
+                        fail(k, KeyError(attr))
+                    continue
+
+                typ = types[attr]
+                if type(typ) is AnyType:
+                    continue
+
+                # Values that are already of the right type are left as is
+                skip = typ.type if type(typ) is TypeType else ()
+                coerce = typ.coerce
+                for k in ks:
+                    dct = rows.get(k)
+                    if dct is None:
+                        continue
+                    value = dct[attr]
+                    if isinstance(value, skip):
+                        continue
+                    try:
+                        dct[attr] = coerce(value, **kwargs)
+                    except Exception as e:
+                        fail(k, e)
+
+        for k, value in enumerate(chunk):
+            if errs[k] is not None:
+                continue
+            try:
+                if k in rows:
+                    objs[k] = cls(**rows[k])
+                else:
+                    objs[k] = cls(value)
+            except Exception as e:
+                errs[k] = e
+        return list(zip(objs, errs))
+
     def __copy__(self, **kwargs):
         kwargs['exclude'] = kwargs.get('exclude', []) + ['copy_exclude']
         dct = self.to_dict(**kwargs)
@@ -217,6 +411,10 @@ class Base(object):
                 dct[attr] = copy(dct[attr])
 
         dct['_from_copy_'] = True
+        if self._opts.fast_copy:
+            ret = type(self).__new__(type(self))
+            ret.__setstate__(dct)
+            return ret
         return type(self)(**dct)
 
     def copy(self, **kwargs):
@@ -262,12 +460,6 @@ class Base(object):
             kwargs[attr] = typ.enumeration_value(x, **kwargs)
         return cls(**kwargs)
 
-    @classmethod
-    def _find_hooks(cls, hook_attr, hook_type):
-        funcs = callables(cls)
-        return [f for f in funcs.values() 
-                if getattr(f, hook_attr, None) is hook_type]
-
     @classmethod
     def from_mapping(cls, value):
         return cls(**cls._dict_from_mapping(value))
@@ -372,12 +564,19 @@ class Base(object):
 
         if rgetattr(cls, '__init__.__func__', False) is False:
             return
+
+        # Rendered by Meta when __doc__ is first accessed
+        cls._data.render_doc = True
+
+    @classmethod
+    def _render_documentation(cls):
         args = cls._get_opt('args', default=())
         kw_attrs = cls._data.kw_attrs
+        doc = cls.__dict__.get('__doc__')
 
         data = {}
         data['signature'] = cls._generate_documentation_signature(args)
-        data['doc'] = cls.__doc__ if cls.__doc__ else ''
+        data['doc'] = doc if doc else ''
         if cls.__init__.__func__.__doc__:
             data['doc'] += '\n\n' + cls.__init__.__func__.__doc__
         data['attrspec'] = cls._generate_documentation_attrspec(args)
@@ -386,8 +585,7 @@ class Base(object):
         data['aliasspec'] = cls._generate_documentation_aliasspec()
         data['groupspec'] = cls._generate_documentation_groupspec()
 
-        doc = CLASS_TEMPLATE.render(data)
-        cls.__doc__ = doc
+        return class_template().render(data)
 
     @classmethod
     @create_hook
@@ -402,10 +600,116 @@ class Base(object):
     @create_hook
     def _set_hash(cls):
         if cls._get_opt('make_hashable', False):
+            cls._data.hash_seed = hash(get_fullname(cls))
+
+            # _hash() only agrees with _hashable() if the latter is not
+            # overridden below the class that defines the former
+            owner = lambda name: next(c for c in cls.__mro__
+                                      if name in vars(c))
+            if issubclass(owner('_hash'), owner('_hashable')):
+                def hashv(self):
+                    return self._hash()
+            else:
+                def hashv(self):
+                    return hash(self._hashable())
+
+            if not cls._get_opt('cache_hash', False):
+                setattr(cls, '__hash__', hashv)
+                return
+
+            cls._data.hash_attrs = frozenset(cls._attrs.types) - \
+                frozenset(cls._groups.hash_exclude)
+
             def hashf(self):
-                return hash(self._hashable())
+                ret = getattr(self, _HASH_CACHE, None)
+                if ret is None:
+                    ret = hashv(self)
+                    object.__setattr__(self, _HASH_CACHE, ret)
+                return ret
             setattr(cls, '__hash__', hashf)
 
+            if not getattr(cls.__setattr__, 'invalidates_hash', False):
+                _setattr = cls.__setattr__
+                _delattr = cls.__delattr__
+
+                def __setattr__(self, attr, value):
+                    _setattr(self, attr, value)
+                    if attr in self._data.hash_attrs:
+                        if getattr(self, _HASH_CACHE, None) is not None:
+                            object.__setattr__(self, _HASH_CACHE, None)
+
+                def __delattr__(self, attr):
+                    _delattr(self, attr)
+                    if attr in self._data.hash_attrs:
+                        if getattr(self, _HASH_CACHE, None) is not None:
+                            object.__setattr__(self, _HASH_CACHE, None)
+
+                __setattr__.invalidates_hash = True
+                __setattr__.wraps_attrs = getattr(_setattr, 'wraps_attrs',
+                                                  False)
+                setattr(cls, '__setattr__', __setattr__)
+                setattr(cls, '__delattr__', __delattr__)
+
+    @classmethod
+    @create_hook
+    def _set_wrap(cls):
+        '''Values assigned to attributes whose type defines wrap() (see
+        Attrs.wrap) are wrapped on assignment, both in __init__ and
+        afterwards.  For a ValidateIncremental Sequence, this stores a
+        CheckedList copy of an assigned list, not the list itself.
+        '''
+        if cls._attrs.wrap and \
+           not getattr(cls.__setattr__, 'wraps_attrs', False):
+            _setattr = cls.__setattr__
+
+            def __setattr__(self, attr, value):
+                wrap = self._attrs.wrap.get(attr)
+                if wrap is not None and value is not None:
+                    value = wrap(value)
+                _setattr(self, attr, value)
+
+            __setattr__.wraps_attrs = True
+            __setattr__.invalidates_hash = getattr(_setattr,
+                                                   'invalidates_hash', False)
+            setattr(cls, '__setattr__', __setattr__)
+
+    def _eq_iterative(self, other):
+        '''Equality test that expands nested Base objects (having the
+        default __eq__) and lists and tuples using an explicit stack,
+        rather than recursion.
+        '''
+        base_eq = Base.__eq__
+        stack = [(self, other)]
+        while stack:
+            a, b = stack.pop()
+            if a is b:
+                continue
+
+            typ = type(a)
+            if typ is not type(b):
+                if not a == b:
+                    return False
+
+            elif typ is list or typ is tuple:
+                if len(a) != len(b):
+                    return False
+                stack.extend(zip(a, b))
+
+            elif (isinstance(a, Base) and typ.__eq__ == base_eq and 
+                  not a._opts.id_equality):
+                for attr in _attr_candidates(a, exclude=_EQ_EXCLUDE):
+                    x = getattr(a, attr, _MISSING)
+                    y = getattr(b, attr, _MISSING)
+                    if x is y:
+                        continue
+                    if x is _MISSING or y is _MISSING:
+                        return False
+                    stack.append((x, y))
+
+            elif not a == b:
+                return False
+        return True
+
     def _estr(self, **kwargs):
         kwargs = {attr: estr(val) for attr, val in pairs(self, **kwargs)}
         argstr = ','.join('{}={}'.format(attr, val) for attr, val in kwargs.items())
@@ -416,6 +720,22 @@ class Base(object):
             if not func(value, getattr(other, attr)):
                 return DiffersAtAttribute(self, other, attr)
 
+    def _hash(self):
+        '''Returns a hash of the values of the hash-relevant attributes,
+        without building the tuple returned by _hashable().
+        '''
+        ret = self._data.hash_seed
+        for attr in _attr_candidates(self, exclude=_HASH_EXCLUDE):
+            val = getattr(self, attr, _MISSING)
+            if val is _MISSING:
+                continue
+            try:
+                h = hash(val)
+            except TypeError:
+                h = hash(hashable(val))
+            ret = ((ret ^ h) * 1000003) & _HASH_MASK
+        return hash(ret)
+
     def _hashable(self, **kwargs):
         items = [hashable(val, **kwargs) for val in self.to_tuple(exclude=['hash_exclude'])]
         items.insert(0, get_fullname(self))
@@ -461,6 +781,11 @@ class Base(object):
         return template.format(**dct)
 
     def _serialize(self, dct, **kwargs):
+        _serialize = self._data.compiled_serialize
+        if _serialize and self._groups is type(self)._groups:
+            if not kwargs or kwargs == SERIALIZE_KWARGS:
+                return _serialize(self, dct)
+
         kwargs = dict(kwargs)
         exclude = list(kwargs.get('exclude', []))
         if 'getstate_exclude' not in exclude:
@@ -488,6 +813,10 @@ class Base(object):
     def validate(self):
         '''Raise an exception if the object is missing required attributes, or if the attributes are of an invalid type.
         '''
+        _validate = self._data.compiled_validate
+        if _validate:
+            return _validate(self)
+
         optional = self._attrs.optional
         optional_none = self._opts.optional_none
 
@@ -516,23 +845,37 @@ class Base(object):
 class BaseType(Type):
     type = Base
 
-    def attrs(self, **kwargs):
-        exclude = kwargs.get('exclude', [])
-        include = kwargs.get('include', [])
-
-        if include and exclude:
-            raise TypeError('Cannot specify both include and exclude')
-
-        if exclude:
-            exclude = self.obj._groups.union(*exclude)
-        else:
-            exclude = set()
-
-        if include:
-            exclude = self.obj._groups.complement(*include)
+    @classmethod
+    def deserialize(cls, dct, **kwargs):
+        # Use the compiled deserializer for the output of Base._serialize
+        if type(dct) is dict and len(dct) == 3:
+            kw = dct.get(SER_KEYS.kwargs)
+            if type(kw) is dict and SER_KEYS.name not in kw:
+                resolver = kwargs.get('resolver', CLASS_RESOLVER)
+                typ = resolver.resolve_dict(dct)
+                data = getattr(typ, '_data', None)
+                _deserialize = getattr(data, 'compiled_deserialize', None)
+                if _deserialize:
+                    return _deserialize(dct, **kwargs)
+        return super(BaseType, cls).deserialize(dct, **kwargs)
+
+    def _candidates(self, **kwargs):
+        return _attr_candidates(self.obj, kwargs.get('include', ()),
+                                kwargs.get('exclude', ()))
 
-        return sorted(attr for attr in self.obj._attrs.types
-                      if attr not in exclude and hasattr(self.obj, attr))
+    def attrs(self, **kwargs):
+        obj = self.obj
+        return [attr for attr in self._candidates(**kwargs)
+                if hasattr(obj, attr)]
+
+    def pairs(self, **kwargs):
+        obj = self.obj
+        ret = []
+        for attr in self._candidates(**kwargs):
+            val = getattr(obj, attr, _MISSING)
+            if val is not _MISSING:
+                ret.append((attr, val))
+        return ret
 
 
 #-------------------------------------------------------------------------------
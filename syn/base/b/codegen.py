@@ -0,0 +1,400 @@
+'''Generation of specialized methods for Base subclasses.
+
+The generic implementations in syn.base.b.base consult the class options
+and attribute bookkeeping on every call.  The functions in this module
+read that information once, at class-creation time, and emit equivalent
+source code with the per-class decisions already made.
+'''
+
+import six
+from syn.base_utils import message
+from syn.type.a import AnyType, TypeType, MultiType
+from syn.types import Type, SER_KEYS, SER_IDEMPOTENT, serialize, deserialize
+
+#-------------------------------------------------------------------------------
+# Utilities
+
+
+class CodeBuilder(object):
+    '''Accumulates indented lines of Python source.'''
+    def __init__(self, indent=0):
+        self.lines = []
+        self.level = indent
+
+    def __call__(self, line):
+        self.lines.append('    ' * self.level + line)
+
+    def indent(self):
+        self.level += 1
+
+    def dedent(self):
+        self.level -= 1
+
+    def source(self):
+        return '\n'.join(self.lines) + '\n'
+
+
+def compile_function(name, source, namespace, filename=None):
+    '''Compiles source defining function name inside a closure factory.
+
+    Each key of namespace becomes a closure variable of the resulting
+    function (which makes lookups cheaper than globals).
+    '''
+    params = sorted(namespace)
+    factory = '_make_' + name
+    lines = ['def {}({}):'.format(factory, ', '.join(params))]
+    lines += ['    ' + line if line else line
+              for line in source.split('\n')]
+    lines.append('    return {}'.format(name))
+    src = '\n'.join(lines) + '\n'
+
+    if filename is None:
+        filename = '<syn generated {}>'.format(name)
+    code = compile(src, filename, 'exec')
+
+    env = {}
+    exec(code, env)
+    ret = env[factory](*[namespace[param] for param in params])
+    ret._source = source
+    return ret
+
+
+def lazy_compile(cls, key, compiler):
+    '''Returns a stand-in for the function compiler(cls) that compiles it
+    on first call and stores the result as cls._data.<key>.
+    '''
+    def compile_and_call(*args, **kwargs):
+        func = compiler(cls)
+        setattr(cls._data, key, func)
+        return func(*args, **kwargs)
+    return compile_and_call
+
+
+#-------------------------------------------------------------------------------
+# __init__
+
+
+def generate_init(cls):
+    '''Returns the source and namespace of a specialized __init__ for cls.
+
+    The generated function has the same semantics as the generic
+    Base.__init__, given the options and attributes of cls at the time
+    of generation.
+    '''
+    ns = {}
+    attrs = cls._attrs
+    opts = cls._opts
+    _args = tuple(opts.get('args', ()))
+    defaults = attrs.defaults
+    code = CodeBuilder(indent=1)
+
+    def name(prefix, obj):
+        ret = '_{}{}'.format(prefix, len(ns))
+        ns[ret] = obj
+        return ret
+
+    if _args:
+        code('n = len(args)')
+        code('if n > {}:'.format(len(_args)))
+        code.indent()
+        msg = ('__init__ takes up to {} positional arguments '
+               .format(len(_args)) + '({} given)')
+        code('raise TypeError({!r}.format(n))'.format(msg))
+        code.dedent()
+
+    for key in sorted(defaults):
+        default = name('default', defaults[key])
+        if key in _args:
+            code('if n <= {} and {!r} not in kwargs:'
+                 .format(_args.index(key), key))
+        else:
+            code('if {!r} not in kwargs:'.format(key))
+        code.indent()
+        code('kwargs[{!r}] = {}'.format(key, default))
+        code.dedent()
+
+    for k, key in enumerate(_args):
+        code('if n > {}:'.format(k))
+        code.indent()
+        code('if {!r} in kwargs:'.format(key))
+        code.indent()
+        code('raise TypeError({!r})'.format(
+            '__init__ got multiple values for argument {}'.format(key)))
+        code.dedent()
+        code('kwargs[{!r}] = args[{}]'.format(key, k))
+        code.dedent()
+
+    if opts.get('coerce_args', False):
+        types = name('types', attrs.types)
+        code('for key, value in list(kwargs.items()):')
+        code.indent()
+        code('typ = {}[key]'.format(types))
+        code('if not typ.query(value):')
+        code.indent()
+        code('kwargs[key] = typ.coerce(value)')
+        code.dedent()
+        code.dedent()
+
+    if opts.get('optional_none', False):
+        for attr in sorted(attrs.optional):
+            code('if {!r} not in kwargs:'.format(attr))
+            code.indent()
+            code('kwargs[{!r}] = None'.format(attr))
+            code.dedent()
+
+    for attr in sorted(attrs.call):
+        call = name('call', attrs.call[attr])
+        code('value = kwargs.get({!r}, None)'.format(attr))
+        code('kwargs[{0!r}] = {1}() if value is None else {1}(value)'
+             .format(attr, call))
+
+    code('for attr, val in kwargs.items():')
+    code.indent()
+    code('setattr(self, attr, val)')
+    code.dedent()
+
+    init_order = tuple(cls._seq_opts.get('init_order', ()))
+    init_attrs = list(init_order)
+    init_attrs += sorted(set(attrs.init) - set(init_order))
+    for attr in init_attrs:
+        code('if not hasattr(self, {!r}):'.format(attr))
+        code.indent()
+        if attr in attrs.init:
+            init = name('init', attrs.init[attr])
+            code('setattr(self, {0!r}, {1}(self))'.format(attr, init))
+        else:
+            code('raise KeyError({!r})'.format(attr))
+        code.dedent()
+
+    for hook in cls._data.init_hooks:
+        code('{}(self)'.format(name('hook', hook)))
+
+    if opts.get('init_validate', False):
+        code('self.validate()')
+
+    body = code.source()
+    source = 'def __init__(self, *args, **kwargs):\n' + body
+    return source, ns
+
+
+def compile_init(cls):
+    '''Returns a specialized __init__ function for cls.'''
+    source, ns = generate_init(cls)
+    filename = '<syn generated {}.__init__>'.format(cls.__name__)
+    return compile_function('__init__', source, ns, filename)
+
+
+#-------------------------------------------------------------------------------
+# validate
+
+
+_MISSING = object()
+
+def validation_error(attr, typ, value):
+    '''Raises the TypeError reported by Base.validate(), if value is not
+    valid for typ.
+    '''
+    res, e = typ.query_exception(value)
+    if not res:
+        raise TypeError('Validation error for attribute {}: {}'.
+                        format(attr, message(e)))
+
+
+def generate_validate(cls):
+    '''Returns the source and namespace of a specialized validate() for cls.
+
+    Attributes of TypeType, typelist MultiType, and AnyType are checked
+    inline; all other types are checked via Type.query_exception().
+    '''
+    ns = dict(_missing=_MISSING, _error=validation_error)
+    attrs = cls._attrs
+    optional = attrs.optional
+    optional_none = cls._opts.get('optional_none', False)
+    code = CodeBuilder(indent=1)
+
+    def name(prefix, obj):
+        ret = '_{}{}'.format(prefix, len(ns))
+        ns[ret] = obj
+        return ret
+
+    for attr in sorted(attrs.types):
+        typ = attrs.types[attr]
+
+        code('value = getattr(self, {!r}, _missing)'.format(attr))
+        if attr in optional:
+            cond = 'value is not _missing'
+            if optional_none:
+                cond += ' and value is not None'
+        else:
+            code('if value is _missing:')
+            code.indent()
+            code('raise AttributeError({!r})'.format(
+                'Required attribute {} not defined'.format(attr)))
+            code.dedent()
+            cond = ''
+
+        if type(typ) is AnyType:
+            continue
+        elif type(typ) is TypeType:
+            check = 'not isinstance(value, {})'.format(name('type', typ.type))
+        elif type(typ) is MultiType and typ.is_typelist:
+            check = 'not isinstance(value, {})'.format(name('types',
+                                                            tuple(typ.typelist)))
+        else:
+            check = ''
+
+        conds = [c for c in (cond, check) if c]
+        if conds:
+            code('if {}:'.format(' and '.join(conds)))
+            code.indent()
+        code('_error({!r}, {}, value)'.format(attr, name('typ', typ)))
+        if conds:
+            code.dedent()
+
+    code('return None')
+    source = 'def validate(self):\n' + code.source()
+    return source, ns
+
+
+def compile_validate(cls):
+    '''Returns a specialized validate() function for cls.'''
+    source, ns = generate_validate(cls)
+    filename = '<syn generated {}.validate>'.format(cls.__name__)
+    return compile_function('validate', source, ns, filename)
+
+
+#-------------------------------------------------------------------------------
+# serialize
+
+
+# The keyword arguments that Base._serialize passes to nested values
+SERIALIZE_KWARGS = dict(exclude=['getstate_exclude'])
+
+# Serialized string values are built inline from these templates
+SER_STRINGS = {typ: Type._serialize_dict(typ)
+               for typ in set([str, six.text_type])}
+
+def _serialize_namespace():
+    return dict(_missing=_MISSING,
+                _idempotent=frozenset(SER_IDEMPOTENT),
+                _strings=SER_STRINGS,
+                _name=SER_KEYS.name,
+                _mod=SER_KEYS.mod,
+                _args=SER_KEYS.args,
+                _kwargs=SER_KEYS.kwargs)
+
+
+def generate_serialize(cls):
+    '''Returns the source and namespace of a specialized _serialize() for cls.
+
+    The generated function is equivalent to Base._serialize called
+    without keyword arguments.  Values of idempotent types and strings
+    are serialized inline; all others are passed to serialize().
+    '''
+    ns = _serialize_namespace()
+    ns.update(_serialize_value=serialize,
+              _serialize_kwargs=SERIALIZE_KWARGS)
+    exclude = cls._groups.union('getstate_exclude')
+    code = CodeBuilder(indent=1)
+
+    code('kw = {}')
+    for attr in sorted(attr for attr in cls._attrs.types
+                       if attr not in exclude):
+        code('value = getattr(self, {!r}, _missing)'.format(attr))
+        code('if value is not _missing:')
+        code.indent()
+        code('typ = type(value)')
+        code('if typ in _idempotent:')
+        code.indent()
+        code('kw[{!r}] = value'.format(attr))
+        code.dedent()
+        code('elif typ in _strings:')
+        code.indent()
+        code('ser = dict(_strings[typ])')
+        code('ser[_args] = [value]')
+        code('kw[{!r}] = ser'.format(attr))
+        code.dedent()
+        code('else:')
+        code.indent()
+        code('kw[{!r}] = _serialize_value(value, **_serialize_kwargs)'
+             .format(attr))
+        code.dedent()
+        code.dedent()
+
+    code('dct[_kwargs] = kw')
+    code('return dct')
+    source = 'def _serialize(self, dct):\n' + code.source()
+    return source, ns
+
+
+def compile_serialize(cls):
+    '''Returns a specialized _serialize() function for cls.'''
+    source, ns = generate_serialize(cls)
+    filename = '<syn generated {}._serialize>'.format(cls.__name__)
+    return compile_function('_serialize', source, ns, filename)
+
+
+def generate_deserialize(cls):
+    '''Returns the source and namespace of a specialized deserializer for
+    cls.
+
+    The generated function takes a dict produced by Base._serialize and
+    returns the equivalent of Type.deserialize(dct).  Idempotent values
+    and serialized strings are deserialized inline.
+    '''
+    ns = _serialize_namespace()
+    ns.update(_cls=cls, _deserialize=deserialize,
+              _strnames={val[SER_KEYS.name]: typ
+                         for typ, val in SER_STRINGS.items()},
+              _builtins='six.moves.builtins')
+    code = CodeBuilder(indent=1)
+
+    code('kw = {}')
+    code('for key, value in dct[_kwargs].items():')
+    code.indent()
+    code('typ = type(value)')
+    code('if typ in _idempotent:')
+    code.indent()
+    code('kw[key] = value')
+    code('continue')
+    code.dedent()
+    code('if typ is dict and len(value) == 3 and '
+         'value.get(_mod) == _builtins:')
+    code.indent()
+    code('styp = _strnames.get(value.get(_name))')
+    code('args = value.get(_args)')
+    code('if styp is not None and type(args) is list and len(args) == 1 '
+         'and type(args[0]) is styp:')
+    code.indent()
+    code('kw[key] = args[0]')
+    code('continue')
+    code.dedent()
+    code.dedent()
+    code('kw[key] = _deserialize(value, **kwargs)')
+    code.dedent()
+
+    code('obj = _cls(**kw)')
+    if callable(getattr(cls, '_deserialize', None)):
+        code('obj._deserialize(dct)')
+    code('return obj')
+    source = 'def deserialize(dct, **kwargs):\n' + code.source()
+    return source, ns
+
+
+def compile_deserialize(cls):
+    '''Returns a specialized deserializer for cls.'''
+    source, ns = generate_deserialize(cls)
+    filename = '<syn generated {}.deserialize>'.format(cls.__name__)
+    return compile_function('deserialize', source, ns, filename)
+
+
+#-------------------------------------------------------------------------------
+# __all__
+
+__all__ = ('CodeBuilder', 'compile_function', 'lazy_compile',
+           'generate_init', 'compile_init',
+           'validation_error', 'generate_validate', 'compile_validate',
+           'SERIALIZE_KWARGS', 'SER_STRINGS', 'generate_serialize',
+           'compile_serialize', 'generate_deserialize', 'compile_deserialize')
+
+#-------------------------------------------------------------------------------
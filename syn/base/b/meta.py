@@ -1,17 +1,21 @@
 from collections import defaultdict
 from copy import copy
+from weakref import WeakKeyDictionary
 from syn.five import STR
 from syn.base.a import Base
 from syn.type.a import Type, This
-from syn.type.a.ext import Callable, Sequence
+from syn.type.a.ext import Callable, Sequence, ValidationPolicy, \
+    ValidateIncremental
 from syn.base_utils import GroupDict, AttrDict, SeqDict, ReflexiveDict,\
-    callables, rgetattr, hasmethod, getfunc, Precedes, topological_sorting
+    rgetattr, hasmethod, Precedes, topological_sorting, callables
 from functools import partial
 
 from syn.base.a.meta import Attr as _Attr
 from syn.base.a.meta import Attrs as _Attrs
 from syn.base.a.meta import Meta as _Meta
-from syn.base.a.meta import combine, preserve_attr_data
+from syn.base.a.meta import preserve_attr_data
+from .codegen import compile_init, compile_validate, compile_serialize, \
+    compile_deserialize, lazy_compile
 
 _OAttr = partial(_Attr, optional=True)
 
@@ -31,7 +35,9 @@ dict(type = _OAttr(None, doc='Type of the attribute'),
      internal = _Attr(bool, False, 'Not treated as a constructor argument'),
      init = _OAttr(Callable, doc='Will be called with the object as the only '
                    'parameter for initializing the attribute'),
-     override_parent = _OAttr(bool, False, 'Skip preserve_attr_data for this attr')
+     override_parent = _OAttr(bool, False, 'Skip preserve_attr_data for this attr'),
+     policy = _OAttr(ValidationPolicy, doc='Validation policy for the items '
+                     'of a Sequence or Mapping type')
     )
 
 #-------------------------------------------------------------------------------
@@ -70,6 +76,54 @@ def create_hook(f):
     f.is_create_hook = _CreateHook
     return f
 
+#-------------------------------------------------------------------------------
+# Hook Scanning
+
+# Maps hook marker attributes to their marker types
+HOOK_TYPES = dict(is_pre_create_hook = _PreCreateHook,
+                  is_create_hook = _CreateHook)
+
+# Sorted pre-create hooks, by set of hooks
+_PRE_CREATE_ORDER = {}
+
+# Non-dunder attributes defined directly on each class
+_CLASS_MEMBERS = WeakKeyDictionary()
+
+# Incremented whenever a hook is added to, replaced on or removed from a
+# Meta class, so that hooks gathered before the change are gathered again
+_GENERATION = [0]
+
+def _unwrap(value):
+    if isinstance(value, (classmethod, staticmethod)):
+        return value.__func__
+    return value
+
+def _own_members(cls):
+    '''Returns {name: function} for the non-dunder attributes defined
+    directly on cls, memoized per class.
+    '''
+    ret = _CLASS_MEMBERS.get(cls)
+    if ret is None:
+        ret = {name: _unwrap(value) for name, value in vars(cls).items()
+               if not name.startswith('__')}
+        _CLASS_MEMBERS[cls] = ret
+    return ret
+
+def find_hooks(cls):
+    '''Returns {marker attribute: {name: function}} for all registered hook
+    types, resolving names along the MRO of cls in a single pass.
+    '''
+    members = {}
+    for c in reversed(cls.__mro__):
+        members.update(_own_members(c))
+
+    ret = {attr: {} for attr in HOOK_TYPES}
+    for name, f in members.items():
+        for attr, typ in HOOK_TYPES.items():
+            if getattr(f, attr, None) is typ:
+                ret[attr][name] = f
+    return ret
+
 #-------------------------------------------------------------------------------
 # Data Object (for metaclass-populated values)
 
@@ -91,6 +145,11 @@ class Attr(Base):
     def __init__(self, *args, **kwargs):
         super(Attr, self).__init__(*args, **kwargs)
         self.type = Type.dispatch(self.type)
+        if self.policy is not None:
+            if not hasattr(self.type, 'with_policy'):
+                raise TypeError('Validation policies apply only to Sequence '
+                                'and Mapping types: {}'.format(self.type))
+            self.type = self.type.with_policy(self.policy)
         self.validate()
 
 
@@ -104,6 +163,10 @@ class Attrs(_Attrs):
         self.call = {attr: spec.call for attr, spec in self.items() 
                      if spec.call is not None}
         self.internal = {attr for attr, spec in self.items() if spec.internal}
+        self.wrap = {attr: spec.type.wrap for attr, spec in self.items()
+                     if isinstance(getattr(spec.type, 'policy', None),
+                                   ValidateIncremental)
+                     and hasattr(spec.type, 'wrap')}
 
         # Process attr groups
         self.groups = defaultdict(set)
@@ -129,6 +192,7 @@ class Meta(_Meta):
     def __new__(cls, clsname, bases, dct):
         clsdata = dict(clsname=clsname, bases=bases, dct=dct)
         cls._process_pre_create_hooks(clsdata)
+        cls._synthesize_slots(clsdata)
         ret = super(Meta, cls).__new__(cls, clsdata['clsname'], 
                                        clsdata['bases'], clsdata['dct'])
         return ret
@@ -146,24 +210,95 @@ class Meta(_Meta):
                     hooks.add(hook)
                     names[hook.__name__] = hook
 
-        relations = [copy(hook.hook_order) for hook in hooks 
-                     if isinstance(hook.hook_order, Precedes)]
-        # The preferred method of specifying order relations is by name;
-        # Resolve names if present
-        for rel in relations:
-            rel.A = names[rel.A] if isinstance(rel.A, STR) else rel.A
-            rel.B = names[rel.B] if isinstance(rel.B, STR) else rel.B
+        key = frozenset(hooks)
+        hook_list = _PRE_CREATE_ORDER.get(key)
+        if hook_list is None:
+            relations = [copy(hook.hook_order) for hook in hooks 
+                         if isinstance(hook.hook_order, Precedes)]
+            # The preferred method of specifying order relations is by name;
+            # Resolve names if present
+            for rel in relations:
+                rel.A = names[rel.A] if isinstance(rel.A, STR) else rel.A
+                rel.B = names[rel.B] if isinstance(rel.B, STR) else rel.B
+
+            hook_list = topological_sorting(hooks, relations)
+            _PRE_CREATE_ORDER[key] = hook_list
 
-        hook_list = topological_sorting(hooks, relations)
         for hook in hook_list:
             hook(clsdata)
 
+    @classmethod
+    def _synthesize_slots(cls, clsdata):
+        dct = clsdata['dct']
+        if '__slots__' in dct:
+            return
+
+        slots = dct.get('_opts', {}).get('slots', None)
+        if slots is None:
+            for base in clsdata['bases']:
+                opts = getattr(base, '_opts', {})
+                if 'slots' in opts:
+                    slots = opts['slots']
+                    break
+        if not slots:
+            return
+
+        names = set(dct.get('_attrs', {}))
+        for base in clsdata['bases']:
+            names.update(getattr(base, '_attrs', {}))
+
+        # Skip names that are already slots or class attributes, so
+        # that existing descriptors are not shadowed
+        taken = set(dct)
+        for base in clsdata['bases']:
+            for c in base.__mro__:
+                taken.update(vars(c))
+
+        dct['__slots__'] = tuple(sorted(names - taken))
+
     def __init__(self, clsname, bases, dct):
         super(Meta, self).__init__(clsname, bases, dct)
 
         self._populate_data()
         self._combine_groups()
         self._process_create_hooks()
+        self._compile_methods()
+
+    def __setattr__(self, attr, value):
+        super(Meta, self).__setattr__(attr, value)
+        self._update_hooks(attr, value)
+
+    def __delattr__(self, attr):
+        super(Meta, self).__delattr__(attr)
+        self._update_hooks(attr)
+
+    def _update_hooks(self, attr, value=None):
+        '''Invalidates the memoized hooks if attr is or becomes a hook.'''
+        if attr.startswith('__'):
+            return
+        _CLASS_MEMBERS.pop(self, None)
+
+        data = vars(self).get('_data')
+        hooks = vars(data).get('hooks', {}) if data is not None else {}
+        f = _unwrap(value)
+        if any(attr in names for names in hooks.values()) or \
+                any(getattr(f, marker, None) is typ
+                    for marker, typ in HOOK_TYPES.items()):
+            _GENERATION[0] += 1
+
+    def _find_hooks(self, hook_attr, hook_type):
+        '''Returns the (bound) hooks of the given kind, sorted by name.'''
+        if HOOK_TYPES.get(hook_attr) is not hook_type:
+            # Hook kinds not in HOOK_TYPES are found by scanning
+            funcs = callables(self)
+            return [funcs[name] for name in sorted(funcs)
+                    if getattr(funcs[name], hook_attr, None) is hook_type]
+
+        if self._data.hooks_generation != _GENERATION[0]:
+            self._data.hooks = find_hooks(self)
+            self._data.hooks_generation = _GENERATION[0]
+        hooks = self._data.hooks[hook_attr]
+        return [getattr(self, name) for name in sorted(hooks)]
 
     def _get_opt(self, name='', default=None, opts='_opts'):
         attr = '{}.{}'.format(opts, name)
@@ -175,16 +310,20 @@ class Meta(_Meta):
         
     def _populate_data(self):
         self._data = Data()
+        self._data.attrs_cache = {}
         opt = Meta._get_opt
 
         # Generate attr display order
         self._data.attr_display_order = sorted(self._attrs.keys())
 
+        # Gather all hooks in a single pass
+        self._data.hooks = find_hooks(self)
+        self._data.hooks_generation = _GENERATION[0]
+
         # Gather persistent pre-create hooks
         self._data.pre_create_hooks = \
-            {getfunc(f) for f in callables(self).values()
-             if getattr(f, 'is_pre_create_hook', None) is _PreCreateHook
-             and getattr(f, 'persist', False)}
+            {f for f in self._data.hooks['is_pre_create_hook'].values()
+             if getattr(f, 'persist', False)}
 
         # Generate attr documentation order
         tmp = []
@@ -217,14 +356,32 @@ class Meta(_Meta):
                             c._data.subclasses = lst
 
     def _process_create_hooks(self):
-        funcs = callables(self)
-        hooks = [f for f in funcs.values() 
-                 if getattr(f, 'is_create_hook', None) is _CreateHook]
+        hooks = self._find_hooks('is_create_hook', _CreateHook)
         self._data.create_hooks = list(self._data.create_hooks) + hooks
 
         for hook in self._data.create_hooks:
             hook()
 
+    def _compile_methods(self):
+        # Compilation is deferred until the methods are first called
+        self._data.compiled_init = None
+        if self._get_opt('compile_init', default=False):
+            self._data.compiled_init = \
+                lazy_compile(self, 'compiled_init', compile_init)
+
+        self._data.compiled_validate = None
+        if self._get_opt('compile_validate', default=False):
+            self._data.compiled_validate = \
+                lazy_compile(self, 'compiled_validate', compile_validate)
+
+        self._data.compiled_serialize = None
+        self._data.compiled_deserialize = None
+        if self._get_opt('compile_serialize', default=False):
+            self._data.compiled_serialize = \
+                lazy_compile(self, 'compiled_serialize', compile_serialize)
+            self._data.compiled_deserialize = \
+                lazy_compile(self, 'compiled_deserialize', compile_deserialize)
+
     def _combine_groups(self):
         if not hasattr(self, '_groups'):
             self._groups = GroupDict()
@@ -236,14 +393,38 @@ class Meta(_Meta):
                 if name not in self._attrs.groups:
                     self._attrs.groups[name] = set()
 
+        # Equivalent to combine(), but group members are strings, so only
+        # the sets need to be copied
         groups = self._attrs.groups
         for base in self._class_data.bases:
             if hasattr(base, '_groups'):
-                groups = combine(base._groups, groups)
+                base_groups = base._groups
+                ret = type(base_groups)()
+                for name, members in base_groups.items():
+                    ret[name] = set(members)
+                ret.update(groups)
+                groups = ret
         self._groups = groups
         self._groups['_all'] = self._attrs.attrs
         self._groups['_internal'] = self._attrs.internal
 
+    def _get_doc(self):
+        data = self.__dict__.get('_data')
+        if data is not None:
+            if data.render_doc:
+                data.render_doc = False
+                data.doc = self._render_documentation()
+            if 'doc' in vars(data):
+                return data.doc
+        return self.__dict__.get('__doc__')
+
+    def _set_doc(self, value):
+        self._data.render_doc = False
+        self._data.doc = value
+
+    # Allows autodoc rendering to be deferred until __doc__ is read
+    __doc__ = property(_get_doc, _set_doc)
+
     def groups_enum(self):
         '''Returns an enum-ish dict with the names of the groups defined for this class.
         '''
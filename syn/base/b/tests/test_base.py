@@ -1,7 +1,7 @@
 import six.moves.cPickle as pickle
 from copy import copy
 from nose.tools import assert_raises
-from syn.five import STR
+from syn.five import STR, PY2
 from syn.base.b import Base, Attr, init_hook, coerce_hook, setstate_hook, \
     pre_create_hook, Harvester
 from syn.type.a import Type, Schema, List, Set
@@ -274,6 +274,45 @@ def test_coerce_classmethod():
     t6 = Type.dispatch(CT6)
     assert t6.coerce(dict(a = 1)) == CT6(a = 5)
 
+def test_coerce_many():
+    values = [dict(a=1, b=dict(a=2, b=3), c=4), 
+              dict(a=1, b=dict(a=2, b=3.1), c=4),
+              dict(a='5', b=dict(a=6, b=CT1(7)), c=CT1(8)),
+              dict(a=1, b=dict(a=2, b=3), c=4, d=5)]
+    obj1 = CT3.coerce(values[0])
+    obj2 = CT3.coerce(values[2])
+
+    errors = []
+    assert CT3.coerce_many(values, errors=errors) == [obj1, obj2]
+    assert [k for k, e in errors] == [1, 3]
+    assert isinstance(errors[0][1], TypeError)
+    assert isinstance(errors[1][1], KeyError)
+
+    assert_raises(TypeError, CT3.coerce_many, values)
+    assert CT3.coerce_many(values[:1] * 5, chunk_size=2) == [obj1] * 5
+
+    errors = []
+    gen = CT3.coerce_many(values, errors=errors, lazy=True, chunk_size=1)
+    assert next(gen) == obj1
+    assert errors == []
+    assert next(gen) == obj2
+    assert [k for k, e in errors] == [1]
+    assert list(gen) == []
+    assert [k for k, e in errors] == [1, 3]
+
+    # Non-mappings, coerce_args, and coerce hooks
+    assert CT1.coerce_many([1, {'a': 1.2}, [1, 2]], errors=[]) == \
+        [CT1(1), CT1(1)]
+    assert CT2.coerce_many([dict(a=1, b=2)]) == [CT2(a=1, b=CT1(2))]
+    assert CT6.coerce_many([dict(a=1), dict(a=2)]) == [CT6(a=5), CT6(a=6)]
+
+    class CT7(CT1):
+        @classmethod
+        def coerce(cls, value, **kwargs):
+            return cls(value + 1)
+
+    assert CT7.coerce_many([1, 2]) == [CT7(2), CT7(3)]
+
 #-------------------------------------------------------------------------------
 # Init & setstate hooks
 
@@ -475,9 +514,26 @@ class ADOC(Base):
         super(ADOC, self).__init__(*args, **kwargs)
 
 class ADOC2(Base):
+    '''Unrendered.'''
     _opts = dict(autodoc = False)
 
 def test_class_auto_documentation():
+    # Rendering is deferred until __doc__ is accessed
+    class ADOC3(ADOC):
+        pass
+
+    if PY2:
+        assert ADOC3._data.render_doc is True
+        assert ADOC3.__doc__.startswith('ADOC3(a, [b], [c=2], **kwargs)')
+        assert 'Some documentation' not in ADOC3.__doc__
+        assert ADOC3._data.render_doc is False
+        assert 'Some documentation' in ADOC.__doc__
+    assert ADOC2.__doc__ == 'Unrendered.'
+    assert not ADOC2._data.render_doc
+
+    ADOC3.__doc__ = 'Overridden.'
+    assert ADOC3.__doc__ == 'Overridden.'
+
     assert ADOC._generate_documentation_signature(ADOC._opts.args) == \
         'ADOC(a, [b], [c=2], **kwargs)'
 
@@ -543,6 +599,74 @@ def test_custom_hashability():
     assert hash(o1) == hash(1)
     assert hash(o2) != hash(o1)
 
+class CHash5(Base):
+    _opts = dict(make_hashable = True)
+    _attrs = dict(a = Attr(int),
+                  b = Attr(int))
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.a == other.a
+
+    def _hashable(self, **kwargs):
+        return ('CHash5', self.a)
+
+class CHash6(CHash5):
+    _opts = dict(cache_hash = True)
+
+def test_custom_hashable():
+    for cls in (CHash5, CHash6):
+        o1 = cls(a=1, b=2)
+        o2 = cls(a=1, b=3)
+        assert o1 == o2
+        assert hash(o1) == hash(o2) == hash(('CHash5', 1))
+        assert len({o1, o2}) == 1
+
+class CHash3(Base):
+    _opts = dict(make_hashable = True,
+                 cache_hash = True)
+    _attrs = dict(a = Attr(int),
+                  b = Attr(list, optional=True),
+                  c = Attr(float, optional=True, group='hash_exclude'))
+
+class CHash4(CHash3):
+    _attrs = dict(d = Attr(int, optional=True))
+
+def test_hash_caching():
+    assert CHash3._data.hash_attrs == frozenset(['a', 'b'])
+    assert CHash4._data.hash_attrs == frozenset(['a', 'b', 'd'])
+    assert CHash3.__setattr__ == CHash4.__setattr__
+
+    o1 = CHash3(a=1, b=[1, 2])
+    o2 = CHash3(a=1, b=[1, 2])
+    h = hash(o1)
+    assert h == hash(o2)
+    assert o1._hash_cache_ == h
+    assert hash(o1) == h
+
+    o1.c = 2.3
+    assert o1._hash_cache_ == h
+
+    o1.a = 2
+    assert o1._hash_cache_ is None
+    assert hash(o1) != h
+    o1.a = 1
+    assert hash(o1) == h
+
+    del o1.b
+    assert o1._hash_cache_ is None
+    assert hash(o1) == hash(CHash3(a=1))
+
+    o4 = CHash4(a=1, d=2)
+    h4 = hash(o4)
+    o4.d = 3
+    assert hash(o4) != h4
+    assert hash(o4) == hash(CHash4(a=1, d=3))
+
+    # The uncached hash is streamed from the same values
+    o5 = CHash2(a=1, b=2.3)
+    assert hash(o5) == hash(CHash2(a=1, b=2.3))
+    assert hash(o5) != hash(CHash2(a=1, b=2.4))
+
 #-------------------------------------------------------------------------------
 # Test BaseType
 
@@ -564,6 +688,19 @@ def test_basetype():
     assert_raises(TypeError, attrs, obj, include=['_internal'],
                   exclude=['hash_exclude'])
 
+    assert BTTest._data.attrs_cache[((), ('hash_exclude',))] == ('b',)
+    obj2 = BTTest(a=2)
+    del obj2.b
+    assert pairs(obj2, exclude=['hash_exclude']) == []
+    assert pairs(obj2) == [('a', 2), ('c', 'abc')]
+    assert attrs(obj2) == ['a', 'c']
+
+    # Instance-level groups bypass the cache
+    obj2._groups = copy(BTTest._groups)
+    obj2._groups['hash_exclude'] = set(['c'])
+    assert attrs(obj2, exclude=['hash_exclude']) == ['a']
+    assert attrs(obj, exclude=['hash_exclude']) == ['b']
+
 #-------------------------------------------------------------------------------
 # Test syn.types functionality
 
@@ -747,6 +884,110 @@ def test_copy():
     assert c3.copy(exclude=['eq_exclude']).to_dict() == \
         dict(a=1, b=2.3, c='abc', d=[1,2])
 
+class FastCopyTest(CopyTest2):
+    _opts = dict(fast_copy = True)
+    _seq_opts = dict(init_hooks = ('_count',),
+                     setstate_hooks = ('_restored',))
+
+    def _count(self):
+        self.inits = getattr(self, 'inits', 0) + 1
+
+    def _restored(self):
+        self.restored = True
+
+def test_fast_copy():
+    c = FastCopyTest(1, 2.3, 'abc', d=[1, 2], e=[3, 4])
+    assert c.inits == 1
+    assert not hasattr(c, 'restored')
+
+    c2 = c.copy()
+    assert c2.to_dict() == dict(a=1, b=2.3, c='abc', d=[1, 2])
+    assert c2.d == c.d and c2.d is not c.d
+    assert c2.restored is True
+    assert c2._from_copy_ is True
+    assert not hasattr(c2, 'inits')
+
+#-------------------------------------------------------------------------------
+# Slots
+
+class SlotsTest(Base):
+    _opts = dict(slots = True,
+                 args = ('a', 'b'),
+                 make_hashable = True)
+    _attrs = dict(a = Attr(int),
+                  b = Attr(float, optional=True),
+                  c = Attr(list, init=lambda self: list()),
+                  d = Attr(int, optional=True))
+    d = 5
+
+class SlotsTest2(SlotsTest):
+    _attrs = dict(e = Attr(int, optional=True))
+
+class SlotsTest3(SlotsTest2):
+    _opts = dict(slots = False)
+    _attrs = dict(f = Attr(int, optional=True))
+
+def test_slots():
+    assert SlotsTest.__slots__ == ('a', 'b', 'c')
+    assert SlotsTest2.__slots__ == ('e',)
+    assert '__slots__' not in vars(SlotsTest3)
+    assert '__slots__' not in vars(CopyTest)
+
+    s = SlotsTest2(1, 2.3, e=3)
+    assert s.to_dict() == dict(a=1, b=2.3, c=[], d=5, e=3)
+    assert s.__getstate__() == s.to_dict()
+    assert_equivalent(s, s.copy())
+    assert_pickle_idempotent(s)
+    assert hash(s) == hash(SlotsTest2(1, 2.3, e=3))
+    s.validate()
+
+    s = SlotsTest2(1)
+    assert not hasattr(s, 'b')
+    assert s.to_dict() == dict(a=1, c=[], d=5)
+    assert_equivalent(s, copy(s))
+
+    s = SlotsTest3(1, f=2)
+    assert s.to_dict() == dict(a=1, c=[], d=5, f=2)
+    assert vars(s) == dict(f=2)
+
+#-------------------------------------------------------------------------------
+# Equality
+
+class EqTest(Base):
+    _attrs = dict(a = Attr(int, optional=True),
+                  b = Attr(float, optional=True, group='eq_exclude'),
+                  c = Attr(object, optional=True))
+
+class EqTest2(EqTest):
+    _opts = dict(iterative_eq = True)
+
+class Unequal(object):
+    def __eq__(self, other):
+        return False
+
+def test_eq():
+    for cls in (EqTest, EqTest2):
+        assert cls(a=1, b=1.0) == cls(a=1, b=2.0)
+        assert cls(a=1) != cls(a=2)
+        assert cls(a=1) != cls(a=1, c=None)
+        assert cls(a=1) != EqTest3(a=1)
+
+        # Identical values are equal, regardless of their __eq__
+        u = Unequal()
+        obj = cls(c=u)
+        assert obj == obj
+        assert obj == cls(c=u)
+        assert obj != cls(c=Unequal())
+
+        assert cls(c=[cls(a=1), (cls(a=2),)]) == cls(c=[cls(a=1), (cls(a=2),)])
+        assert cls(c=[cls(a=1), (cls(a=2),)]) != cls(c=[cls(a=1), (cls(a=3),)])
+        assert cls(c=[cls(a=1)]) != cls(c=[cls(a=1), cls(a=1)])
+        assert cls(c={1: cls(a=1)}) == cls(c={1: cls(a=1)})
+        assert cls(c={1: cls(a=1)}) != cls(c={1: cls(a=2)})
+
+class EqTest3(EqTest):
+    pass
+
 #-------------------------------------------------------------------------------
 # Update functionality
 
@@ -0,0 +1,256 @@
+from nose.tools import assert_raises
+from syn.five import STR
+from syn.base.b import Base, Attr, init_hook
+from syn.base.b.codegen import CodeBuilder, compile_function, generate_init, \
+    generate_validate, generate_serialize, generate_deserialize
+from syn.types import serialize, deserialize, SER_KEYS
+from syn.type.a import Schema, List, ValidateFirst, ValidateIncremental, \
+    CheckedList
+from syn.schema.b.sequence import Sequence
+
+#-------------------------------------------------------------------------------
+# Utilities
+
+def test_codebuilder():
+    code = CodeBuilder()
+    code('def f(x):')
+    code.indent()
+    code('return x + y')
+    code.dedent()
+    assert code.source() == 'def f(x):\n    return x + y\n'
+
+    f = compile_function('f', code.source(), dict(y=2))
+    assert f(1) == 3
+    assert f._source == code.source()
+
+#-------------------------------------------------------------------------------
+# __init__
+
+class A(Base):
+    _opts = dict(args = ('a', 'b'),
+                 coerce_args = True,
+                 optional_none = True,
+                 init_validate = True)
+    _attrs = dict(a = Attr(int),
+                  b = Attr(float, 1.5),
+                  c = Attr(int, call=lambda x=0: x + 1),
+                  d = Attr(list, init=lambda self: [self.a]),
+                  e = Attr(STR, optional=True))
+
+    @init_hook
+    def _hook(self):
+        self.d.append(self.b)
+
+class A2(A):
+    _opts = dict(compile_init = False)
+
+def test_compiled_init():
+    assert A._data.compiled_init
+    assert A2._data.compiled_init is None
+    assert 'setattr' in generate_init(A)[0]
+
+    for cls in (A, A2):
+        obj = cls('1')
+        assert obj.to_dict() == dict(a=1, b=1.5, c=1, d=[1, 1.5], e=None)
+
+        obj = cls(2, 3, c=4, e=u'abc')
+        assert obj.to_dict() == dict(a=2, b=3.0, c=5, d=[2, 3.0], e=u'abc')
+
+        obj = cls(b=2, a=3, d=[])
+        assert obj.to_dict() == dict(a=3, b=2.0, c=1, d=[2.0], e=None)
+
+        with assert_raises(TypeError) as cm:
+            cls(1, 2, 3)
+        assert str(cm.exception) == \
+            '__init__ takes up to 2 positional arguments (3 given)'
+
+        with assert_raises(TypeError) as cm:
+            cls(1, 2, b=3)
+        assert str(cm.exception) == \
+            '__init__ got multiple values for argument b'
+
+        assert_raises(KeyError, cls, 1, f=3)
+
+    assert A(1, 2) == A(a=1, b=2)
+    assert A(1, 2) != A2(1, 2)
+    assert A(1, 2).to_dict() == A2(1, 2).to_dict()
+
+class B(Base):
+    _attrs = dict(a = Attr(int))
+
+class B2(B):
+    _attrs = dict(b = Attr(int, init=lambda self: self.a + 1))
+
+def test_compiled_init_inheritance():
+    obj = B2(a=1)
+    assert obj.to_dict() == dict(a=1, b=2)
+
+    # Positional arguments are ignored when none are declared
+    obj = B(1, a=2)
+    assert obj.to_dict() == dict(a=2)
+
+    # Undeclared keyword arguments are still set
+    obj = B(a=3, _from_copy_=True)
+    assert obj._from_copy_ is True
+
+#-------------------------------------------------------------------------------
+# validate
+
+class C(Base):
+    _attrs = dict(a = Attr(int),
+                  b = Attr((int, float), optional=True),
+                  c = Attr(None),
+                  d = Attr([1, 2], optional=True),
+                  e = Attr(Schema(Sequence(int, float))))
+
+class C2(C):
+    _opts = dict(compile_validate = False)
+
+class C3(C):
+    _opts = dict(optional_none = True)
+
+def test_compiled_validate():
+    assert C._data.compiled_validate
+    assert C2._data.compiled_validate is None
+
+    src = generate_validate(C)[0]
+    assert "isinstance(value" in src
+    assert "_error('d'" in src
+
+    for cls in (C, C2, C3):
+        obj = cls(a=1, b=2.0, c=None, d=2, e=[1, 2.3])
+        obj.validate()
+        cls(a=1, c='abc', e=[1, 2.3]).validate()
+
+        def raises(typ, msg, **kwargs):
+            obj = cls(**kwargs)
+            with assert_raises(typ) as cm:
+                obj.validate()
+            if msg:
+                assert str(cm.exception) == msg
+
+        raises(AttributeError, 'Required attribute a not defined',
+               c=1, e=[1, 2.3])
+        raises(AttributeError, 'Required attribute c not defined',
+               a=1, e=[1, 2.3])
+        raises(TypeError, 'Validation error for attribute a: Expected value '
+               "of type {}; got: 1.2".format(int), a=1.2, c=1, e=[1, 2.3])
+        raises(TypeError, "Validation error for attribute b: Value 'abc' is "
+               "not any valid type: {}, {}".format(int, float), 
+               a=1, b='abc', c=1, e=[1, 2.3])
+        raises(TypeError, 'Validation error for attribute d: Invalid value: 3',
+               a=1, c=1, d=3, e=[1, 2.3])
+        raises(TypeError, 'Validation error for attribute e: Schema does not '
+               'match: [1, 2]', a=1, c=1, e=[1, 2])
+
+    C3(a=1, b=None, c=None, d=None, e=[1, 2.3]).validate()
+    assert_raises(TypeError, C(a=1, b=None, c=None, e=[1, 2.3]).validate)
+
+#-------------------------------------------------------------------------------
+# serialize
+
+class D(Base):
+    _attrs = dict(a = Attr(int),
+                  b = Attr(float, optional=True),
+                  c = Attr(STR, optional=True, group='text'),
+                  d = Attr(list, optional=True),
+                  e = Attr(object, optional=True),
+                  f = Attr(int, group='getstate_exclude', optional=True))
+
+class D2(D):
+    _opts = dict(compile_serialize = False)
+
+class D3(D):
+    def _deserialize(self, dct):
+        self.f = len(dct[SER_KEYS.kwargs])
+
+def test_compiled_serialize():
+    assert D._data.compiled_serialize
+    assert D2._data.compiled_serialize is None
+    assert D2._data.compiled_deserialize is None
+
+    src = generate_serialize(D)[0]
+    assert "'a'" in src
+    assert "'f'" not in src
+    assert "_strnames" in generate_deserialize(D)[0]
+    assert "_deserialize(dct)" in generate_deserialize(D3)[0]
+    assert "_deserialize(dct)" not in generate_deserialize(D)[0]
+
+    kwargs = [dict(a=1),
+              dict(a=1, b=2.5, c=u'abc', d=[1, u'x', (2,)], e=None),
+              dict(a=2, c='def', d=[D(a=3, c=u'g')], e=D2(a=4, b=1.0)),
+              dict(a=True, b=None, c=1.5, d=[], e=b'abc')]
+    for kw in kwargs:
+        obj = D(**kw)
+        obj2 = D2(**kw)
+        ser = serialize(obj)
+        assert ser[SER_KEYS.kwargs] == serialize(obj2)[SER_KEYS.kwargs]
+        assert 'f' not in serialize(D(f=5, **kw))[SER_KEYS.kwargs]
+        assert deserialize(ser) == obj
+        assert deserialize(serialize(obj2)) == obj2
+
+        obj3 = deserialize(serialize(D3(**kw)))
+        assert type(obj3) is D3
+        assert obj3.f == len(obj3.to_dict(exclude=['getstate_exclude']))
+
+    # Non-default arguments use the generic implementation
+    obj = D(a=1, c=u'abc', f=2)
+    assert serialize(obj, exclude=['text'])[SER_KEYS.kwargs] == dict(a=1)
+    assert serialize(obj, exclude=['getstate_exclude'])[SER_KEYS.kwargs] == \
+        dict(a=1, c=serialize(u'abc'))
+
+#-------------------------------------------------------------------------------
+# Validation policies
+
+class E(Base):
+    _attrs = dict(a = Attr(List(int), policy=ValidateFirst(2)),
+                  b = Attr(List(int), policy=ValidateIncremental(),
+                           optional=True))
+
+class E2(E):
+    _opts = dict(compile_init = False)
+
+def test_policies():
+    assert_raises(TypeError, Attr, int, policy=ValidateFirst(2))
+    assert E._attrs.types['a'] == List(int, policy=ValidateFirst(2))
+    assert set(E._attrs.wrap) == {'b'}
+
+    for cls in (E, E2):
+        cls(a=[1, 2, 3.5]).validate()
+        assert_raises(TypeError, cls(a=[1, 2.5]).validate)
+        assert not hasattr(cls(a=[]), 'b')
+
+        obj = cls(a=[], b=[1, 2.5])
+        assert type(obj.b) is CheckedList
+        assert not obj.b.validated
+        assert_raises(TypeError, obj.validate)
+        obj.b[1] = 2
+        obj.validate()
+        assert not obj.b.validated
+        obj.b = obj.b
+        assert obj.b.validated
+        assert_raises(TypeError, obj.b.append, 2.5)
+        obj.b.append(3)
+        obj.validate()
+        assert obj == cls(a=[], b=[1, 2, 3])
+
+        # Values assigned after construction are wrapped as well, as a
+        # copy of the list
+        lst = [4, 5]
+        obj.b = lst
+        assert type(obj.b) is CheckedList
+        assert obj.b.validated
+        assert obj.b is not lst
+        lst.append(2.5)
+        assert obj.b == [4, 5]
+        obj.validate()
+        assert obj.b.validated and obj.b is not lst
+        assert_raises(TypeError, obj.b.append, 2.5)
+        obj.b = (4, 5)
+        assert obj.b == (4, 5)
+
+#-------------------------------------------------------------------------------
+
+if __name__ == '__main__': # pragma: no cover
+    from syn.base_utils import run_all_tests
+    run_all_tests(globals(), verbose=True, print_errors=False)
@@ -5,7 +5,8 @@ from syn.base_utils import GroupDict, AttrDict, assert_type_equivalent, \
 from syn.type.a import AnyType, TypeType
 from syn.base.b.meta import Attr, Attrs, Meta, Data
 from syn.base.a.meta import mro
-from syn.base.b.meta import create_hook, pre_create_hook
+from syn.base.b.meta import create_hook, pre_create_hook, find_hooks, \
+    HOOK_TYPES
 from functools import partial
 
 def Prec(x):
@@ -397,6 +398,52 @@ def test_preprocess_hooks():
     assert PC6.c == 30
     assert PC7.c == 60
 
+def test_find_hooks():
+    hooks = find_hooks(PC6)
+    assert set(hooks) == set(HOOK_TYPES)
+    assert hooks['is_create_hook'] == {}
+    pch = hooks['is_pre_create_hook']
+    assert sorted(pch) == ['hook1', 'hook2', 'hook3']
+    assert pch['hook1'] is getfunc(PC4.hook1)
+    assert PC6._data.pre_create_hooks == {pch['hook1'], pch['hook3']}
+
+    hooks = find_hooks(CHA)
+    assert list(hooks['is_create_hook']) == ['hook1']
+
+    _CreateHook = HOOK_TYPES['is_create_hook']
+    assert CHA._find_hooks('is_create_hook', _CreateHook) == [CHA.hook1]
+
+    # Unregistered hook kinds are found by scanning the class
+    class _FooHook(object):
+        pass
+
+    def foo(cls):
+        pass
+    foo.is_foo_hook = _FooHook
+
+    assert PC6._find_hooks('is_foo_hook', _FooHook) == []
+    PC6.foo = classmethod(foo)
+    assert PC6._find_hooks('is_foo_hook', _FooHook) == [PC6.foo]
+    assert PC6._find_hooks('is_create_hook', _FooHook) == []
+    del PC6.foo
+
+    # Hooks added or removed after class creation are found
+    @six.add_metaclass(Meta)
+    class HK(object):
+        pass
+
+    class HK2(HK):
+        pass
+
+    assert HK2._find_hooks('is_create_hook', _CreateHook) == []
+    HK.hook = classmethod(create_hook(lambda cls: None))
+    assert HK2._find_hooks('is_create_hook', _CreateHook) == [HK2.hook]
+    HK2.hook = None
+    assert HK2._find_hooks('is_create_hook', _CreateHook) == []
+    assert HK._find_hooks('is_create_hook', _CreateHook) == [HK.hook]
+    del HK.hook
+    assert HK._find_hooks('is_create_hook', _CreateHook) == []
+
 #-------------------------------------------------------------------------------
 # Test register_subclasses
 
@@ -333,10 +333,12 @@ def import_module(modname):
 def this_module(npop=1):
     '''Returns the module object of the module this function is called from
     '''
-    stack = inspect.stack()
-    st = stack[npop]
-    frame = st[0]
-    return inspect.getmodule(frame)
+    # inspect.stack() reads the source of every frame, which is slow
+    frame = sys._getframe(npop)
+    mod = sys.modules.get(frame.f_globals.get('__name__'))
+    if mod is None:
+        mod = inspect.getmodule(frame)
+    return mod
 
 that_module = partial(this_module, npop=2)
 
@@ -417,13 +417,18 @@ def test_import_module():
     assert vars(m3).keys() == vars(os).keys()
 
 def test_this_module():
-    from syn.base_utils import this_module
+    from syn.base_utils import this_module, that_module
 
     this = this_module()
     assert hasattr(this, 'test_this_module')
     assert hasattr(this, 'test_import_module')
     assert this.test_this_module is test_this_module
 
+    def caller():
+        return that_module()
+    assert caller() is this
+    assert this_module(npop=0) is sys.modules['syn.base_utils.py']
+
 def test_harvest_metadata():
     from syn.base_utils import harvest_metadata
     from . import harvest1 as h1
@@ -1,7 +1,6 @@
 import os
 import collections
 from functools import partial
-from jinja2 import Template
 from syn.base_utils import AttrDict, dictify_strings, AssocDict
 from syn.base import Base
 
@@ -34,6 +33,8 @@ class Vars(Base):
         if cls._opts.env_default:
             env.update(os.environ)
 
+        from jinja2 import Template
+
         types = cls._attrs.types
         for var, val in list(value.items()):
             template = Template(val)
@@ -5,7 +5,8 @@ from functools import partial, wraps
 from syn.base_utils import get_typename, ReflexiveDict, assign
 from syn.util.log.b import StringEvent
 from syn.tree.b import Node, Tree
-from syn.base.b import create_hook, Attr, init_hook, Base, Counter
+from syn.base.b import create_hook, Attr, init_hook, Base, Counter, \
+    setstate_hook
 from syn.type.a import TypeType, MultiType, Sequence
 from syn.types.a import attrs
 
@@ -199,6 +200,13 @@ class PythonNode(Node):
         if not self._children:
             self._set_children()
         super(PythonNode, self)._init()
+
+    @setstate_hook
+    def _set_copy_child_parents(self):
+        # Copies made without __init__ still adopt their children, as _init
+        # does for copies made with it
+        if getattr(self, '_from_copy_', False):
+            self.set_child_parents(override=True)
     
     def _child_attr(self, k):
         spec = self._child_map[k]
@@ -383,6 +391,7 @@ class PythonNode(Node):
         else:
             ret._children = [c.viewable(**kwargs) for c in ret]
 
+        ret._groups = deepcopy(ret._groups)
         excl = ret._groups['str_exclude']
         excl.update(excludes)
         for attr in attrs(ret):
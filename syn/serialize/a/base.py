@@ -0,0 +1,378 @@
+'''A compact binary encoding of the output of syn.types.serialize.
+
+A stream starts with MAGIC and is followed by one or more records, each
+holding one encoded object and prefixed with its length.  Each value is
+a one-byte tag followed by its payload: integers are varints, strings
+and bytes are length-prefixed, and lists, tuples and dicts are prefixed
+with their length.  Serialized objects
+(dicts with ___name and ___mod keys) write their (mod, name) pair into
+the stream's type table the first time it is seen, and only its index
+thereafter.  String dict keys are interned in the same way.  Other
+values that serialize() leaves in place (such as complex dict keys) are
+encoded as their own serialization and deserialized when read.
+'''
+
+import struct
+from io import BytesIO
+import six
+from syn.types.a import SER_KEYS, serialize, deserialize
+
+#-------------------------------------------------------------------------------
+# Wire format
+
+MAGIC = b'SYN\x01'
+
+(NONE, TRUE, FALSE, INT, NEGINT, FLOAT, STR, BYTES, LIST, TUPLE, DICT,
+ KEY, KEYREF, OBJ, OBJREF, VALUE) = range(16)
+
+DOUBLE = struct.Struct('<d')
+
+_NAME = SER_KEYS.name
+_MOD = SER_KEYS.mod
+
+def write_varint(buf, n):
+    '''Appends the unsigned integer n to bytearray buf as a varint.'''
+    while n > 0x7f:
+        buf.append((n & 0x7f) | 0x80)
+        n >>= 7
+    buf.append(n)
+
+#-------------------------------------------------------------------------------
+# Encoder
+
+
+class Encoder(object):
+    '''Encodes objects to the binary file object fp.
+
+    The type table and interned keys are shared by all objects written
+    by the same Encoder.
+    '''
+    def __init__(self, fp):
+        self.fp = fp
+        self.keys = {}
+        self.types = {}
+        self.started = False
+
+    def encode(self, obj, buf):
+        '''Appends the encoding of the serialized value obj to buf.'''
+        typ = type(obj)
+        if typ in self._encoders:
+            return self._encoders[typ](self, obj, buf)
+        for types, method in self._fallbacks:
+            if isinstance(obj, types):
+                return method(self, obj, buf)
+        buf.append(VALUE)
+        self.encode(serialize(obj), buf)
+
+    def _encode_none(self, obj, buf):
+        buf.append(NONE)
+
+    def _encode_bool(self, obj, buf):
+        buf.append(TRUE if obj else FALSE)
+
+    def _encode_int(self, obj, buf):
+        if obj >= 0:
+            buf.append(INT)
+            write_varint(buf, obj)
+        else:
+            buf.append(NEGINT)
+            write_varint(buf, -obj - 1)
+
+    def _encode_float(self, obj, buf):
+        buf.append(FLOAT)
+        buf.extend(DOUBLE.pack(obj))
+
+    def _encode_text(self, obj, buf):
+        data = obj.encode('utf-8')
+        buf.append(STR)
+        write_varint(buf, len(data))
+        buf.extend(data)
+
+    def _encode_bytes(self, obj, buf):
+        buf.append(BYTES)
+        write_varint(buf, len(obj))
+        buf.extend(obj)
+
+    def _encode_list(self, obj, buf):
+        buf.append(LIST)
+        write_varint(buf, len(obj))
+        for item in obj:
+            self.encode(item, buf)
+
+    def _encode_tuple(self, obj, buf):
+        buf.append(TUPLE)
+        write_varint(buf, len(obj))
+        for item in obj:
+            self.encode(item, buf)
+
+    def _encode_dict(self, obj, buf):
+        name = obj.get(_NAME)
+        mod = obj.get(_MOD)
+
+        if (isinstance(name, six.string_types) and
+            isinstance(mod, six.string_types)):
+            typ = (mod, name)
+            if typ in self.types:
+                buf.append(OBJREF)
+                write_varint(buf, self.types[typ])
+            else:
+                self.types[typ] = len(self.types)
+                buf.append(OBJ)
+                self.encode(mod, buf)
+                self.encode(name, buf)
+            write_varint(buf, len(obj) - 2)
+            for key, value in obj.items():
+                if key != _NAME and key != _MOD:
+                    self.encode_key(key, buf)
+                    self.encode(value, buf)
+            return
+
+        buf.append(DICT)
+        write_varint(buf, len(obj))
+        for key, value in obj.items():
+            self.encode_key(key, buf)
+            self.encode(value, buf)
+
+    _fallbacks = ((bool, _encode_bool),
+                  (six.integer_types, _encode_int),
+                  (float, _encode_float),
+                  (six.text_type, _encode_text),
+                  (six.binary_type, _encode_bytes),
+                  (list, _encode_list),
+                  (tuple, _encode_tuple),
+                  (dict, _encode_dict))
+    _encoders = {typ: method for types, method in _fallbacks
+                 for typ in (types if isinstance(types, tuple) else (types,))}
+    _encoders[type(None)] = _encode_none
+
+    def encode_key(self, key, buf):
+        if not isinstance(key, six.string_types):
+            self.encode(key, buf)
+        elif key in self.keys:
+            buf.append(KEYREF)
+            write_varint(buf, self.keys[key])
+        else:
+            self.keys[key] = len(self.keys)
+            buf.append(KEY)
+            self.encode(key, buf)
+
+    def write(self, obj, **kwargs):
+        '''Serializes obj and writes its encoding to the stream.'''
+        buf = bytearray()
+        self.encode(serialize(obj, **kwargs), buf)
+
+        head = bytearray()
+        if not self.started:
+            head.extend(MAGIC)
+            self.started = True
+        write_varint(head, len(buf))
+        self.fp.write(bytes(head + buf))
+
+
+#-------------------------------------------------------------------------------
+# Decoder
+
+
+class Decoder(object):
+    '''Decodes objects from the binary file object fp.
+
+    Only as many bytes as are needed for each object are read from fp.
+    '''
+    def __init__(self, fp):
+        self.fp = fp
+        self.keys = []
+        self.types = []
+        self.kwargs = {}
+        self.started = False
+        self.data = bytearray()
+        self.pos = 0
+
+    def read_varint(self):
+        data = self.data
+        pos = self.pos
+        ret = data[pos]
+        if ret < 0x80:
+            self.pos = pos + 1
+            return ret
+
+        ret = shift = 0
+        while True:
+            b = data[pos]
+            pos += 1
+            ret |= (b & 0x7f) << shift
+            if b < 0x80:
+                self.pos = pos
+                return ret
+            shift += 7
+
+    def _read(self, n):
+        pos = self.pos
+        self.pos = pos + n
+        if self.pos > len(self.data):
+            raise ValueError('Truncated record')
+        return bytes(self.data[pos:self.pos])
+
+    def decode(self):
+        '''Returns the next serialized value in the current record.'''
+        tag = self.data[self.pos]
+        self.pos += 1
+
+        if tag == INT:
+            return self.read_varint()
+        elif tag == OBJREF:
+            mod, name = self.types[self.read_varint()]
+            return self.decode_items({_NAME: name, _MOD: mod})
+        elif tag == STR:
+            return self._read(self.read_varint()).decode('utf-8')
+        elif tag == LIST:
+            return [self.decode() for k in range(self.read_varint())]
+        elif tag == NONE:
+            return None
+        elif tag == TRUE:
+            return True
+        elif tag == FALSE:
+            return False
+        elif tag == NEGINT:
+            return -self.read_varint() - 1
+        elif tag == FLOAT:
+            return DOUBLE.unpack(self._read(8))[0]
+        elif tag == BYTES:
+            return self._read(self.read_varint())
+        elif tag == TUPLE:
+            return tuple([self.decode() for k in range(self.read_varint())])
+        elif tag == DICT:
+            return self.decode_items({})
+        elif tag == OBJ:
+            mod = self.decode()
+            name = self.decode()
+            self.types.append((mod, name))
+            return self.decode_items({_NAME: name, _MOD: mod})
+        elif tag == VALUE:
+            return deserialize(self.decode(), **self.kwargs)
+        raise ValueError('Invalid tag: {}'.format(tag))
+
+    def decode_items(self, dct):
+        for k in range(self.read_varint()):
+            tag = self.data[self.pos]
+            if tag == KEYREF:
+                self.pos += 1
+                key = self.keys[self.read_varint()]
+            elif tag == KEY:
+                self.pos += 1
+                key = self.decode()
+                self.keys.append(key)
+            else:
+                key = self.decode()
+            dct[key] = self.decode()
+        return dct
+
+    def _read_exactly(self, n):
+        data = self.fp.read(n)
+        if len(data) != n:
+            raise ValueError('Truncated record')
+        return data
+
+    def read_record(self):
+        '''Reads the next record from the stream and returns its
+        serialized value.
+
+        Raises EOFError if the stream has no more records, and
+        ValueError if it ends in the middle of one.
+        '''
+        if not self.started:
+            magic = self.fp.read(len(MAGIC))
+            if not magic:
+                raise EOFError('End of stream')
+            if magic != MAGIC:
+                raise ValueError('Invalid stream header: {!r}'.format(magic))
+            self.started = True
+
+        size = shift = 0
+        while True:
+            b = self.fp.read(1)
+            if not b:
+                if shift:
+                    raise ValueError('Truncated record')
+                raise EOFError('End of stream')
+            b = ord(b)
+            size |= (b & 0x7f) << shift
+            if b < 0x80:
+                break
+            shift += 7
+
+        self.data = bytearray(self._read_exactly(size))
+        self.pos = 0
+        try:
+            ret = self.decode()
+        except IndexError:
+            raise ValueError('Truncated record')
+        if self.pos != size:
+            raise ValueError('Record has {} trailing bytes'
+                             .format(size - self.pos))
+        return ret
+
+    def read(self, **kwargs):
+        '''Reads and deserializes the next object in the stream.
+
+        Raises EOFError if the stream has no more objects.
+        '''
+        self.kwargs = kwargs
+        return deserialize(self.read_record(), **kwargs)
+
+    def __iter__(self):
+        return self.iter()
+
+    def iter(self, **kwargs):
+        '''Yields the remaining objects in the stream, one at a time.'''
+        while True:
+            try:
+                obj = self.read(**kwargs)
+            except EOFError:
+                return
+            yield obj
+
+
+#-------------------------------------------------------------------------------
+# Utilities
+
+
+def dump(obj, fp, **kwargs):
+    '''Writes the binary encoding of obj to the file object fp.'''
+    Encoder(fp).write(obj, **kwargs)
+
+def dumps(obj, **kwargs):
+    '''Returns the binary encoding of obj as bytes.'''
+    fp = BytesIO()
+    dump(obj, fp, **kwargs)
+    return fp.getvalue()
+
+def dump_iter(objs, fp, **kwargs):
+    '''Writes each object of the iterable objs to fp as its own record.
+
+    Objects are serialized and written one at a time, so memory use
+    depends on the size of the largest object rather than on the number
+    of objects.
+    '''
+    enc = Encoder(fp)
+    for obj in objs:
+        enc.write(obj, **kwargs)
+
+def load(fp, **kwargs):
+    '''Reads an object written by dump() from the file object fp.'''
+    return Decoder(fp).read(**kwargs)
+
+def loads(data, **kwargs):
+    '''Returns the object encoded in data by dumps().'''
+    return load(BytesIO(data), **kwargs)
+
+def load_iter(fp, **kwargs):
+    '''Yields the objects written to fp by dump_iter(), one at a time.'''
+    return Decoder(fp).iter(**kwargs)
+
+#-------------------------------------------------------------------------------
+# __all__
+
+__all__ = ('MAGIC', 'Encoder', 'Decoder', 'dump', 'dumps', 'dump_iter',
+           'load', 'loads', 'load_iter')
+
+#-------------------------------------------------------------------------------
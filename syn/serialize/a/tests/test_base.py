@@ -0,0 +1,111 @@
+import six
+from io import BytesIO
+from nose.tools import assert_raises
+from syn.five import xrange
+from syn.types.a import generate, deep_feq, collect, serialize
+from syn.types.a.tests.test_mapping import ss
+from syn.serialize.a import MAGIC, Encoder, Decoder, dump, dumps, load, \
+    loads, dump_iter, load_iter
+from syn.base_utils import on_error, elog
+from syn.tree.b import Node
+
+from syn.globals import TEST_SAMPLES as SAMPLES
+SAMPLES //= 10
+SAMPLES = max(SAMPLES, 1)
+
+#-------------------------------------------------------------------------------
+# Utilities
+
+def examine_codec(val):
+    sval = loads(dumps(val))
+    assert type(sval) is type(val)
+    assert deep_feq(sval, val) or deep_feq(collect(sval, ss), collect(val, ss))
+
+#-------------------------------------------------------------------------------
+# Codec
+
+def test_codec():
+    n = Node(Node(_id=2, _name='b'), _id=1, _name='a')
+    x = [0, 1, -1, 127, 128, -128, 2**70, -2**70, 2.5, float('inf'), 1j,
+         u'abc', u'\xe9\u20ac', b'\x00\xff', (1, (2, 3)), {1, 2}, frozenset(),
+         dict(a=1, b=[None, True, False]), {(1, 2): 3, 4: u'd', 1j: 5, frozenset([6]): 7}, int, n]
+    data = dumps(x)
+    assert data.startswith(MAGIC)
+    assert loads(data) == x
+    assert len(data) < len(repr(serialize(x)))
+
+    # The type table and keys are written only once
+    data2 = dumps([n] * 10)
+    assert data2.count(b'syn.tree.b.node') == 1
+    assert data2.count(b'_node_count') == 1
+    assert loads(data2) == [n] * 10
+
+    for typ in (bool, int, float, complex, six.text_type, six.binary_type,
+                list, tuple, dict, set, frozenset):
+        assert loads(dumps(typ)) is typ
+        for k in xrange(SAMPLES):
+            val = generate(typ)
+            with on_error(elog, examine_codec, (val,)):
+                examine_codec(val)
+
+    assert_raises(ValueError, loads, b'abcd\x00')
+    assert_raises(ValueError, loads, MAGIC + b'\x01\xff')
+    assert_raises(EOFError, loads, b'')
+    assert_raises(ValueError, loads, data[:-1])
+    assert_raises(ValueError, loads, MAGIC + b'\x80')
+
+def test_streams():
+    fp = BytesIO()
+    dump([1, 2], fp)
+    dump(u'abc', fp)
+    fp.seek(0)
+    assert load(fp) == [1, 2]
+    assert load(fp) == u'abc'
+    assert_raises(EOFError, load, fp)
+
+    fp = BytesIO()
+    enc = Encoder(fp)
+    objs = [Node(_id=k) for k in range(5)]
+    for obj in objs:
+        enc.write(obj)
+    assert fp.getvalue().count(MAGIC) == 1
+
+    fp.seek(0)
+    dec = Decoder(fp)
+    assert [dec.read() for obj in objs] == objs
+    assert_raises(EOFError, dec.read)
+
+    fp.seek(0)
+    assert list(Decoder(fp)) == objs
+
+def test_iter():
+    def records(n):
+        for k in range(n):
+            yield Node(_id=k, _name=u'n{}'.format(k))
+
+    fp = BytesIO()
+    dump_iter(records(100), fp)
+    fp.seek(0)
+    it = load_iter(fp)
+    assert next(it) == Node(_id=0, _name=u'n0')
+    assert fp.tell() < len(fp.getvalue())
+    assert list(it) == list(records(100))[1:]
+
+    fp = BytesIO()
+    dump_iter([], fp)
+    assert fp.getvalue() == b''
+    assert list(load_iter(fp)) == []
+
+    fp = BytesIO()
+    dump_iter([dict(a=1), [2], 3], fp)
+    fp = BytesIO(fp.getvalue()[:-1])
+    it = load_iter(fp)
+    assert next(it) == dict(a=1)
+    assert next(it) == [2]
+    assert_raises(ValueError, next, it)
+
+#-------------------------------------------------------------------------------
+
+if __name__ == '__main__': # pragma: no cover
+    from syn.base_utils import run_all_tests
+    run_all_tests(globals(), verbose=True, print_errors=False)
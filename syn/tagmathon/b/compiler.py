@@ -1,4 +1,3 @@
-from syn.python.b import Module
 from .base import SyntagmathonNode
 
 #-------------------------------------------------------------------------------
@@ -28,6 +27,7 @@ def to_python(obj, **kwargs):
 def compile_to_python(obj, **kwargs):
     py = to_python(obj, **kwargs)
     if isinstance(py, list):
+        from syn.python.b import Module
         py = Module(*py)
     out = py.expressify_statements().resolve_progn()
     out.validate()
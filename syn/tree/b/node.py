@@ -1,3 +1,4 @@
+from copy import deepcopy
 from collections import Iterator
 from functools import partial
 from syn.five import STR
@@ -16,6 +17,7 @@ GENEX = Base.groups_enum().generate_exclude
 GSEX = Base.groups_enum().getstate_exclude
 REPREX = Base.groups_enum().repr_exclude
 STREX = Base.groups_enum().str_exclude
+CPCP = Base.groups_enum().copy_copy
 
 true = lambda x: True
 identity = lambda x: x
@@ -33,6 +35,9 @@ def _preceding_depth_first(node):
     if node._parent is not None:
         yield node._parent
 
+def _iterative_deepcopy(obj):
+    return getattr(type(obj), '__deepcopy__', None) == Node.__deepcopy__
+
 #-------------------------------------------------------------------------------
 # TreeError
 
@@ -51,7 +56,7 @@ class Node(ListWrapper):
                                 doc='Name of the node (for display purposes)'),
                   _id = IAttr(int, optional=True, groups=(STREX,),
                               doc='Integer id of the node'),
-                  _list = IAttr(list, groups=(REPREX,),
+                  _list = IAttr(list, groups=(REPREX, CPCP),
                                 doc='Child nodes'),
                   _node_count = IAttr(int, groups=(GENEX, STREX),
                                       doc='The number of nodes in the subtree'
@@ -59,6 +64,8 @@ class Node(ListWrapper):
                  )
     _aliases = dict(_list = ['_children'])
     _opts = dict(init_validate = False,
+                 fast_copy = True,
+                 iterative_eq = True,
                  optional_none = True,
                  must_be_root = False,
                  descendant_exclude = ())
@@ -69,6 +76,45 @@ class Node(ListWrapper):
     def __bool__(self):
         return True
 
+    def __deepcopy__(self, memo):
+        '''Copies the subtree iteratively, so that deep trees do not exceed
+        the recursion limit.  Parent pointers are set by the setstate hooks.
+        '''
+        if id(self) in memo:
+            return memo[id(self)]
+
+        # Collect the subtree in pre-order
+        nodes = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            stack.extend(c for c in reversed(node._children)
+                         if _iterative_deepcopy(c))
+
+        # Copy children before their parents
+        keep = memo.setdefault(id(memo), [])
+        for node in reversed(nodes):
+            if id(node) in memo:
+                continue
+
+            cls = type(node)
+            ret = cls.__new__(cls)
+            memo[id(node)] = ret
+            keep.append(node)
+
+            state = node.__getstate__()
+            for attr, val in state.items():
+                if attr == '_list':
+                    state[attr] = type(val)(memo[id(c)] if id(c) in memo
+                                            else deepcopy(c, memo)
+                                            for c in val)
+                else:
+                    state[attr] = deepcopy(val, memo)
+            ret.__setstate__(state)
+
+        return memo[id(self)]
+
     @classmethod
     def _generate(cls, **kwargs):
         if cls._opts.descendant_exclude:
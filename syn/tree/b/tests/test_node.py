@@ -1,3 +1,5 @@
+import sys
+from copy import deepcopy
 from operator import attrgetter
 from nose.tools import assert_raises
 from syn.base.b import Attr
@@ -8,7 +10,7 @@ from syn.base_utils import assert_equivalent, assert_inequivalent, consume, \
     ngzwarn, is_hashable
 from syn.types.a import generate, hashable, find_ne, DiffersAtAttribute, \
     estr, visit, rstr, attrs, pairs, deserialize, serialize, deep_feq, \
-    primitive_form
+    primitive_form, serialize_graph, deserialize_graph
 from syn.five import xrange
 
 from syn.globals import TEST_SAMPLES as SAMPLES
@@ -431,6 +433,87 @@ def test_syn_types_functionality():
     assert not is_hashable(n)
     assert is_hashable(hashable(n))
     
+#-------------------------------------------------------------------------------
+# Equality
+
+class EqNode(Node):
+    _attrs = dict(a = Attr(object, optional=True))
+
+def _chain(depth, name='0'):
+    node = Node(_name=name)
+    for k in xrange(depth):
+        node = Node(node)
+    return node
+
+def test_deep_equality():
+    depth = sys.getrecursionlimit() * 2
+    a = _chain(depth)
+    assert a == _chain(depth)
+    assert a != _chain(depth, '1')
+    assert a != _chain(depth - 1)
+
+    N = EqNode
+    c = N(N(a=1), N(a=[1, (2, N(a=3))]))
+    assert c == N(N(a=1), N(a=[1, (2, N(a=3))]))
+    assert c != N(N(a=1), N(a=[1, (2, N(a=4))]))
+    assert c != N(N(a=1), N(a=[1, [2, N(a=3)]]))
+    assert c != N(N(a=1), N(a=[1, (2, N(a=3), 4)]))
+    assert c != N(N(a=1), N(a=[1, (2, N(a=3))]), N())
+
+#-------------------------------------------------------------------------------
+# Copying
+
+def test_copy():
+    c1, c2 = EqNode(a=1), EqNode(a=[2])
+    n = EqNode(c1, c2, a=3)
+    assert Node._opts.fast_copy
+
+    n2 = n.copy()
+    assert n2 == n
+    assert n2._list is not n._list
+    assert n2[0] is c1
+    assert c1._parent is n
+    assert n2._node_count == 3
+    assert n2._from_copy_
+
+    d = deepcopy(n)
+    assert d == n
+    assert d[0] is not c1
+    assert d[1].a == [2] and d[1].a is not c2.a
+    assert d[0]._parent is d
+    assert d[1]._parent is d
+    assert not hasattr(d, '_parent')
+
+    depth = sys.getrecursionlimit() * 2
+    a = _chain(depth)
+    b = deepcopy(a)
+    assert a == b
+    node = b
+    for k in xrange(depth):
+        child = node[0]
+        assert child._parent is node
+        node = child
+    assert node._name == '0'
+
+    # Nodes shared between attributes and children are copied once
+    e = EqNode(c1)
+    e.a = c1
+    e2 = deepcopy(e)
+    assert e2.a is e2[0]
+
+def test_serialize_graph():
+    c = EqNode(a=1)
+    n = EqNode(c, EqNode(a=c), a=[c])
+    n2 = deserialize_graph(serialize_graph(n))
+    assert n2 == n
+    assert n2[1].a is n2[0]
+    assert n2.a[0] is n2[0]
+    assert n2[0]._parent is n2
+
+    depth = sys.getrecursionlimit() * 2
+    a = _chain(depth)
+    assert deserialize_graph(serialize_graph(a)) == a
+
 #-------------------------------------------------------------------------------
 
 if __name__ == '__main__': # pragma: no cover
@@ -1,5 +1,6 @@
-from random import randint
+from random import randint, sample
 from functools import partial
+from itertools import islice
 from syn.five import xrange
 from collections import Sequence as _Sequence
 from collections import Mapping as _Mapping
@@ -19,6 +20,9 @@ class Callable(TypeExtension):
         if not callable(value):
             raise TypeError('Value is not callable: {}'.format(value))
 
+    def query(self, value):
+        return callable(value)
+
     def display(self):
         return '<callable>'
 
@@ -40,6 +44,9 @@ class Hashable(TypeExtension):
         if not is_hashable(value):
             raise TypeError('Value is not hashable: {}'.format(value))
 
+    def query(self, value):
+        return is_hashable(value)
+
     def display(self):
         return '<hashable>'
 
@@ -47,37 +54,191 @@ class Hashable(TypeExtension):
         return rand_hashable(**kwargs)
 
 
+#-------------------------------------------------------------------------------
+# Validation policies
+
+
+class ValidationPolicy(object):
+    '''Selects the items of a container value that Sequence and Mapping
+    check.  The base policy selects all of them.
+    '''
+    def __eq__(self, other):
+        return type(self) is type(other) and vars(self) == vars(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(type(self))
+
+    def items(self, values, item_type):
+        '''Returns the items of values (a sequence, or the values of a
+        mapping) to check against item_type.
+        '''
+        return values
+
+
+class ValidateAll(ValidationPolicy):
+    '''Every item is checked.'''
+
+
+class ValidateFirst(ValidationPolicy):
+    '''Only the first n items are checked.'''
+    def __init__(self, n):
+        self.n = n
+
+    def items(self, values, item_type):
+        return islice(values, self.n)
+
+
+class ValidateSample(ValidationPolicy):
+    '''A random sample of k items is checked.'''
+    def __init__(self, k):
+        self.k = k
+
+    def items(self, values, item_type):
+        if len(values) <= self.k:
+            return values
+        if not isinstance(values, _Sequence):
+            values = list(values)
+        idxs = sorted(sample(xrange(len(values)), self.k))
+        return [values[idx] for idx in idxs]
+
+
+class ValidateNone(ValidationPolicy):
+    '''Only the container itself is checked, not its items.'''
+    def items(self, values, item_type):
+        return ()
+
+
+class ValidateIncremental(ValidationPolicy):
+    '''Items of a CheckedList that was validated when it was wrapped (see
+    Sequence.wrap) are not checked, since the list checks each item as
+    it is added.  Other values (and lists wrapped for another item type)
+    are checked in full each time.  Checking a value never changes it.
+    '''
+    def items(self, values, item_type):
+        if isinstance(values, CheckedList) and values.validated:
+            if values.item_type == item_type:
+                return ()
+        return values
+
+
+class CheckedList(list):
+    '''A list that, once validated, checks each item added to it against
+    item_type.  Only Sequence.wrap() marks a list as validated.
+    '''
+    item_type = None
+    validated = False
+
+    def __init__(self, values=(), item_type=None):
+        super(CheckedList, self).__init__(values)
+        self.item_type = item_type
+
+    def _check(self, values):
+        if self.validated:
+            for value in values:
+                self.item_type.check(value)
+
+    def append(self, value):
+        self._check((value,))
+        super(CheckedList, self).append(value)
+
+    def extend(self, values):
+        values = list(values)
+        self._check(values)
+        super(CheckedList, self).extend(values)
+
+    def insert(self, index, value):
+        self._check((value,))
+        super(CheckedList, self).insert(index, value)
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = list(value)
+            self._check(value)
+        else:
+            self._check((value,))
+        super(CheckedList, self).__setitem__(index, value)
+
+    def __setslice__(self, i, j, values): # Python 2
+        self.__setitem__(slice(i, j), values)
+
+
 #-------------------------------------------------------------------------------
 # Sequence
 
 
 class Sequence(TypeExtension):
     '''The value must be a sequence whose values are the provided type.
+
+    Which values are checked is determined by policy (a
+    ValidationPolicy).
     '''
-    __slots__ = ('item_type', 'seq_type')
+    __slots__ = ('item_type', 'seq_type', 'policy')
     register_generable = True
 
-    def __init__(self, item_type, seq_type=_Sequence):
+    def __init__(self, item_type, seq_type=_Sequence, policy=None):
         super(Sequence, self).__init__()
         self.item_type = Type.dispatch(item_type)
         self.seq_type = Type.dispatch(seq_type)
+        self.policy = policy if policy is not None else ValidateAll()
 
     def __eq__(self, other):
         if super(Sequence, self).__eq__(other):
             if self.seq_type == other.seq_type:
                 if self.item_type == other.item_type:
-                    return True
+                    if self.policy == other.policy:
+                        return True
         return False
 
     def __hash__(self):
-        return hash(id(self))
+        return hash((type(self), self.seq_type, self.item_type, self.policy))
 
     def check(self, values):
         self.seq_type.check(values)
 
-        for value in values:
+        for value in self.policy.items(values, self.item_type):
             self.item_type.check(value)
 
+    def query(self, values):
+        if not self.seq_type.query(values):
+            return False
+
+        query = self.item_type.query
+        for value in self.policy.items(values, self.item_type):
+            if not query(value):
+                return False
+        return True
+
+    def with_policy(self, policy):
+        '''Returns a copy of the type with the given policy.'''
+        return Sequence(self.item_type, self.seq_type, policy)
+
+    def wrap(self, values):
+        '''Returns values as a CheckedList of item_type, if it is a list.
+        The list is marked as validated if all of its items are valid.
+
+        A plain list (or a CheckedList of another item type) is copied,
+        since a list cannot check items added to it; later changes to
+        the original are not seen by the copy, and vice versa.
+        '''
+        if isinstance(values, CheckedList):
+            if values.item_type != self.item_type:
+                values = CheckedList(values, self.item_type)
+        elif type(values) is list:
+            values = CheckedList(values, self.item_type)
+        else:
+            return values
+
+        if not values.validated:
+            values.validated = all(map(self.item_type.query, values))
+        return values
+
     def coerce(self, values, **kwargs):
         seq_type_only = kwargs.get('seq_type_only', False)
         if not self.query(values):
@@ -140,7 +301,8 @@ class Tuple(TypeExtension):
         return False
 
     def __hash__(self):
-        return hash(id(self))
+        types = self.types if self.uniform else tuple(self.types)
+        return hash((type(self), types, self.uniform, self.length))
 
     def check(self, values):
         if not isinstance(values, tuple):
@@ -157,6 +319,25 @@ class Tuple(TypeExtension):
             for k, typ in enumerate(self.types):
                 typ.check(values[k])
 
+    def query(self, values):
+        if not isinstance(values, tuple):
+            return False
+
+        if self.length is not None:
+            if len(values) != self.length:
+                return False
+
+        if self.uniform:
+            query = self.types.query
+            for value in values:
+                if not query(value):
+                    return False
+        else:
+            for k, typ in enumerate(self.types):
+                if not typ.query(values[k]):
+                    return False
+        return True
+
     def coerce(self, values, **kwargs):
         if self.query(values):
             return values
@@ -222,31 +403,50 @@ AssocList = List(Tuple((None, None)))
 
 class Mapping(TypeExtension):
     '''The value must be a mapping whose values are the provided type.
+
+    Which values are checked is determined by policy (a
+    ValidationPolicy).
     '''
-    __slots__ = ('value_type', 'map_type')
+    __slots__ = ('value_type', 'map_type', 'policy')
     register_generable = True
 
-    def __init__(self, value_type, map_type=_Mapping):
+    def __init__(self, value_type, map_type=_Mapping, policy=None):
         super(Mapping, self).__init__()
         self.value_type = Type.dispatch(value_type)
         self.map_type = Type.dispatch(map_type)
+        self.policy = policy if policy is not None else ValidateAll()
 
     def __eq__(self, other):
         if super(Mapping, self).__eq__(other):
             if self.map_type == other.map_type:
                 if self.value_type == other.value_type:
-                    return True
+                    if self.policy == other.policy:
+                        return True
         return False
 
     def __hash__(self):
-        return hash(id(self))
+        return hash((type(self), self.map_type, self.value_type, self.policy))
 
     def check(self, dct):
         self.map_type.check(dct)
 
-        for value in dct.values():
+        for value in self.policy.items(dct.values(), self.value_type):
             self.value_type.check(value)
 
+    def query(self, dct):
+        if not self.map_type.query(dct):
+            return False
+
+        query = self.value_type.query
+        for value in self.policy.items(dct.values(), self.value_type):
+            if not query(value):
+                return False
+        return True
+
+    def with_policy(self, policy):
+        '''Returns a copy of the type with the given policy.'''
+        return Mapping(self.value_type, self.map_type, policy)
+
     def coerce(self, dct, **kwargs):
         if not self.query(dct):
             newdct = {key:self.value_type.coerce(value, **kwargs) for key,value in
@@ -292,6 +492,9 @@ class This(TypeExtension):
 # __all__
 
 __all__ = ('Callable', 'Sequence', 'List', 'Tuple',
-           'Mapping', 'Dict', 'Hashable', 'AssocList', 'This')
+           'Mapping', 'Dict', 'Hashable', 'AssocList', 'This',
+           'ValidationPolicy', 'ValidateAll', 'ValidateFirst',
+           'ValidateSample', 'ValidateNone', 'ValidateIncremental',
+           'CheckedList')
 
 #-------------------------------------------------------------------------------
@@ -1,7 +1,9 @@
 from syn.five import xrange
 from nose.tools import assert_raises
 from syn.type.a.ext import (Callable, List, Sequence, Mapping, Dict, Hashable,
-                            Tuple, AssocList, This)
+                            Tuple, AssocList, This, ValidateAll, ValidateFirst,
+                            ValidateSample, ValidateNone, ValidateIncremental,
+                            CheckedList)
 
 from syn.base_utils import ngzwarn, on_error, elog
 from syn.globals import TEST_SAMPLES as SAMPLES
@@ -162,6 +164,98 @@ def test_mapping():
     assert int_dict.display() == 'dict(any => int)'
     assert int_dict.rst() == '*dict* (any => *int*)'
 
+#-------------------------------------------------------------------------------
+# Validation policies
+
+def test_policies():
+    values = [1, 2, 3, 4.5]
+    dct = dict(a=1, b=2.5)
+    assert List(int) == List(int, policy=ValidateAll())
+    assert List(int) != List(int, policy=ValidateFirst(3))
+    assert ValidateFirst(3) == ValidateFirst(3) != ValidateFirst(2)
+
+    t = List(int, policy=ValidateFirst(3))
+    assert t.query(values)
+    t.check(values)
+    assert not t.query([1, 2.5])
+    assert_raises(TypeError, t.check, [1, 2.5])
+    assert not t.query((1, 2, 3))
+    assert Dict(int, policy=ValidateFirst(0)).query(dct)
+
+    t = List(int, policy=ValidateNone())
+    assert t.query(values)
+    assert not t.query((1, 2))
+    assert Dict(int, policy=ValidateNone()).query(dct)
+    assert t.with_policy(ValidateAll()) == List(int)
+
+    t = List(int, policy=ValidateSample(2))
+    assert t.query([1, 2.5]) is False
+    for k in xrange(SAMPLES):
+        assert t.query(list(range(10)))
+        assert not t.query([1.5] * 10)
+        assert len(t.policy.items(values, t.item_type)) == 2
+        assert set(t.policy.items(values, t.item_type)) <= set(values)
+    t = Dict(int, policy=ValidateSample(1))
+    assert not t.query(dict(a=1.5, b=2.5))
+
+def test_incremental():
+    t = List(int, policy=ValidateIncremental())
+    assert t.wrap((1, 2)) == (1, 2)
+    lst = [1, 2]
+    values = t.wrap(lst)
+    assert values is not lst
+    lst.append(2.5)
+    assert type(values) is CheckedList
+    assert values == [1, 2]
+    assert values.validated
+    assert t.wrap(values) is values
+
+    # Lists with invalid items are not validated, and checking does not
+    # mark them as validated; only wrap() does
+    values = t.wrap([1, 2.5])
+    assert not values.validated
+    values.append(2.5)
+    assert_raises(TypeError, t.check, values)
+    values[1] = 2
+    values[2] = 3
+    t.check(values)
+    assert t.query(values)
+    assert not values.validated
+    assert t.wrap(values) is values
+    assert values.validated
+
+    values.append(4)
+    values.extend([5, 6])
+    values += [7]
+    values.insert(0, 0)
+    values[1:3] = [1, 2]
+    assert values == [0, 1, 2, 3, 4, 5, 6, 7]
+    for meth, args in [(values.append, (1.5,)),
+                       (values.extend, ([1, 1.5],)),
+                       (values.insert, (0, 1.5)),
+                       (values.__iadd__, ([1.5],)),
+                       (values.__setitem__, (0, 1.5)),
+                       (values.__setitem__, (slice(0, 2), [1, 1.5]))]:
+        assert_raises(TypeError, meth, *args)
+    assert values == [0, 1, 2, 3, 4, 5, 6, 7]
+
+    # Plain lists, and lists wrapped for other types, are checked in full
+    assert not t.query([1, 2.5])
+    t.check([1, 2])
+    t2 = List(float, policy=ValidateIncremental())
+    assert not t2.query(values)
+    assert values.item_type == t.item_type
+    values2 = t2.wrap(values)
+    assert values2 is not values
+    assert values2.item_type == t2.item_type
+    assert not values2.validated
+    assert values.validated
+
+    values = CheckedList([1, 2])
+    t.check(values)
+    assert not values.validated
+    values.append(2.5)
+
 #-------------------------------------------------------------------------------
 # This
 
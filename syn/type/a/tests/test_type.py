@@ -1,8 +1,11 @@
 import six
-from syn.five import xrange
+import time
+import numbers
+from syn.five import PY2, xrange
 from nose.tools import assert_raises
+from nose.plugins.skip import SkipTest
 from syn.type.a import (Type, ValuesType, MultiType, TypeType, AnyType,
-                        TypeExtension, Set, Schema)
+                        TypeExtension, Set, Schema, isinstance_many)
 from syn.base_utils import is_hashable, feq
 
 from syn.base_utils import ngzwarn, on_error, elog
@@ -136,6 +139,67 @@ def test_valuestype():
     assert t.rst() in ('[1, 1.2]', '[1.2, 1]')
     assert t.display() == t.rst()
 
+    # Membership index, with a fallback for unhashable values
+    t = ValuesType(['mrv', 'random', [1, 2], (3,)])
+    assert t.size == 4
+    assert t.valueset == frozenset(['mrv', 'random', (3,)])
+    assert t.unhashables == [[1, 2]]
+    t.check('mrv')
+    t.check([1, 2])
+    t.check((3,))
+    assert not t.query('abc')
+    assert not t.query([1])
+    assert not t.query({})
+    assert t.query_many(['mrv', [1, 2], 'abc']) == [True, True, False]
+    assert [t.enumeration_value(k) for k in xrange(5)] == \
+        ['mrv', 'random', [1, 2], (3,), 'mrv']
+
+    t = ValuesType(iter([1, 2]))
+    assert t.size == 2
+    t.check(2)
+    t.check(2)
+    assert ValuesType(set([frozenset([1])])).query(set([1]))
+
+    # Containers with constant-time membership are used as is, and
+    # others are only indexed when first needed
+    values = {1, 2}
+    t = ValuesType(values)
+    assert t.valueset is values
+    values.add(3)
+    t.check(3)
+    assert ValuesType(dict(a=1)).query('a')
+
+    values = [1, 2]
+    t = ValuesType(values)
+    assert t._valueset is None
+    assert t.query(2)
+    assert t.valueset == frozenset([1, 2])
+    assert hash(t) == hash(ValuesType({1, 2}))
+    assert hash(t) == hash(ValuesType(xrange(1, 3)))
+    assert hash(t) == hash(ValuesType([2, 1, 2]))
+
+    # Equal types hash alike, however many values they have
+    m = ValuesType.hash_max_values + 1
+    t = ValuesType(xrange(m))
+    assert t == ValuesType(list(xrange(m)) * 2)
+    assert hash(t) == hash(ValuesType(list(xrange(m)) * 2))
+    assert hash(t) == hash(ValuesType(set(xrange(m))))
+
+    # Construction and hashing are constant-time for a large range
+    n = 10**7
+    start = time.time()
+    t = Type.dispatch(xrange(n))
+    hash(t)
+    assert time.time() - start < 0.1
+    assert t._valueset is None or t._valueset is t.values
+    assert isinstance(t, ValuesType)
+    assert t.size == n
+    assert t.enumeration_value(n + 1) == 1
+    if not PY2:
+        assert t.valueset is t.values
+        assert t.query(n - 1)
+        assert not t.query(n)
+
 #-------------------------------------------------------------------------------
 # MultiType
 
@@ -211,6 +275,20 @@ def test_set():
             assert val in s
 
     assert t.display() == t.rst() == '<Set>'
+    assert t.size is None
+    assert t.members is None
+
+    from syn.sets.b import SetWrapper
+    t = Set(SetWrapper({1, 2, 3}))
+    assert t.size == 3
+    assert t.members == frozenset([1, 2, 3])
+    t.check(2)
+    assert not t.query(4)
+    assert not t.query([])
+    assert_raises(TypeError, t.check, 4)
+    assert sorted(t.enumeration_value(k) for k in xrange(3)) == [1, 2, 3]
+    for k in xrange(SAMPLES):
+        assert t.generate() in {1, 2, 3}
 
 #-------------------------------------------------------------------------------
 # Schema
@@ -248,6 +326,104 @@ def test_schema():
     val = t.generate()
     assert t.query(val)
 
+#-------------------------------------------------------------------------------
+# query
+
+def test_query():
+    from syn.sets.b import Range
+    from syn.schema.b.sequence import Sequence as SchemaSequence
+    from syn.type.a import Callable, Hashable, List, Tuple, Dict, Sequence
+
+    types = [AnyType(), TypeType(int), ValuesType([1, 2.5, u'a']),
+             ValuesType({1, 2}), MultiType((int, float)),
+             MultiType((int, ValuesType([u'a']), List(int))),
+             Set(Range(1, 5)), Schema(SchemaSequence(int, float)),
+             Callable(), Hashable(), List(int), Sequence((int, float)),
+             Tuple((int, float)), Tuple(int, uniform=True),
+             Tuple(int, length=2, uniform=True), Dict(int), Dict(List(int))]
+    values = [None, 1, 2.5, 3, u'a', b'a', [], [1, 2], [1, 2.5], [1, u'a'],
+              (1, 2.5), (1, 2), (1, 2, 3), {}, dict(a=1), dict(a=[1]),
+              {1, 2}, int, len]
+
+    # query() agrees with check()
+    for typ in types:
+        for value in values:
+            with on_error(elog, typ.query, (value,)):
+                assert typ.query(value) is Type.query(typ, value)
+
+    class Checked(TypeType):
+        def check(self, value):
+            raise AssertionError('check() called')
+
+    # ... without calling check()
+    t = MultiType((int, Checked(six.text_type)))
+    assert not t.query(1.5)
+    assert t.check(u'a') is t.types[1]
+    assert_raises(TypeError, t.check, 1.5)
+
+#-------------------------------------------------------------------------------
+# Bulk operations
+
+def test_many():
+    from syn.type.a import List, Dict
+
+    types = [AnyType(), TypeType(int), TypeType(six.string_types),
+             ValuesType([1, 2.5, u'a']), ValuesType([[1], 2]),
+             MultiType((int, float)), MultiType((int, ValuesType([u'a']))),
+             List(int), Dict(int)]
+    samples = [[], [1, 2, 3], [1.5], [1, 2.5, u'a', None, [1], {}, 3],
+               [[1], [2], (1,)], [u'a', b'b', u'c']]
+
+    for typ in types:
+        for values in samples:
+            mask = typ.query_many(values)
+            assert mask == [typ.query(value) for value in values]
+            assert typ.check_many(values) == \
+                [k for k, value in enumerate(values) if not typ.query(value)]
+
+    assert TypeType(int).check_many([1, 2.5, 3, u'a']) == [1, 3]
+    assert TypeType(float).coerce_many([1, 2.5, u'3']) == [1.0, 2.5, 3.0]
+    assert_raises(TypeError, TypeType(int).coerce_many, [1, u'a'])
+    assert ValuesType([1, 2]).coerce_many((1, 2, 1)) == [1, 2, 1]
+    assert_raises(TypeError, ValuesType([1, 2]).coerce_many, [1, 3])
+    assert AnyType().coerce_many((1, None)) == [1, None]
+    assert MultiType((int, float)).coerce_many([1.5, u'2']) == [1, 2]
+
+def test_many_numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise SkipTest('numpy is not installed')
+
+    arr = np.array([1, 2, 3])
+    assert list(TypeType(type(arr[0])).query_many(arr)) == [True] * 3
+    assert list(TypeType(int).query_many(arr)) == [True] * 3
+    assert TypeType(float).check_many(arr) == [0, 1, 2]
+    assert MultiType((float, int)).check_many(arr) == []
+    assert TypeType(bool).check_many(arr) == [0, 1, 2]
+    assert TypeType(int).check_many(np.array([1, 2], dtype=np.uint8)) == []
+    assert TypeType(int).check_many(np.array([True])) == []
+    assert TypeType(int).check_many(np.array([1.5, 2.5])) == [0, 1]
+    assert TypeType(float).check_many(np.array([1.5], dtype=np.float32)) \
+        == []
+    assert TypeType(complex).check_many(np.array([1j])) == []
+    assert TypeType(numbers.Real).check_many(arr) == []
+    assert TypeType(numbers.Real).check_many(np.array([1j])) == [0]
+    assert TypeType(six.string_types).check_many(np.array([u'a'])) == []
+    assert TypeType(six.string_types).check_many(arr) == [0, 1, 2]
+    assert ValuesType([1, 3]).check_many(arr) == [1]
+    assert list(AnyType().query_many(arr)) == [True] * 3
+    assert list(TypeType(float).query_many(np.array([1.5]))) == [True]
+
+    # Items of object arrays may have any type, so each is checked
+    arr = np.array([1, u'a', 2.5, None], dtype=object)
+    assert list(isinstance_many(arr, int)) == [True, False, False, False]
+    assert list(isinstance_many(arr[1:], int)) == [False] * 3
+    assert TypeType(int).check_many(arr) == [1, 2, 3]
+    assert MultiType((int, float)).check_many(arr) == [1, 3]
+    assert ValuesType([1, None]).check_many(arr) == [1, 2]
+    assert list(AnyType().query_many(arr)) == [True] * 4
+
 #-------------------------------------------------------------------------------
 # dispatch_type
 
@@ -282,6 +458,49 @@ def test_dispatch_type():
     assert_raises(TypeError, Type.dispatch, b'abc')
     assert_raises(TypeError, Type.dispatch, u'abc')
 
+def test_interning():
+    from syn.type.a import List, Tuple, TYPE_CACHE, intern_key
+
+    # Equal immutable specs share type objects
+    for spec in (None, int, (int, float), (int,), (int, None),
+                 frozenset([1, u'a']), TypeExtension):
+        assert intern_key(spec) is not None
+        assert Type.dispatch(spec) is Type.dispatch(spec)
+    assert Type.dispatch((int,)) is Type.dispatch(int)
+    assert Type.dispatch((int, float)) is not Type.dispatch((float, int))
+    assert Type.dispatch(frozenset([1])) is not Type.dispatch(frozenset([1.0]))
+    assert Type.dispatch(frozenset([1])).values == frozenset([1])
+
+    # Mutable specs do not
+    for spec in ([1, 2], {1, 2}, (int, List(int)), frozenset([(1, 2)])):
+        assert intern_key(spec) is None
+        assert Type.dispatch(spec) is not Type.dispatch(spec)
+
+    # Interned objects are released when no longer used
+    class Foo(object): pass
+    t = Type.dispatch(Foo)
+    assert TYPE_CACHE[(Foo,)] is t
+    del t
+    import gc; gc.collect()
+    assert (Foo,) not in TYPE_CACHE
+
+    # Equal types hash equally
+    pairs = [(TypeType(int), TypeType(int)),
+             (MultiType((int, float)), MultiType((int, float))),
+             (ValuesType([1, 2]), ValuesType([2, 1, 2])),
+             (ValuesType([[1], 2]), ValuesType([2, [1]])),
+             (AnyType(), AnyType()),
+             (List(int), List(int)),
+             (Tuple((int, float)), Tuple((int, float))),
+             (Tuple(int, length=2, uniform=True),
+              Tuple(int, length=2, uniform=True))]
+    for a, b in pairs:
+        assert a is not b
+        assert a == b
+        assert hash(a) == hash(b)
+    assert len(set(a for a, b in pairs) | set(b for a, b in pairs)) == \
+        len(pairs)
+
 #-------------------------------------------------------------------------------
 # Test generation
 
@@ -1,15 +1,124 @@
-from weakref import WeakSet
-from syn.five import STR, strf
-from collections import Iterable
+import sys
+import six
+import numbers
+from weakref import WeakValueDictionary
+from syn.five import STR, NUM, PY2, strf, unicode, xrange
+from collections import Iterable, Set as AbstractSet
 from random import randrange, choice
 from syn.base_utils import hasmethod, message, nearest_base, get_typename, \
-    istr, rand_primitive, collection_equivalent
+    istr, rand_primitive, collection_equivalent, is_hashable
 from syn.types import generate, enumeration_value
 
 #-------------------------------------------------------------------------------
 # Type Registry
 
-GENERABLE_TYPE_REGISTRY = WeakSet()
+# Keyed by id, since type objects hash by value
+GENERABLE_TYPE_REGISTRY = WeakValueDictionary()
+
+#-------------------------------------------------------------------------------
+# Interning
+
+# Type objects returned by Type.dispatch(), by the key of their spec
+TYPE_CACHE = WeakValueDictionary()
+
+INTERN_VALUE_TYPES = frozenset(NUM + (bool, unicode, bytes, type(None)))
+
+def intern_key(obj):
+    '''Returns the key under which the type object for the spec obj is
+    interned, or None if it is not interned.
+
+    Only immutable specs are interned: None, classes, tuples of classes
+    (and None), and frozensets of primitive values.
+    '''
+    if obj is None or isinstance(obj, type):
+        return (obj,)
+    if type(obj) is tuple:
+        if all(item is None or isinstance(item, type) for item in obj):
+            return (tuple, obj)
+    elif type(obj) is frozenset:
+        if all(type(item) in INTERN_VALUE_TYPES for item in obj):
+            return (frozenset,
+                    frozenset((type(item), item) for item in obj))
+
+#-------------------------------------------------------------------------------
+# Bulk utilities
+
+
+def numpy_array(values):
+    '''Returns the numpy module if values is a one-dimensional NumPy array
+    of a non-object dtype, and None otherwise.
+
+    NumPy is never imported here; if values is an array, it already has
+    been.
+    '''
+    np = sys.modules.get('numpy')
+    if np is not None and isinstance(values, np.ndarray):
+        if values.ndim == 1 and values.dtype != object:
+            return np
+
+def numpy_dtypes(np, typ):
+    '''Returns the NumPy scalar types whose values are numbers of Python
+    type typ (e.g. numpy.integer for int), or ().
+    '''
+    if typ is bool:
+        return (np.bool_,)
+    if typ in six.integer_types or typ is numbers.Integral:
+        return (np.bool_, np.integer)
+    if typ is float:
+        return (np.floating,)
+    if typ is numbers.Real:
+        return (np.bool_, np.integer, np.floating)
+    if typ is complex:
+        return (np.complexfloating,)
+    if typ in (numbers.Complex, numbers.Number):
+        return (np.bool_, np.number)
+    return ()
+
+def numpy_isinstance(np, values, types):
+    '''Returns whether the items of array values (of a non-object dtype,
+    so that they all have the same type) are instances of types.
+    Python numeric types match the corresponding NumPy scalar types.
+    '''
+    if len(values) == 0:
+        return False
+    for typ in (types if isinstance(types, tuple) else (types,)):
+        for dtype in numpy_dtypes(np, typ):
+            if np.issubdtype(values.dtype, dtype):
+                return True
+    return isinstance(values[0], types)
+
+def isinstance_many(values, types):
+    '''Returns [isinstance(value, types) for value in values], calling
+    isinstance() once per distinct type of value.  The items of numeric
+    NumPy arrays are instances of the corresponding Python types.
+    '''
+    np = numpy_array(values)
+    if np is not None and values.dtype.kind != 'O':
+        # Every item of a non-object array has the same type; object
+        # arrays hold arbitrary objects, and are checked per item below
+        ok = numpy_isinstance(np, values, types)
+        return np.full(len(values), ok, dtype=bool)
+
+    kinds = set(map(type, values))
+    if len(kinds) == 1:
+        return [isinstance(values[0], types)] * len(values)
+
+    ok = {}
+    for value in values:
+        kind = type(value)
+        if kind not in ok:
+            ok[kind] = isinstance(value, types)
+            if len(ok) == len(kinds):
+                break
+    return list(map(ok.__getitem__, map(type, values)))
+
+def failure_indices(mask):
+    '''Returns the indices of the false values of mask.'''
+    np = numpy_array(mask)
+    if np is not None:
+        return np.flatnonzero(~mask).tolist()
+    return [k for k, ok in enumerate(mask) if not ok]
+
 
 #-------------------------------------------------------------------------------
 # Base Class
@@ -22,7 +131,7 @@ class Type(object):
 
     def __init__(self):
         if self.register_generable:
-            GENERABLE_TYPE_REGISTRY.add(self)
+            GENERABLE_TYPE_REGISTRY[id(self)] = self
 
     def __eq__(self, other):
         return type(self) is type(other)
@@ -31,16 +140,34 @@ class Type(object):
         return not self == other
 
     def __hash__(self):
-        return hash(id(self))
+        return hash(type(self))
 
     def check(self, value):
         raise NotImplementedError
 
     @classmethod
     def dispatch(cls, obj):
+        '''Returns the type object for the spec obj.
+
+        Equal immutable specs (see intern_key()) return the same object.
+        '''
         if isinstance(obj, Type):
             return obj
 
+        key = intern_key(obj)
+        if key is not None:
+            try:
+                ret = TYPE_CACHE.get(key)
+                if ret is None:
+                    ret = cls._dispatch(obj)
+                    TYPE_CACHE[key] = ret
+                return ret
+            except TypeError: # Unhashable class
+                pass
+        return cls._dispatch(obj)
+
+    @classmethod
+    def _dispatch(cls, obj):
         if obj is None:
             return AnyType()
 
@@ -78,12 +205,34 @@ class Type(object):
         raise NotImplementedError
 
     def query(self, value):
+        '''Returns True if value is valid for the type.
+
+        Subclasses override this to avoid raising (and formatting) an
+        exception for invalid values; check() reports why.
+        '''
         try:
             self.check(value)
             return True
         except TypeError:
             return False
 
+    def query_many(self, values):
+        '''Returns a list of query(value) for each item of the sequence
+        values (or a boolean array, for some types, if values is a NumPy
+        array).
+        '''
+        query = self.query
+        return [query(value) for value in values]
+
+    def check_many(self, values):
+        '''Returns the indices of the items of values that are not valid.'''
+        return failure_indices(self.query_many(values))
+
+    def coerce_many(self, values, **kwargs):
+        '''Returns a list of coerce(value) for each item of values.'''
+        coerce = self.coerce
+        return [coerce(value, **kwargs) for value in values]
+
     def query_exception(self, value):
         try:
             self.check(value)
@@ -107,6 +256,18 @@ class AnyType(Type):
     def check(self, value):
         pass
 
+    def query(self, value):
+        return True
+
+    def query_many(self, values):
+        np = numpy_array(values)
+        if np is not None:
+            return np.ones(len(values), dtype=bool)
+        return [True] * len(values)
+
+    def coerce_many(self, values, **kwargs):
+        return list(values)
+
     def coerce(self, value, **kwargs):
         return value
 
@@ -115,7 +276,9 @@ class AnyType(Type):
 
     def enumeration_value(self, x, **kwargs):
         max_enum = kwargs.get('max_enum', 20)
-        types = kwargs.get('types', GENERABLE_TYPE_REGISTRY)
+        types = kwargs.get('types', None)
+        if types is None:
+            types = list(GENERABLE_TYPE_REGISTRY.values())
         N = randrange(min(len(types), max_enum))
 
         for k, typ in enumerate(types):
@@ -127,7 +290,9 @@ class AnyType(Type):
 
     def generate(self, **kwargs):
         max_enum = kwargs.get('max_enum', 20)
-        types = kwargs.get('types', GENERABLE_TYPE_REGISTRY)
+        types = kwargs.get('types', None)
+        if types is None:
+            types = list(GENERABLE_TYPE_REGISTRY.values())
         N = randrange(min(len(types), max_enum))
 
         for k, typ in enumerate(types):
@@ -164,13 +329,27 @@ class TypeType(Type):
         return False
 
     def __hash__(self):
-        return hash(id(self))
+        return hash((type(self), self.type))
 
     def check(self, value):
         if not isinstance(value, self.type):
             raise TypeError('Expected value of type {}; got: {}'
                             .format(self.type, value))
 
+    def query(self, value):
+        return isinstance(value, self.type)
+
+    def query_many(self, values):
+        return isinstance_many(values, self.type)
+
+    def coerce_many(self, values, **kwargs):
+        mask = self.query_many(values)
+        if all(mask):
+            return list(values)
+        coerce = self.coerce
+        return [value if ok else coerce(value, **kwargs)
+                for value, ok in zip(values, mask)]
+
     def coerce(self, value, **kwargs):
         if self.query(value):
             return value
@@ -211,9 +390,17 @@ class ValuesType(Type):
 
     Think of this is a denotational definition of the type.
     '''
-    __slots__ = ('values', 'indexed_values')
+    __slots__ = ('values', 'indexed_values', '_valueset', '_unhashables',
+                 'size')
     register_generable = True
 
+    # Containers with constant-time membership, which are used as is
+    # (xrange membership is linear in Python 2)
+    direct_types = (AbstractSet, dict) if PY2 else (AbstractSet, dict, range)
+
+    # Types with more values than this are hashed by their number alone
+    hash_max_values = 1000
+
     def __init__(self, values):
         super(ValuesType, self).__init__()
         self.values = values
@@ -221,6 +408,42 @@ class ValuesType(Type):
         self.indexed_values = values
         if not hasattr(values, '__getitem__'):
             self.indexed_values = list(values)
+        self.size = len(self.indexed_values)
+
+        self._valueset = None
+        self._unhashables = None
+        if isinstance(values, self.direct_types):
+            self._valueset = values
+            self._unhashables = ()
+
+    def _index(self):
+        # Built on first use, so values should not be modified after
+        # that, unless it is one of direct_types
+        hashables = []
+        unhashables = []
+        for value in self.indexed_values:
+            if is_hashable(value):
+                hashables.append(value)
+            else:
+                unhashables.append(value)
+        self._valueset = frozenset(hashables)
+        self._unhashables = unhashables
+
+    @property
+    def valueset(self):
+        '''The hashable values, as a container with constant-time
+        membership.
+        '''
+        if self._valueset is None:
+            self._index()
+        return self._valueset
+
+    @property
+    def unhashables(self):
+        '''The values that are not hashable.'''
+        if self._unhashables is None:
+            self._index()
+        return self._unhashables
 
     def __eq__(self, other):
         if super(ValuesType, self).__eq__(other):
@@ -229,12 +452,63 @@ class ValuesType(Type):
         return False
 
     def __hash__(self):
-        return hash(id(self))
+        # Equal types have the same distinct values, so only their number
+        # is hashed if there are many of them, to avoid copying values
+        if isinstance(self.values, self.direct_types + (xrange,)):
+            n = len(self.values) # All distinct and hashable
+        elif self.unhashables:
+            return hash(type(self))
+        else:
+            n = len(self.valueset)
+
+        if n > self.hash_max_values:
+            return hash((type(self), n))
+        return hash((type(self), frozenset(self.valueset)))
 
     def check(self, value):
-        if value not in self.values:
+        if not self.query(value):
             raise TypeError('Invalid value: {}'.format(value))
 
+    def query(self, value):
+        try:
+            if value in self.valueset:
+                return True
+        except TypeError: # value is unhashable
+            try:
+                return value in self.indexed_values
+            except TypeError:
+                return False
+
+        if self.unhashables:
+            try:
+                return value in self.unhashables
+            except TypeError:
+                return False
+        return False
+
+    def query_many(self, values):
+        if self.unhashables:
+            return super(ValuesType, self).query_many(values)
+        valueset = self.valueset
+
+        np = numpy_array(values)
+        if np is not None and values.dtype.kind in 'biuf' and \
+                all(isinstance(value, NUM) for value in valueset):
+            return np.isin(values, list(valueset))
+
+        try:
+            return list(map(valueset.__contains__, values))
+        except TypeError: # Unhashable items in values
+            query = self.query
+            return [value in valueset if is_hashable(value) else query(value)
+                    for value in values]
+
+    def coerce_many(self, values, **kwargs):
+        bad = self.check_many(values)
+        if bad:
+            self.coerce(values[bad[0]], **kwargs)
+        return list(values)
+
     def coerce(self, value, **kwargs):
         try:
             self.check(value)
@@ -246,8 +520,7 @@ class ValuesType(Type):
         return istr(list(self.values))
 
     def enumeration_value(self, x, **kwargs):
-        idx = x % len(self.indexed_values)
-        return self.indexed_values[idx]
+        return self.indexed_values[x % self.size]
 
     def generate(self, **kwargs):
         return choice(self.indexed_values)
@@ -284,7 +557,7 @@ class MultiType(Type):
         return False
 
     def __hash__(self):
-        return hash(id(self))
+        return hash((type(self), tuple(self.types)))
 
     def check(self, value):
         if self.is_typelist:
@@ -293,15 +566,26 @@ class MultiType(Type):
         
         else:
             for typ in self.types:
-                try:
-                    typ.check(value)
+                if typ.query(value):
                     return typ
-                except TypeError:
-                    pass
         
         raise TypeError("Value '{}' is not any valid type: {}"
                         .format(value, self.typestr))
 
+    def query_many(self, values):
+        if self.is_typelist:
+            return isinstance_many(values, self.typelist)
+        return super(MultiType, self).query_many(values)
+
+    def query(self, value):
+        if self.is_typelist:
+            return isinstance(value, self.typelist)
+
+        for typ in self.types:
+            if typ.query(value):
+                return True
+        return False
+
     def coerce(self, value, **kwargs):
         for typ in self.types:
             try:
@@ -347,6 +631,10 @@ class MultiType(Type):
 class Set(Type):
     '''For explicitly wrapping a SetNode as a type (since automatic
     dispatching cannot be implemented at this level).
+
+    If the node wraps an explicit set of values, its members are indexed
+    when the type is created, and size gives their number; otherwise
+    size is None and membership is delegated to the node.
     '''
     register_generable = True
 
@@ -355,6 +643,15 @@ class Set(Type):
         self.set = set
         self.set.validate()
 
+        self.members = None
+        self.indexed_members = None
+        self.size = None
+        values = getattr(set, 'set', None)
+        if isinstance(values, AbstractSet):
+            self.members = frozenset(values)
+            self.indexed_members = list(self.members)
+            self.size = len(self.indexed_members)
+
     def __eq__(self, other):
         if super(Set, self).__eq__(other):
             if self.set == other.set:
@@ -362,12 +659,20 @@ class Set(Type):
         return False
 
     def __hash__(self):
-        return hash(id(self))
+        return hash(type(self))
 
     def check(self, value):
-        if not self.set.hasmember(value):
+        if not self.query(value):
             raise TypeError('Set does not contain value: {}'.format(value))
 
+    def query(self, value):
+        try:
+            if self.members is not None:
+                return value in self.members
+            return bool(self.set.hasmember(value))
+        except TypeError:
+            return False
+
     def coerce(self, value, **kwargs):
         try:
             self.check(value)
@@ -378,7 +683,14 @@ class Set(Type):
     def display(self):
         return '<Set>'
 
+    def enumeration_value(self, x, **kwargs):
+        if self.size is None:
+            return super(Set, self).enumeration_value(x, **kwargs)
+        return self.indexed_members[x % self.size]
+
     def generate(self, **kwargs):
+        if self.size:
+            return choice(self.indexed_members)
         return self.set.sample(**kwargs)
     
     def validate(self, value):
@@ -406,12 +718,18 @@ class Schema(Type):
         return False
 
     def __hash__(self):
-        return hash(id(self))
+        return hash(type(self))
 
     def check(self, value):
         if not self.schema.match(value):
             raise TypeError('Schema does not match: {}'.format(value))
 
+    def query(self, value):
+        try:
+            return bool(self.schema.match(value))
+        except TypeError:
+            return False
+
     def coerce(self, value, **kwargs):
         # NOTE: this might not be the right behavior, ideally considered.
         # However, it is good enough for our present needs.
@@ -442,7 +760,10 @@ class TypeExtension(Type):
 #-------------------------------------------------------------------------------
 # __all__
 
-__all__ = ('Type', 'AnyType', 'TypeType', 'ValuesType', 'MultiType',
+__all__ = ('TYPE_CACHE', 'intern_key',
+           'numpy_array', 'numpy_dtypes', 'numpy_isinstance',
+           'isinstance_many', 'failure_indices',
+           'Type', 'AnyType', 'TypeType', 'ValuesType', 'MultiType',
            'Set', 'Schema',
            'TypeExtension')
 
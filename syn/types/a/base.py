@@ -1,8 +1,12 @@
+import sys
 import six
+import numbers
+import threading
 import operator as op
 from functools import wraps
+from weakref import WeakKeyDictionary
 from collections import Iterable
-from syn.base_utils import nearest_base, is_hashable, tuple_prepend, \
+from syn.base_utils import mro, is_hashable, tuple_prepend, \
     get_fullname, get_mod, get_typename, AttrDict, hasmethod, import_module, \
     quote_string, iteration_length, escape_for_eval, compose, safe_vars
 
@@ -11,6 +15,68 @@ from syn.base_utils import nearest_base, is_hashable, tuple_prepend, \
 
 TYPE_REGISTRY = {}
 
+#-------------------------------------------------------------------------------
+# Dispatch cache
+
+
+class DispatchCache(object):
+    '''Caches the registered Type subclass resolved for each unregistered
+    type.  Types are weakly referenced, so dynamically created classes do
+    not accumulate; the cache is also cleared whenever it reaches maxsize,
+    and whenever a new Type subclass is registered.
+    '''
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self.cache = WeakKeyDictionary()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self.cache)
+
+    def clear(self):
+        '''Clears the cache (but not the registered objects).'''
+        self.cache.clear()
+        self.invalidations += 1
+
+    def resolve(self, typ):
+        '''Returns the Type subclass registered for the nearest base of typ
+        in its MRO.
+        '''
+        try:
+            ret = self.cache.get(typ)
+        except TypeError: # typ cannot be weakly referenced
+            return _nearest_registered(typ)
+
+        if ret is not None:
+            self.hits += 1
+            return ret
+
+        self.misses += 1
+        ret = _nearest_registered(typ)
+        if len(self.cache) >= self.maxsize:
+            self.cache.clear()
+        self.cache[typ] = ret
+        return ret
+
+    def stats(self):
+        return dict(hits = self.hits,
+                    misses = self.misses,
+                    invalidations = self.invalidations,
+                    size = len(self.cache),
+                    maxsize = self.maxsize)
+
+
+def _nearest_registered(typ):
+    for base in mro(typ):
+        if base in TYPE_REGISTRY:
+            return TYPE_REGISTRY[base]
+    return TYPE_REGISTRY[object]
+
+
+DISPATCH_CACHE = DispatchCache()
+
 #-------------------------------------------------------------------------------
 # Serialization Information
 
@@ -19,11 +85,90 @@ SER_KEYS = AttrDict(name = '___name',
                     args = '___args',
                     kwargs = '___kwargs',
                     attrs = '___attrs',
-                    is_type = '___is_type')
+                    is_type = '___is_type',
+                    id = '___id',
+                    ref = '___ref')
 
 SER_IDEMPOTENT = {int, float, bool, type(None)}
 SER_BUILTINS = list(vars(six.moves.builtins).values())
 
+#-------------------------------------------------------------------------------
+# Class resolution
+
+
+class ClassResolver(object):
+    '''Resolves the (module, name) pairs of serialized objects to the
+    objects themselves, caching the results.
+
+    If allow_list is True, only objects that have been registered (along
+    with the builtin types supported by syn.types) can be resolved, and no
+    modules are imported.  The cache is cleared whenever allow_list is
+    changed or an object is registered, and whenever it reaches maxsize.
+    Cached objects are only returned while their module still binds them
+    to the same name, so reloaded modules are resolved again.
+    '''
+    def __init__(self, allow_list=False, maxsize=10000):
+        self._allow_list = allow_list
+        self.maxsize = maxsize
+        self.registered = {}
+        self.cache = {}
+        if allow_list:
+            self.register(*[typ for typ in SER_BUILTINS 
+                            if isinstance(typ, type) and typ in TYPE_REGISTRY])
+            self.register(type(None), mod='syn.types.a.special', 
+                          name='NoneType')
+
+    @property
+    def allow_list(self):
+        return self._allow_list
+
+    @allow_list.setter
+    def allow_list(self, value):
+        self._allow_list = value
+        self.clear()
+
+    def clear(self):
+        '''Clears the cache (but not the registered objects).'''
+        self.cache.clear()
+
+    def register(self, *objs, **kwargs):
+        '''Registers each of objs under its (module, name) as serialized,
+        or under the module and name given as keyword arguments.
+        '''
+        for obj in objs:
+            mod = kwargs.get('mod', None)
+            if mod is None:
+                mod = 'six.moves.builtins' if obj in SER_BUILTINS \
+                      else get_mod(obj)
+            name = kwargs.get('name', get_typename(obj))
+            self.registered[(mod, name)] = obj
+        self.clear()
+
+    def resolve(self, mod, name):
+        key = (mod, name)
+        if key in self.registered:
+            return self.registered[key]
+        if self._allow_list:
+            raise TypeError('Cannot resolve unregistered object: {}.{}'
+                            .format(mod, name))
+
+        ret = self.cache.get(key)
+        if ret is not None and \
+                getattr(sys.modules.get(mod), name, None) is ret:
+            return ret
+
+        ret = getattr(import_module(mod), name)
+        if len(self.cache) >= self.maxsize:
+            self.cache.clear()
+        self.cache[key] = ret
+        return ret
+
+    def resolve_dict(self, dct):
+        return self.resolve(dct[SER_KEYS.mod], dct[SER_KEYS.name])
+
+
+CLASS_RESOLVER = ClassResolver()
+
 #-------------------------------------------------------------------------------
 # Utilities
 
@@ -54,6 +199,7 @@ class TypeMeta(type):
         # Register type
         if self.type is not None:
             TYPE_REGISTRY[self.type] = self
+            DISPATCH_CACHE.clear()
 
         # Populate ser_kwargmap as needed
         if self.ser_kwargs and not self.ser_kwargmap:
@@ -102,33 +248,29 @@ class Type(object):
         return cls.type_dispatch(type(obj))(obj)
 
     @classmethod
-    def deserialize_dispatch(cls, obj):
+    def deserialize_dispatch(cls, obj, **kwargs):
         if not isinstance(obj, dict):
             return cls.dispatch(obj)
 
         if SER_KEYS.name not in obj or SER_KEYS.mod not in obj:
             return cls.dispatch(obj)
 
-        mod = import_module(obj[SER_KEYS.mod])
-        return cls.type_dispatch(getattr(mod, obj[SER_KEYS.name]))
+        resolver = kwargs.get('resolver', CLASS_RESOLVER)
+        return cls.type_dispatch(resolver.resolve_dict(obj))
 
     @classmethod
     def type_dispatch(cls, typ):
         if typ in TYPE_REGISTRY:
             return TYPE_REGISTRY[typ]
-
-        base = nearest_base(typ, TYPE_REGISTRY.keys())
-        ret = TYPE_REGISTRY[base]
-        TYPE_REGISTRY[typ] = ret # cache the result to avoid future searches
-        return ret
+        return DISPATCH_CACHE.resolve(typ)
 
     @classmethod
     def deserialize(cls, dct, **kwargs_):
         if not isinstance(dct, dict):
             return dct
 
-        name = dct[SER_KEYS.name]
-        mod = import_module(dct[SER_KEYS.mod])
+        resolver = kwargs_.get('resolver', CLASS_RESOLVER)
+        typ = resolver.resolve_dict(dct)
         args = dct.get(SER_KEYS.args, [])
         kwargs = dct.get(SER_KEYS.kwargs, {})
         attrs = dct.get(SER_KEYS.attrs, {})
@@ -140,7 +282,6 @@ class Type(object):
         if attrs:
             attrs = deserialize(attrs, **kwargs_)
 
-        typ = getattr(mod, name)
         if dct.get(SER_KEYS.is_type, False):
             return typ
 
@@ -228,7 +369,12 @@ class Type(object):
         return cls.type(*[generate(typ, **kwargs) for typ in cls.gen_types])
 
     def _hashable(self, **kwargs):
-        return hashable(serialize(self.obj))
+        if self.ser_args or self.ser_kwargs or self.ser_attrs is False:
+            return hashable(serialize(self.obj))
+
+        items = tuple((attr, hashable(val, **kwargs))
+                      for attr, val in self.pairs(**kwargs))
+        return tuple_prepend(get_fullname(self.obj), items)
 
     @return_if(is_hashable)
     def hashable(self, **kwargs):
@@ -375,7 +521,11 @@ def collect(obj, func=identity, **kwargs):
     return Type.dispatch(obj).collect(func, **kwargs)
 
 def deserialize(obj, **kwargs):
-    return Type.deserialize_dispatch(obj).deserialize(obj, **kwargs)
+    graph = _GRAPH.deserializer
+    if graph is not None:
+        return graph.resolve(obj, kwargs)
+    typ = Type.deserialize_dispatch(obj, **kwargs)
+    return typ.deserialize(obj, **kwargs)
 
 def enumerate(typ, **kwargs):
     for item in Type.type_dispatch(typ).enumerate(**kwargs):
@@ -398,7 +548,20 @@ def generate(typ, **kwargs):
     return Type.type_dispatch(typ).generate(**kwargs)
 
 def hashable(obj, **kwargs):
-    return Type.dispatch(obj).hashable(**kwargs)
+    if type(obj) in SER_IDEMPOTENT or isinstance(obj, SER_ATOMIC):
+        return Type.dispatch(obj).hashable(**kwargs)
+
+    ctx = _HASHABLE
+    if ctx.memo is not None:
+        return _hashable_memo(obj, kwargs)
+
+    ctx.memo = {}
+    ctx.depth = {}
+    ctx.low = 0
+    try:
+        return _hashable_memo(obj, kwargs)
+    finally:
+        ctx.memo = ctx.depth = ctx.low = None
 
 def pairs(obj, **kwargs):
     return Type.dispatch(obj).pairs(**kwargs)
@@ -413,6 +576,12 @@ def rstr(obj, **kwargs):
     return Type.dispatch(obj).rstr(**kwargs)
 
 def serialize(obj, **kwargs):
+    graph = _GRAPH.serializer
+    if graph is not None:
+        return graph.defer(obj, kwargs)
+    return _serialize_obj(obj, **kwargs)
+
+def _serialize_obj(obj, **kwargs):
     if isinstance(obj, type):
         return Type.type_dispatch(obj).serialize_type(obj, **kwargs)
     return Type.dispatch(obj).serialize(**kwargs)
@@ -431,12 +600,227 @@ def safe_sorted(obj, **kwargs):
         kwargs['key'] = kwargs.get('key', compose(hash, hashable))
         return sorted(obj, **kwargs)
 
+#-------------------------------------------------------------------------------
+# Graph serialization
+
+
+class _GraphContext(threading.local):
+    serializer = None
+    deserializer = None
+
+_GRAPH = _GraphContext()
+
+# Values of these types are serialized in place, and never shared
+SER_ATOMIC = (type, numbers.Number) + six.string_types + \
+    (six.text_type, six.binary_type)
+
+
+class _GraphSerializer(object):
+    '''Serializes an object graph using an explicit stack.
+
+    While active, serialize() returns a placeholder dict for each
+    non-atomic value, and the value is serialized into the placeholder
+    later.  Values that are encountered more than once are given an id, and
+    subsequent occurrences are serialized as references to it.
+    '''
+    def __init__(self):
+        self.memo = {} # id(obj): (obj, placeholder)
+        self.stack = []
+        self.count = 0
+
+    def defer(self, obj, kwargs):
+        if type(obj) in SER_IDEMPOTENT or isinstance(obj, SER_ATOMIC):
+            return _serialize_obj(obj, **kwargs)
+
+        key = id(obj)
+        if key in self.memo:
+            dct = self.memo[key][1]
+            if SER_KEYS.id not in dct:
+                dct[SER_KEYS.id] = self.count
+                self.count += 1
+            return {SER_KEYS.ref: dct[SER_KEYS.id]}
+
+        dct = {}
+        self.memo[key] = (obj, dct)
+        self.stack.append((obj, dct, kwargs))
+        return dct
+
+    def run(self, obj, kwargs):
+        ret = self.defer(obj, kwargs)
+        while self.stack:
+            obj, dct, kwargs = self.stack.pop()
+            value = _serialize_obj(obj, **kwargs)
+            if not isinstance(value, dict):
+                raise TypeError('Cannot serialize {} as part of a graph'
+                                .format(type(obj)))
+            dct.update(value)
+        return ret
+
+
+class _GraphDeserializer(object):
+    '''Deserializes the output of serialize_graph() using an explicit stack.
+
+    Every list and dict in the data is deserialized after its children,
+    so while active, deserialize() only has to look up the value of each
+    child.  References are deserialized as the value they refer to.
+    '''
+    def __init__(self):
+        self.defs = {} # ___id: dict
+        self.resolved = {} # id(list or dict): value
+
+    def _children(self, node):
+        if isinstance(node, dict):
+            if SER_KEYS.ref in node:
+                return [self.defs[node[SER_KEYS.ref]]]
+            return list(node.values())
+        return node
+
+    def _index(self, data):
+        stack = [data]
+        seen = set()
+        while stack:
+            node = stack.pop()
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+
+            if isinstance(node, dict):
+                if SER_KEYS.id in node:
+                    self.defs[node[SER_KEYS.id]] = node
+                stack.extend(node.values())
+            elif isinstance(node, list):
+                stack.extend(node)
+
+    def resolve(self, obj, kwargs):
+        key = id(obj)
+        if key in self.resolved:
+            return self.resolved[key]
+        typ = Type.deserialize_dispatch(obj, **kwargs)
+        return typ.deserialize(obj, **kwargs)
+
+    def run(self, data, kwargs):
+        self._index(data)
+
+        active = set()
+        stack = [(data, False)]
+        while stack:
+            node, expanded = stack.pop()
+            key = id(node)
+            if key in self.resolved:
+                continue
+
+            if expanded:
+                active.discard(key)
+                if isinstance(node, dict) and SER_KEYS.ref in node:
+                    target = self.defs[node[SER_KEYS.ref]]
+                    value = self.resolved[id(target)]
+                else:
+                    typ = Type.deserialize_dispatch(node, **kwargs)
+                    value = typ.deserialize(node, **kwargs)
+                self.resolved[key] = value
+                continue
+
+            if key in active:
+                raise ValueError('Cannot deserialize cyclic reference')
+            active.add(key)
+            stack.append((node, True))
+            for child in self._children(node):
+                if isinstance(child, (dict, list)):
+                    stack.append((child, False))
+
+        return self.resolved[id(data)]
+
+
+def serialize_graph(obj, **kwargs):
+    '''Like serialize(), but without recursion, and with each object that
+    is referenced more than once serialized only once.
+
+    Later references to such an object are serialized as {___ref: n},
+    where n is the ___id of its serialization.
+    '''
+    prev = _GRAPH.serializer
+    _GRAPH.serializer = _GraphSerializer()
+    try:
+        return _GRAPH.serializer.run(obj, kwargs)
+    finally:
+        _GRAPH.serializer = prev
+
+def deserialize_graph(obj, **kwargs):
+    '''Deserializes the output of serialize_graph(), without recursion.
+
+    Objects that were shared when serialized are shared when deserialized.
+    Cyclic references cannot be deserialized, as objects are constructed
+    from their (already deserialized) attributes.
+    '''
+    if not isinstance(obj, (dict, list)):
+        return deserialize(obj, **kwargs)
+
+    prev = _GRAPH.deserializer
+    _GRAPH.deserializer = _GraphDeserializer()
+    try:
+        return _GRAPH.deserializer.run(obj, kwargs)
+    finally:
+        _GRAPH.deserializer = prev
+
+#-------------------------------------------------------------------------------
+# Hashable conversion
+
+# Stands in for a value that refers back to one of its containers
+HASHABLE_CYCLE = '___cycle'
+
+
+class _HashableContext(threading.local):
+    '''The state of the outermost hashable() call in progress.
+
+    Converted values are memoized by id, so that shared values are
+    converted only once.  A value that is already being converted
+    further up is replaced by (HASHABLE_CYCLE, n), where n is the number
+    of levels up at which it occurs.  Values that contain such a marker
+    pointing above themselves are not memoized, since the marker depends
+    on the path by which they were reached.
+    '''
+    memo = None  # id(obj): (obj, hashable value)
+    depth = None # id(obj): depth, for the values being converted
+    low = None   # Lowest depth referred to by a cycle marker
+
+
+_HASHABLE = _HashableContext()
+
+
+def _hashable_memo(obj, kwargs):
+    ctx = _HASHABLE
+    key = id(obj)
+    if key in ctx.memo:
+        return ctx.memo[key][1]
+
+    level = len(ctx.depth)
+    if key in ctx.depth:
+        target = ctx.depth[key]
+        ctx.low = min(ctx.low, target)
+        return (HASHABLE_CYCLE, level - target)
+
+    outer_low = ctx.low
+    ctx.low = level
+    ctx.depth[key] = level
+    try:
+        ret = Type.dispatch(obj).hashable(**kwargs)
+    finally:
+        del ctx.depth[key]
+
+    if ctx.low >= level:
+        ctx.memo[key] = (obj, ret)
+    ctx.low = min(outer_low, ctx.low)
+    return ret
+
 #-------------------------------------------------------------------------------
 # __all__
 
-__all__ = ('TYPE_REGISTRY', 'SER_KEYS', 'Type', 'TypeType',
-           'deserialize', 'enumerate', 'estr', 'find_ne', 'generate', 'attrs',
-           'hashable', 'rstr', 'serialize', 'visit', 'safe_sorted', 'pairs',
-           'enumeration_value', 'primitive_form', 'collect')
+__all__ = ('TYPE_REGISTRY', 'DispatchCache', 'DISPATCH_CACHE',
+           'ClassResolver', 'CLASS_RESOLVER', 'SER_KEYS', 'SER_IDEMPOTENT',
+           'Type', 'TypeType', 'deserialize', 'enumerate', 'estr', 'find_ne',
+           'generate', 'attrs', 'hashable', 'rstr', 'serialize', 'visit',
+           'safe_sorted', 'pairs', 'enumeration_value', 'primitive_form',
+           'collect', 'serialize_graph', 'deserialize_graph',
+           'HASHABLE_CYCLE')
 
 #-------------------------------------------------------------------------------
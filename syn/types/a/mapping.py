@@ -2,12 +2,14 @@ import collections
 from syn.base_utils import rand_dict, get_fullname, tuple_prepend, \
     get_typename, escape_for_eval
 from .base import Type, serialize, hashable, rstr, estr, SER_KEYS, \
-    deserialize, safe_sorted, primitive_form, collect
+    deserialize, primitive_form, collect
 from .numeric import Int
 from .sequence import list_enumval
 from .set import set_enumval
-from .ne import KeyDifferences, DiffersAtKey
+from .ne import KeyDifferences, DiffersAtKey, mapping_keys, OrderCursor, \
+    WALK_MAX_BUFFER
 from itertools import islice
+from syn.five import xrange
 
 #-------------------------------------------------------------------------------
 # Utilities
@@ -18,6 +20,27 @@ def dict_enumval(x, **kwargs):
     N = min(len(keys), len(values))
     return dict(zip(keys[:N], values[:N]))
 
+
+class ChunkComparison(object):
+    '''Compares the values of A and B at each key of a chunk, returning
+    (key, key in B) for the first key that B lacks or whose values
+    differ, or None.  Picklable (if A, B and func are), for use with
+    process pools.
+    '''
+    def __init__(self, A, B, func):
+        self.A = A
+        self.B = B
+        self.func = func
+
+    def __call__(self, keys):
+        A, B, func = self.A, self.B, self.func
+        for key in keys:
+            if key not in B:
+                return (key, False)
+            if not func(A[key], B[key]):
+                return (key, True)
+
+
 #-------------------------------------------------------------------------------
 # Mapping
 
@@ -58,14 +81,32 @@ class Mapping(Type):
         ret = '{}({})'.format(get_typename(self.obj), ret)
         return escape_for_eval(ret)
 
-    def _find_ne(self, other, func, **kwargs):
-        for key, value in self.obj.items():
-            if key not in other:
-                return KeyDifferences(self.obj, other)
-            oval = other[key]
-            if not func(value, oval):
-                return DiffersAtKey(self.obj, other, key)
-        return KeyDifferences(self.obj, other)
+    def _find_ne(self, other, func, pool=None, chunksize=10000, **kwargs):
+        '''If pool is given, values are compared in chunks of chunksize keys
+        via pool.map (e.g. of a multiprocessing.pool.ThreadPool).
+        '''
+        obj = self.obj
+        def key_differences():
+            diffs = mapping_keys(obj) ^ mapping_keys(other)
+            return KeyDifferences(obj, other, diffs)
+
+        if pool is not None and len(obj) > chunksize:
+            keys = list(obj)
+            chunks = [keys[k:k + chunksize]
+                      for k in xrange(0, len(keys), chunksize)]
+            for res in pool.map(ChunkComparison(obj, other, func), chunks):
+                if res is not None:
+                    key, present = res
+                    if present:
+                        return DiffersAtKey(obj, other, key)
+                    return key_differences()
+        else:
+            for key, value in obj.items():
+                if key not in other:
+                    return key_differences()
+                if not func(value, other[key]):
+                    return DiffersAtKey(obj, other, key)
+        return key_differences()
 
     def _hashable(self, **kwargs):
         tup = tuple((hashable(key, **kwargs),
@@ -86,8 +127,11 @@ class Mapping(Type):
 
     def _visit(self, k, **kwargs):
         if not self.visit_buffer:
-            self.visit_buffer = safe_sorted(list(self.obj.items()))
-        return self.visit_buffer[k]
+            self.visit_buffer = OrderCursor(self.obj, kwargs.get('index'),
+                                            kwargs.get('max_buffer',
+                                                       WALK_MAX_BUFFER))
+        key = self.visit_buffer[k]
+        return key, self.obj[key]
 
     def _visit_len(self, **kwargs):
         return len(self.obj)
@@ -1,9 +1,12 @@
+import six
 import collections
 import operator as op
 from functools import partial
+from itertools import chain, islice
+from difflib import SequenceMatcher
 from syn.five import unicode, xrange, izip, STR, NUM
-from syn.base_utils import REPL, repl_command, DefaultList, sgn, AttrDict, \
-    implies, feq, cfeq, tuple_append
+from syn.base_utils import REPL, repl_command, DefaultList, sgn, \
+    implies, feq, cfeq, tuple_append, is_hashable
 from syn.base_utils.float import DEFAULT_TOLERANCE
 from syn.base_utils.rand import PRIMITIVE_TYPES
 
@@ -14,6 +17,8 @@ CONTAINERS = (collections.Mapping, collections.Sequence, set, frozenset)
 
 
 class NEType(object):
+    path = () # Location of A and B, when yielded by diff()
+
     def __init__(self, A, B):
         self.A = A
         self.B = B
@@ -55,23 +60,28 @@ class NotEqual(NEType):
 
 
 class DiffersAtIndex(NEType):
-    def __init__(self, A, B, index):
+    '''A[index] != B[index_b], where index_b defaults to index.'''
+    def __init__(self, A, B, index, index_b=None):
         super(DiffersAtIndex, self).__init__(A, B)
         self.index = index
+        self.index_b = index if index_b is None else index_b
 
     def __eq__(self, other):
         if not super(DiffersAtIndex, self).__eq__(other):
             return False
-        return self.index == other.index
+        return self.index == other.index and self.index_b == other.index_b
 
     def explorer(self):
         xA = ValueExplorer(self.A, index=self.index)
-        xB = ValueExplorer(self.B, index=self.index)
+        xB = ValueExplorer(self.B, index=self.index_b)
         return DiffExplorer(xA, xB)
 
     def message(self):
         iA = self.A[self.index]
-        iB = self.B[self.index]
+        iB = self.B[self.index_b]
+        if self.index_b != self.index:
+            return ('Sequences differ at indices {}, {}: {} != {}'
+                    .format(self.index, self.index_b, iA, iB))
         return ('Sequences differ at index {}: {} != {}'
                 .format(self.index, iA, iB))
 
@@ -120,8 +130,8 @@ class DiffersAtAttribute(NEType):
         return DiffExplorer(xA, xB)
 
     def message(self):
-        iA = getattr(self.A, self.attr)
-        iB = getattr(self.B, self.attr)
+        iA = getattr(self.A, self.attr, '<undefined>')
+        iB = getattr(self.B, self.attr, '<undefined>')
         return ('Objects differ at attribute "{}": {} != {}'
                 .format(self.attr, iA, iB))
 
@@ -146,9 +156,14 @@ class DifferentTypes(NEType):
 
 
 class SetDifferences(NEType):
-    def __init__(self, A, B):
+    '''The items in only one of the sets A and B are diffs, which is
+    computed if not given.
+    '''
+    def __init__(self, A, B, diffs=None):
         super(SetDifferences, self).__init__(A, B)
-        self.diffs = A.difference(B).union(B.difference(A))
+        if diffs is None:
+            diffs = A.symmetric_difference(B)
+        self.diffs = diffs
 
     def message(self):
         return 'Exclusive items: {}'.format(self.diffs)
@@ -157,17 +172,59 @@ class SetDifferences(NEType):
 #-----------------------------------------------------------
 
 
+def mapping_keys(obj):
+    '''Returns a set-like view of the keys of mapping obj.'''
+    if isinstance(obj, dict):
+        return six.viewkeys(obj)
+    return collections.KeysView(obj)
+
+
 class KeyDifferences(NEType):
-    def __init__(self, A, B):
+    '''The keys in only one of the mappings A and B are diffs, which is
+    computed if not given.
+    '''
+    def __init__(self, A, B, diffs=None):
         super(KeyDifferences, self).__init__(A, B)
-        a = set(self.A.keys())
-        b = set(self.B.keys())
-        self.diffs = a.difference(b).union(b.difference(a))
+        if diffs is None:
+            diffs = mapping_keys(A) ^ mapping_keys(B)
+        self.diffs = diffs
+
+    @property
+    def only_a(self):
+        return set(key for key in self.diffs if key in self.A)
+
+    @property
+    def only_b(self):
+        return set(key for key in self.diffs if key in self.B)
 
     def message(self):
         return 'Exclusive keys: {}'.format(self.diffs)
 
 
+#-----------------------------------------------------------
+
+
+class ItemDifferences(NEType):
+    '''The items of sequence A at indices_a have no counterpart in B, and
+    vice versa.
+    '''
+    def __init__(self, A, B, indices_a, indices_b):
+        super(ItemDifferences, self).__init__(A, B)
+        self.indices_a = tuple(indices_a)
+        self.indices_b = tuple(indices_b)
+
+    def __eq__(self, other):
+        if not super(ItemDifferences, self).__eq__(other):
+            return False
+        return (self.indices_a == other.indices_a and
+                self.indices_b == other.indices_b)
+
+    def message(self):
+        iA = [self.A[k] for k in self.indices_a]
+        iB = [self.B[k] for k in self.indices_b]
+        return 'Exclusive items: {} != {}'.format(iA, iB)
+
+
 #-------------------------------------------------------------------------------
 # ExplorationError
 
@@ -305,22 +362,14 @@ class ValueExplorer(REPL):
             self._prime()
 
         try:
-            index, value = next(self.iter)
+            index, item = next(self.iter)
             self.index = index
 
+            key, attr, self.current_value = self._split_item(self.value, item)
             if isinstance(self.value, collections.Mapping):
-                self.key = value[0]
-                self.current_value = value[1]
-                return
-
-            if isinstance(value, tuple):
-                if len(value) == 2:
-                    if isinstance(value[0], STR):
-                        self.attr = value[0]
-                        self.current_value = value[1]
-                        return
-
-            self.current_value = value
+                self.key = key
+            elif attr is not None:
+                self.attr = attr
 
         except StopIteration:
             self.at_end = True
@@ -341,40 +390,60 @@ class ValueExplorer(REPL):
                          self.initial_key, self.initial_attr, self.prompt, 
                          self.initial_step_value)
 
-    def depth_first(self, leaves_only=False):
-        vars = AttrDict(going_up=False,
-                        going_forward=False)
-        def step():
-            try:
-                self.step()
-            except ExplorationError:
-                if self.stack_index > 0:
-                    self.up()
-                    vars.going_up = True
+    @staticmethod
+    def _split_item(value, item):
+        '''Returns (key, attr, current_value) for an item yielded by
+        visit(value).
+        '''
+        if isinstance(value, collections.Mapping):
+            return item[0], None, item[1]
+        if isinstance(item, tuple) and len(item) == 2:
+            if isinstance(item[0], STR):
+                return None, item[0], item[1]
+        return None, None, item
+
+    def _remaining(self, value, iter_):
+        return ((None, self._split_item(value, item)[2]) 
+                for index, item in iter_)
 
-        if isinstance(self.value, CONTAINERS) and len(self.value) == 0:
-            yield self.value
+    def depth_first(self, leaves_only=False):
+        '''Yields the current value and every value nested within it,
+        starting from the current position, followed by the values that
+        follow it at each level up the stack.  Uses walk()'s iterative
+        traversal, so deep values do not exhaust the stack.
+        '''
+        from .base import visit
 
-        while True:
-            if self.at_end and self.stack_index == 0:
-                break
+        def children(value, path):
+            if is_visit_primitive(value):
+                return None
+            return self._remaining(value, visit(value, enumerate=True))
 
-            if not vars.going_up and not vars.going_forward:
-                if implies(leaves_only, self.at_bottom_level):
-                    yield self.value
+        ancestors = [frame['value'] for frame in self.stack] + [self.value]
+        walk_ = partial(_walk, children=children, leaves_only=leaves_only)
 
-            if vars.going_up:
-                vars.going_up = False
-                vars.going_forward = True
-                step()
+        if isinstance(self.value, CONTAINERS) and len(self.value) == 0:
+            yield self.value
 
-            elif not self.at_bottom_level:
-                vars.going_forward = False
-                self.down()
+        elif not self.at_end:
+            if implies(leaves_only, self.at_bottom_level):
+                yield self.value
+            if not self.at_bottom_level:
+                items = chain([(None, self.current_value)],
+                              self._remaining(self.value, self.iter))
+                for path, value in walk_(items, ancestors=ancestors):
+                    yield value
+
+        for frame in reversed(self.stack):
+            ancestors.pop()
+            items = self._remaining(frame['value'], frame['iter'])
+            for path, value in walk_(items, ancestors=ancestors):
+                yield value
+
+        while self.stack_index > 0:
+            self.up()
+        self.at_end = True
 
-            elif not self.at_end:
-                step()
-            
     @repl_command('c', 'display current_value')
     def command_display_current_value(self):
         print(self.current_value)
@@ -487,6 +556,42 @@ class DiffExplorer(REPL):
             self.up()
 
 
+#-------------------------------------------------------------------------------
+# OrderIndex
+
+
+class OrderIndex(object):
+    '''The order in which walk() visits the keys of mappings and the
+    items of sets, by container identity.
+
+    Building one ahead of time lets the orders of large containers be
+    reused across walks, instead of being sorted on each.
+    '''
+    def __init__(self, *objs):
+        self.orders = {}
+        for obj in objs:
+            self.add(obj)
+
+    def __contains__(self, obj):
+        return self.get(obj) is not None
+
+    def __len__(self):
+        return len(self.orders)
+
+    def add(self, obj, keys=None):
+        '''Records the order of obj, which is sorted if keys is not given.'''
+        if keys is None:
+            keys = sorted_order(obj)
+        self.orders[id(obj)] = (obj, keys)
+        return keys
+
+    def get(self, obj):
+        '''Returns the recorded order of obj, or None.'''
+        entry = self.orders.get(id(obj))
+        if entry is not None and entry[0] is obj:
+            return entry[1]
+
+
 #-------------------------------------------------------------------------------
 # Utilities
 
@@ -513,6 +618,360 @@ def deep_feq(A, B, tol=DEFAULT_TOLERANCE, relative=True):
     func = partial(feq_comp, tol=tol, relative=relative)
     return deep_comp(A, B, func)
 
+def _located(ne, path):
+    ne.path = path
+    return ne
+
+def _is_diff_leaf(obj):
+    return (isinstance(obj, tuple(PRIMITIVE_TYPES)) or isinstance(obj, STR)
+            or isinstance(obj, bytes))
+
+class _AlignmentKeys(object):
+    '''Computes the keys by which diff() aligns sequence items.
+
+    Equal structures get the same key.  The key of a container is an
+    object interned by the keys of its parts, so keys are flat, and are
+    computed without recursion and only once per object.
+    '''
+    def __init__(self):
+        self.interned = {}
+        self.memo = {}
+
+    def parts(self, obj):
+        from .base import attrs
+
+        if _is_diff_leaf(obj):
+            return None
+        if isinstance(obj, (list, tuple)):
+            return None, list(obj)
+        if isinstance(obj, (set, frozenset)):
+            return None, ()
+
+        names = None
+        if not isinstance(obj, dict):
+            names = attrs(obj, exclude=['eq_exclude'])
+        if names:
+            names = sorted(names)
+            return names, [getattr(obj, attr) for attr in names]
+        if isinstance(obj, collections.Mapping):
+            keys = list(obj)
+            return keys, [obj[key] for key in keys]
+        if isinstance(obj, collections.Sequence):
+            return None, list(obj)
+        return None
+
+    def leaf(self, obj):
+        from .base import hashable
+        if is_hashable(obj):
+            return obj
+        try:
+            return hashable(obj)
+        except Exception:
+            return ('id', id(obj))
+
+    def __call__(self, obj):
+        memo = self.memo
+        if id(obj) in memo:
+            return memo[id(obj)][1]
+
+        stack = [(obj, None)]
+        while stack:
+            x, parts = stack.pop()
+            if parts is None:
+                if id(x) in memo:
+                    continue
+                parts = self.parts(x)
+                if parts is None:
+                    memo[id(x)] = (x, self.leaf(x))
+                    continue
+                # Marks x as in progress, which also breaks cycles
+                memo[id(x)] = (x, ('cycle', id(x)))
+                stack.append((x, parts))
+                stack.extend((item, None) for item in reversed(parts[1])
+                             if id(item) not in memo)
+                continue
+
+            labels, items = parts
+            keys = tuple(memo[id(item)][1] for item in items)
+            if labels is not None:
+                keys = frozenset(zip(labels, keys))
+            if isinstance(x, (set, frozenset)):
+                keys = frozenset(x)
+            spec = (type(x), keys)
+            memo[id(x)] = (x, self.interned.setdefault(spec, object()))
+
+        return memo[id(obj)][1]
+
+def _diff_children(a, b, path, keys):
+    '''Returns a list of (a, b, path, (NEType, args)) for the corresponding
+    parts of a and b (of the same type), and a list of NETypes for the
+    parts that do not correspond.  Objects with attributes are compared
+    by attribute, even if they are also containers.  Returns (None, None)
+    if a and b have no parts.  Sequence items are aligned by keys, an
+    _AlignmentKeys.
+    '''
+    from .base import attrs, safe_sorted
+
+    names_a = None
+    if not isinstance(a, (dict, list, tuple, set, frozenset)):
+        names_a = attrs(a, exclude=['eq_exclude'])
+
+    children = []
+    diffs = []
+    if names_a:
+        names_b = set(attrs(b, exclude=['eq_exclude']))
+        for attr in names_a:
+            if attr in names_b:
+                children.append((getattr(a, attr), getattr(b, attr),
+                                 path + (attr,),
+                                 (DiffersAtAttribute, (a, b, attr))))
+            else:
+                diffs.append(DiffersAtAttribute(a, b, attr))
+        for attr in sorted(names_b.difference(names_a)):
+            diffs.append(DiffersAtAttribute(a, b, attr))
+
+    elif isinstance(a, collections.Mapping):
+        keys_a = mapping_keys(a)
+        keys_b = mapping_keys(b)
+        if len(a) == len(b) and keys_a == keys_b:
+            common = list(keys_a)
+        else:
+            common = [key for key in keys_a if key in b]
+            diffs.append(KeyDifferences(a, b, keys_a ^ keys_b))
+        for key in safe_sorted(common):
+            children.append((a[key], b[key], path + (key,),
+                             (DiffersAtKey, (a, b, key))))
+
+    elif isinstance(a, (set, frozenset)):
+        if a != b:
+            diffs.append(SetDifferences(a, b))
+
+    elif isinstance(a, collections.Sequence):
+        ha = [keys(item) for item in a]
+        hb = [keys(item) for item in b]
+        if ha == hb:
+            return children, diffs
+
+        matcher = SequenceMatcher(None, ha, hb, autojunk=False)
+        blocks = [(i1, i2, j1, j2)
+                  for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+                  if tag != 'equal']
+
+        # SequenceMatcher only aligns items in order, so items that were
+        # moved are paired by key first
+        free = {}
+        for i1, i2, j1, j2 in reversed(blocks):
+            for j in reversed(xrange(j1, j2)):
+                free.setdefault(hb[j], []).append(j)
+        pairs = []
+        for i1, i2, j1, j2 in blocks:
+            for i in xrange(i1, i2):
+                js = free.get(ha[i])
+                if js:
+                    pairs.append((i, js.pop()))
+        paired_a = set(i for i, j in pairs)
+        paired_b = set(j for i, j in pairs)
+
+        # The rest of each block is paired by position
+        only_a = []
+        only_b = []
+        for i1, i2, j1, j2 in blocks:
+            rest_a = [i for i in xrange(i1, i2) if i not in paired_a]
+            rest_b = [j for j in xrange(j1, j2) if j not in paired_b]
+            n = min(len(rest_a), len(rest_b))
+            pairs.extend(zip(rest_a[:n], rest_b[:n]))
+            only_a.extend(rest_a[n:])
+            only_b.extend(rest_b[n:])
+
+        for i, j in sorted(pairs):
+            children.append((a[i], b[j], path + (i,),
+                             (DiffersAtIndex, (a, b, i, j))))
+        if only_a or only_b:
+            diffs.append(ItemDifferences(a, b, only_a, only_b))
+
+    else:
+        return None, None
+
+    return children, diffs
+
+def diff(A, B, func=op.eq):
+    '''Yields an NEType for every difference between A and B.
+
+    A and B are walked once, depth-first and without recursion.
+    Mappings, sequences, and objects with attributes are descended into,
+    and func is called on each pair of corresponding leaf values (e.g.
+    feq_comp, to compare numbers with a tolerance).  The path attribute
+    of each result holds the keys, indices and attribute names that lead
+    to the differing values.
+
+    Sequence items are aligned by their structure, so that an inserted or
+    removed item is reported once (as ItemDifferences), rather than as a
+    difference at every later index.
+    '''
+    keys = _AlignmentKeys()
+    seen = set()
+    stack = [(A, B, (), (NotEqual, (A, B)))]
+    while stack:
+        a, b, path, (ne, args) = stack.pop()
+        if a is b:
+            continue
+
+        if _is_diff_leaf(a) or _is_diff_leaf(b):
+            if not func(a, b):
+                yield _located(ne(*args), path)
+            continue
+
+        if type(a) is not type(b):
+            if not func(a, b):
+                yield _located(DifferentTypes(a, b), path)
+            continue
+
+        children, diffs = _diff_children(a, b, path, keys)
+        if children is None:
+            if not func(a, b):
+                yield _located(ne(*args), path)
+            continue
+
+        # Compare each pair of containers once, which also breaks cycles
+        key = (id(a), id(b))
+        if key in seen:
+            continue
+        seen.add(key)
+
+        for item in diffs:
+            yield _located(item, path)
+        stack.extend(reversed(children))
+
+# Containers with more items than this are walked in iteration order
+WALK_MAX_BUFFER = 10000
+
+def sorted_order(obj):
+    '''Returns the keys of mapping obj in the order of its sorted items, or
+    the sorted items of any other container.
+    '''
+    from .base import safe_sorted
+    if isinstance(obj, collections.Mapping):
+        return [item[0] for item in safe_sorted(list(obj.items()))]
+    return safe_sorted(list(obj))
+
+def walk_order(obj, index=None, max_buffer=WALK_MAX_BUFFER):
+    '''Returns the keys of mapping obj, or the items of set obj, in the
+    order in which they are walked and visited.
+
+    The order is taken from index (an OrderIndex) if it has one for obj.
+    Otherwise it is sorted_order(obj), unless obj has more than
+    max_buffer items, in which case obj itself is returned, to be
+    iterated in place.
+    '''
+    if index is not None:
+        keys = index.get(obj)
+        if keys is not None:
+            return keys
+    if max_buffer is not None and len(obj) > max_buffer:
+        return obj
+    return sorted_order(obj)
+
+class OrderCursor(object):
+    '''Positional access to walk_order(obj, index, max_buffer).
+
+    If obj is too large to be sorted, it is iterated in place, and
+    restarted only if an earlier position is requested, rather than
+    being copied into a list.
+    '''
+    def __init__(self, obj, index=None, max_buffer=WALK_MAX_BUFFER):
+        self.obj = obj
+        self.order = walk_order(obj, index, max_buffer)
+        self.iter = None
+        self.pos = 0
+
+    def __getitem__(self, k):
+        if self.order is not self.obj:
+            return self.order[k]
+
+        if k < 0:
+            k += len(self.obj)
+        if not 0 <= k < len(self.obj):
+            raise IndexError(k)
+        if self.iter is None or k < self.pos:
+            self.iter = iter(self.obj)
+            self.pos = 0
+        ret = next(islice(self.iter, k - self.pos, None))
+        self.pos = k + 1
+        return ret
+
+def _walk_children(obj, path, index, max_buffer):
+    '''Returns an iterator over (path, value) for the parts of obj, or
+    None if obj has no parts.
+    '''
+    from .base import attrs
+
+    if _is_diff_leaf(obj):
+        return None
+    if isinstance(obj, (list, tuple)):
+        return ((path + (k,), item) for k, item in enumerate(obj))
+    if isinstance(obj, dict):
+        keys = walk_order(obj, index, max_buffer)
+        return ((path + (key,), obj[key]) for key in keys)
+    if isinstance(obj, (set, frozenset)):
+        items = walk_order(obj, index, max_buffer)
+        return ((path + (k,), item) for k, item in enumerate(items))
+
+    names = attrs(obj)
+    if names:
+        return ((path + (attr,), getattr(obj, attr)) for attr in names)
+    if isinstance(obj, collections.Mapping):
+        keys = walk_order(obj, index, max_buffer)
+        return ((path + (key,), obj[key]) for key in keys)
+    if isinstance(obj, collections.Sequence):
+        return ((path + (k,), item) for k, item in enumerate(obj))
+    return None
+
+def _walk(items, children, leaves_only=False, ancestors=()):
+    '''Yields (path, value) for each of items, an iterator over (path,
+    value), and for every value nested within them, depth-first and
+    without recursion.  children(value, path) returns an iterator over
+    (path, value) for the parts of value, or None if it has none.
+    Values in ancestors (and those being walked) are not descended into.
+    '''
+    stack = [(None, items)]
+    active = set(id(value) for value in ancestors)
+    while stack:
+        try:
+            path, value = next(stack[-1][1])
+        except StopIteration:
+            active.discard(stack.pop()[0])
+            continue
+
+        parts = None
+        if id(value) not in active:
+            parts = children(value, path)
+
+        if parts is None:
+            yield path, value
+            continue
+
+        if not leaves_only:
+            yield path, value
+        active.add(id(value))
+        stack.append((id(value), parts))
+
+def walk(obj, leaves_only=False, index=None, max_buffer=WALK_MAX_BUFFER):
+    '''Yields (path, value) for obj and every value nested within it,
+    depth-first and without recursion.
+
+    Sequences are walked in place, mappings in key order, sets in item
+    order, and other objects by attribute.  These orders are taken from
+    index (an OrderIndex) if it has them; otherwise containers are
+    sorted, unless they have more than max_buffer items (None for no
+    limit), in which case their iteration order is used.  Apart from
+    these orders, memory use is proportional to the depth of obj.
+    Strings are treated as leaves, as are containers that contain
+    themselves.
+    '''
+    def children(value, path):
+        return _walk_children(value, path, index, max_buffer)
+    return _walk(iter([((), obj)]), children, leaves_only)
+
 def is_visit_primitive(obj):
     '''Returns true if properly visiting the object returns only the object itself.'''
     from .base import visit
@@ -532,10 +991,12 @@ def is_visit_primitive(obj):
 # __all__
 
 __all__ = ('ValueExplorer', 'DiffExplorer', 'ExplorationError',
-           'deep_comp', 'feq_comp', 'deep_feq', 'is_visit_primitive',
+           'deep_comp', 'feq_comp', 'deep_feq', 'diff', 'walk', 'OrderIndex',
+           'walk_order', 'OrderCursor', 'WALK_MAX_BUFFER',
+           'is_visit_primitive',
            'NEType', 'NotEqual', 'DiffersAtIndex', 'DiffersAtKey',
            'DiffersAtAttribute',
            'DifferentLength', 'DifferentTypes', 'SetDifferences', 
-           'KeyDifferences')
+           'KeyDifferences', 'ItemDifferences')
 
 #-------------------------------------------------------------------------------
@@ -2,10 +2,10 @@ from itertools import islice
 from syn.base_utils import get_fullname, rand_set, rand_frozenset, \
     escape_for_eval, get_typename
 from .base import Type, hashable, serialize, SER_KEYS, rstr, estr, \
-    safe_sorted, primitive_form, collect
+    primitive_form, collect
 from syn.base_utils.rand import HASHABLE_TYPES
 from .sequence import list_enumval
-from .ne import SetDifferences
+from .ne import SetDifferences, OrderCursor, WALK_MAX_BUFFER
 
 #-------------------------------------------------------------------------------
 # Utilities
@@ -43,6 +43,9 @@ class Set(Type):
     def _find_ne(self, other, func, **kwargs):
         return SetDifferences(self.obj, other)
 
+    def _hashable(self, **kwargs):
+        return (get_fullname(self.obj), frozenset(self.obj))
+
     @classmethod
     def _generate(cls, **kwargs):
         return rand_set(**kwargs)
@@ -58,7 +61,9 @@ class Set(Type):
 
     def _visit(self, k, **kwargs):
         if not self.visit_buffer:
-            self.visit_buffer = safe_sorted(list(self.obj))
+            self.visit_buffer = OrderCursor(self.obj, kwargs.get('index'),
+                                            kwargs.get('max_buffer',
+                                                       WALK_MAX_BUFFER))
         return self.visit_buffer[k]
 
     def _visit_len(self, **kwargs):
@@ -1,10 +1,15 @@
+import os
+import sys
+import types
 import collections
 from nose.tools import assert_raises
 from syn.five import PY3
 from syn.types.a import Type, hashable, TYPE_REGISTRY, SER_KEYS, serialize, \
     deserialize, DifferentTypes, safe_sorted, estr, find_ne, \
     generate, DiffersAtAttribute, rstr, visit, deep_feq, attrs, \
-    NotEqual, pairs, enumeration_value, primitive_form, collect
+    NotEqual, pairs, enumeration_value, primitive_form, collect, \
+    DispatchCache, DISPATCH_CACHE, serialize_graph, deserialize_graph, \
+    ClassResolver, CLASS_RESOLVER, HASHABLE_CYCLE
 from syn.types.a import enumerate as enum
 from syn.base_utils import get_fullname, is_hashable, assert_inequivalent, \
     assert_equivalent, first, get_typename, ngzwarn, is_unique
@@ -51,6 +56,51 @@ def test_type():
 
     assert isinstance(find_ne(1, 1.2), DifferentTypes)
 
+#-------------------------------------------------------------------------------
+# Dispatch cache
+
+def test_dispatch_cache():
+    import gc
+    from syn.types.a import Int
+
+    class MyInt(int):
+        pass
+
+    class MyDict(collections.OrderedDict):
+        pass
+
+    assert Type.type_dispatch(MyInt) is Int
+    assert Type.type_dispatch(MyDict) is TYPE_REGISTRY[dict]
+    assert MyInt not in TYPE_REGISTRY
+    assert MyInt in DISPATCH_CACHE.cache
+
+    hits = DISPATCH_CACHE.hits
+    assert Type.type_dispatch(MyInt) is Int
+    assert DISPATCH_CACHE.hits == hits + 1
+
+    # Registering a new Type subclass invalidates the cache
+    class MyIntType(Type):
+        type = MyInt
+
+    assert MyInt not in DISPATCH_CACHE.cache
+    assert Type.type_dispatch(MyInt) is MyIntType
+    del TYPE_REGISTRY[MyInt]
+
+    # Dynamically created classes are not retained
+    n = len(DISPATCH_CACHE)
+    Type.type_dispatch(type('Temp', (MyDict,), {}))
+    assert len(DISPATCH_CACHE) == n + 1
+    gc.collect()
+    assert len(DISPATCH_CACHE) == n
+
+    cache = DispatchCache(maxsize=2)
+    assert cache.resolve(MyInt) is Int
+    assert cache.resolve(MyDict) is TYPE_REGISTRY[dict]
+    assert cache.resolve(MyInt) is Int
+    assert cache.resolve(bool) is TYPE_REGISTRY[bool]
+    assert cache.stats() == dict(hits=1, misses=3, invalidations=0, size=1,
+                                 maxsize=2)
+
 #-------------------------------------------------------------------------------
 # Test object with defined special methods
 
@@ -424,6 +474,159 @@ def test_misc_serialization():
     assert n.a == 1
     assert not hasattr(sval, 'a')
 
+#-------------------------------------------------------------------------------
+# Class resolution
+
+def test_class_resolver():
+    k = KWObject(a=[1, u'b'], b=dict(c=(2.3, None), d={int, type(None)}))
+    ser = serialize(k)
+    assert deserialize(ser) == k
+    assert CLASS_RESOLVER.cache[(__name__, 'KWObject')] is KWObject
+
+    r = ClassResolver(allow_list=True)
+    assert_raises(TypeError, deserialize, serialize(k), resolver=r)
+    assert_raises(TypeError, deserialize_graph, serialize(k), resolver=r)
+    assert_raises(TypeError, r.resolve, 'os', 'system')
+
+    r.register(KWObject)
+    assert deserialize(serialize(k), resolver=r) == k
+    assert deserialize_graph(serialize_graph(k), resolver=r) == k
+    assert r.cache == {}
+
+    r.register(Foo2, mod='foo', name='Bar')
+    assert r.resolve('foo', 'Bar') is Foo2
+    r.clear()
+    assert r.resolve('foo', 'Bar') is Foo2
+
+    # Changing the allow-list clears the cache
+    r.allow_list = False
+    assert r.resolve('os', 'getcwd') is os.getcwd
+    assert r.cache
+    r.allow_list = True
+    assert r.cache == {}
+    assert_raises(TypeError, r.resolve, 'os', 'getcwd')
+    r.allow_list = False
+    r.resolve('os', 'getcwd')
+    r.register(Foo)
+    assert r.cache == {}
+
+    # Objects rebound in their module (e.g. by a reload) are resolved again
+    mod = types.ModuleType('syn_test_resolve')
+    mod.A = Foo
+    sys.modules[mod.__name__] = mod
+    try:
+        assert r.resolve(mod.__name__, 'A') is Foo
+        mod.A = Foo2
+        assert r.resolve(mod.__name__, 'A') is Foo2
+    finally:
+        del sys.modules[mod.__name__]
+
+    # The cache is bounded
+    r = ClassResolver(maxsize=2)
+    for name in ('getcwd', 'listdir', 'stat'):
+        r.resolve('os', name)
+    assert len(r.cache) <= 2
+    assert r.resolve('os', 'getcwd') is os.getcwd
+
+#-------------------------------------------------------------------------------
+# Hashable conversion
+
+class Counted(object):
+    __hash__ = None
+    count = 0
+
+    def _hashable(self, **kwargs):
+        Counted.count += 1
+        return ('Counted',)
+
+class Plain(object):
+    __hash__ = None
+
+    def __init__(self, **kwargs):
+        for attr, val in kwargs.items():
+            setattr(self, attr, val)
+
+def test_hashable_memo():
+    c = Counted()
+    x = [c, 2]
+    y = [x, x, dict(a=x, b=c)]
+    h = hashable(y)
+    assert is_hashable(h)
+    assert Counted.count == 1
+    assert h[1] == h[2] == hashable(x)
+    assert Counted.count == 2
+
+    # Generic objects are converted without serializing them
+    p = Plain(a=1, b=[2, 3])
+    assert hashable(p) == (get_fullname(p), ('a', 1), ('b', hashable([2, 3])))
+    assert hashable(p) == hashable(Plain(b=[2, 3], a=1))
+    assert hashable(p) != hashable(Plain(a=1, b=[2]))
+
+    assert hashable({1, 2}) == hashable({2, 1})
+    assert hashable({1, 2}) != hashable({1})
+
+def test_hashable_cycles():
+    z = [1]
+    z.append(z)
+    assert hashable(z) == (get_fullname(z), 1, (HASHABLE_CYCLE, 1))
+
+    z2 = [1]
+    z2.append(z2)
+    assert hashable(z2) == hashable(z)
+
+    d = dict(a=1)
+    d['b'] = [d]
+    h = hashable(d)
+    assert is_hashable(h)
+    assert ('b', (get_fullname([]), (HASHABLE_CYCLE, 2))) in h
+
+    p = Plain(a=1)
+    p.b = [p, z]
+    assert hashable(p) == (get_fullname(p), ('a', 1),
+                           ('b', (get_fullname([]), (HASHABLE_CYCLE, 2),
+                                  hashable(z))))
+
+    # A shared value is memoized only if its markers point within itself
+    q = [z, [z]]
+    assert hashable(q) == (get_fullname(q), hashable(z),
+                           (get_fullname(q), hashable(z)))
+    w = [1]
+    v = [w, [w]]
+    w.append(v)
+    h = hashable(v)
+    assert h[1] == (get_fullname(w), 1, (HASHABLE_CYCLE, 2))
+    assert h[2][1] == (get_fullname(w), 1, (HASHABLE_CYCLE, 3))
+
+#-------------------------------------------------------------------------------
+# Graph serialization
+
+def test_serialize_graph():
+    # Without shared values, the output is that of serialize()
+    for obj in [1, 'abc', [1, 2.3, u'abc'], dict(a=(1, 2), b={3}), int,
+                KWObject(a=[1], b=dict(c=2)), Foo2(1, b=2.3, c='abc')]:
+        assert serialize_graph(obj) == serialize(obj)
+        assert deserialize_graph(serialize_graph(obj)) == obj
+
+    x = [1, 2]
+    y = dict(a=x, b=KWObject(a=x, b=(x, 'abc')))
+    ser = serialize_graph(y)
+    assert ser['a'][SER_KEYS.id] == 0
+    assert ser['b'][SER_KEYS.kwargs]['a'] == {SER_KEYS.ref: 0}
+
+    y2 = deserialize_graph(ser)
+    assert_equivalent(y2, y)
+    assert y2['b'].a is y2['a']
+    assert y2['b'].b[0] is y2['a']
+    y3 = deserialize(serialize(y))
+    assert y3['b'].a is not y3['a']
+
+    # Cycles are serialized, but cannot be deserialized
+    z = [1]
+    z.append(z)
+    ser = serialize_graph(z)
+    assert ser[SER_KEYS.args] == [[1, {SER_KEYS.ref: 0}]]
+    assert_raises(ValueError, deserialize_graph, ser)
+
 #-------------------------------------------------------------------------------
 # misc
 
@@ -1,5 +1,6 @@
 from six import PY2
 import collections
+from multiprocessing.pool import ThreadPool
 from syn.five import xrange
 from syn.types.a import Type, Mapping, Dict, \
     hashable, serialize, deserialize, estr, rstr, visit, find_ne, \
@@ -62,6 +63,56 @@ def test_mapping():
     assert find_ne(d2, d1) == KeyDifferences(d2, d1)
     assert find_ne(d1, d3) == DiffersAtKey(d1, d3, 'b')
 
+    # The first key that is missing or differs is reported, as before
+    d6 = dict(a=2, b=2, c=3)
+    assert find_ne(d1, d6) == DiffersAtKey(d1, d6, 'a')
+    assert find_ne(d3, d2) == DiffersAtKey(d3, d2, 'b')
+
+    n = find_ne(dict(a=1, b=2), dict(b=2, c=3))
+    assert n.diffs == {'a', 'c'}
+    assert n.only_a == {'a'}
+    assert n.only_b == {'c'}
+
+    d4 = {k: k for k in range(100)}
+    d5 = dict(d4)
+    d5[57] = None
+    pool = ThreadPool(2)
+    try:
+        assert find_ne(d4, d5, pool=pool, chunksize=10) == \
+            DiffersAtKey(d4, d5, 57)
+        assert find_ne(d4, dict(d4), pool=pool, chunksize=10) is None
+        d5[None] = 1
+        assert find_ne(d4, d5, pool=pool, chunksize=10) == \
+            DiffersAtKey(d4, d5, 57)
+        d5[0] = None
+        assert find_ne(d4, d5, pool=pool, chunksize=10) == \
+            DiffersAtKey(d4, d5, 0)
+        del d5[3]
+        d5[-1] = 1
+        d5[0] = 0
+        assert find_ne(d4, d5, pool=pool, chunksize=10) == \
+            KeyDifferences(d4, d5)
+    finally:
+        pool.close()
+
+    # Comparison does not add missing keys to a defaultdict
+    dd1 = collections.defaultdict(list, dict(x=[1], y=[2]))
+    dd2 = collections.defaultdict(list, dict(y=[2], z=[3]))
+    assert isinstance(find_ne(dd1, dd2), KeyDifferences)
+    assert isinstance(find_ne(dd2, dd1), KeyDifferences)
+    assert dd1 == dict(x=[1], y=[2])
+    assert dd2 == dict(y=[2], z=[3])
+    dd3 = collections.defaultdict(int, {k: k for k in range(100)})
+    dd4 = collections.defaultdict(int, {k: k for k in range(1, 101)})
+    pool = ThreadPool(2)
+    try:
+        assert isinstance(find_ne(dd3, dd4, pool=pool, chunksize=10),
+                          KeyDifferences)
+    finally:
+        pool.close()
+    assert set(dd3) == set(range(100))
+    assert set(dd4) == set(range(1, 101))
+
     e1 = eval(estr(d1))
     assert_equivalent(e1, d1)
 
@@ -204,7 +204,26 @@ def test_valueexplorer():
     x = ValueExplorer([])
     assert list(x.depth_first()) == [[]]
 
-    
+    # Continues from the current position, then up the stack
+    l = [1, [2, [], 3], 4]
+    x = ValueExplorer(l)
+    assert list(x.depth_first()) == [l, 1, [2, [], 3], 2, [], 3, 4]
+    x.reset()
+    x.step()
+    x.down()
+    x.step()
+    assert list(x.depth_first()) == [[2, [], 3], [], 3, 4]
+    assert x.stack_index == 0 and x.at_end
+
+    # Cycles and deep nesting
+    l = [1]
+    l.append(l)
+    assert list(ValueExplorer(l).depth_first()) == [l, 1, l]
+    deep = []
+    for k in range(3000):
+        deep = [deep]
+    assert len(list(ValueExplorer(deep).depth_first())) == 3001
+
     class Foo(object):
         def __init__(self, a, b):
             self.a = a
@@ -389,6 +408,163 @@ def test_deep_feq():
     assert deep_feq([1], [1.01], tol=0.1)
     assert deep_feq([1j], [1.01j], tol=0.1)
 
+def test_diff():
+    from syn.types.a import diff, feq_comp, NotEqual, DiffersAtIndex, \
+        DiffersAtKey, DiffersAtAttribute, DifferentTypes, SetDifferences, \
+        KeyDifferences, ItemDifferences
+
+    class Foo(object):
+        def __init__(self, **kwargs):
+            for attr, val in kwargs.items():
+                setattr(self, attr, val)
+
+    assert list(diff(1, 1)) == []
+    assert list(diff(1, 2)) == [NotEqual(1, 2)]
+    assert list(diff([1, [2, 3]], [1, [2, 3]])) == []
+
+    A = dict(a=[1, 2, 3, 4], b=dict(x=1.0, y='s'), c={1, 2},
+             d=Foo(p=1, q=[1]), e=[[1], [2]])
+    B = dict(a=[1, 9, 2, 3, 4, 5], b=dict(x=1.01, z='s'), c={1, 3},
+             d=Foo(p=2, q=[2], r=3), e=[[1], (2,)])
+    diffs = list(diff(A, B))
+    assert [ne.path for ne in diffs] == [('a',), ('b',), ('b', 'x'), ('c',),
+                                         ('d',), ('d', 'p'), ('d', 'q', 0),
+                                         ('e', 1)]
+    assert diffs[0] == ItemDifferences(A['a'], B['a'], [], [1, 5])
+    assert str(diffs[0]) == 'Exclusive items: [] != [9, 5]'
+    assert diffs[1] == KeyDifferences(A['b'], B['b'])
+    assert diffs[2] == DiffersAtKey(A['b'], B['b'], 'x')
+    assert diffs[3] == SetDifferences(A['c'], B['c'])
+    assert diffs[4] == DiffersAtAttribute(A['d'], B['d'], 'r')
+    assert 'undefined' in str(diffs[4])
+    assert diffs[5] == DiffersAtAttribute(A['d'], B['d'], 'p')
+    assert diffs[6] == DiffersAtIndex(A['d'].q, B['d'].q, 0)
+    assert diffs[7] == DifferentTypes(A['e'][1], B['e'][1])
+
+    # Leaves are compared with func
+    tol = lambda a, b: feq_comp(a, b, tol=0.1)
+    assert [ne.path for ne in diff(A, B, tol)] == \
+        [('a',), ('b',), ('c',), ('d',), ('d', 'p'), ('d', 'q', 0), ('e', 1)]
+
+    # Aligned items that differ are reported with both indices
+    l1 = [0, 1, 2, [3, 4], 5]
+    l2 = [1, 2, [3, 5], 5]
+    diffs = list(diff(l1, l2))
+    assert diffs == [ItemDifferences(l1, l2, [0], []),
+                     DiffersAtIndex(l1[3], l2[2], 1)]
+    assert [ne.path for ne in diffs] == [(), (3, 1)]
+    ne = DiffersAtIndex(l1, l2, 3, 2)
+    assert str(ne) == 'Sequences differ at indices 3, 2: [3, 4] != [3, 5]'
+    assert ne != DiffersAtIndex(l1, l2, 3)
+
+    # Moved items are aligned as well
+    assert list(diff([1, 2, 3], [3, 1, 2])) == []
+    assert list(diff([[1], (2,), 'a'], ['a', (2,), [1]])) == []
+    l1 = [1, 2, 3, 6]
+    l2 = [3, 1, 2, 7]
+    diffs = list(diff(l1, l2))
+    assert diffs == [DiffersAtIndex(l1, l2, 3, 3)]
+    assert diffs[0].path == (3,)
+    l1 = [1, 2, 3, 6]
+    l2 = [3, 1, 2]
+    diffs = list(diff(l1, l2))
+    assert diffs == [ItemDifferences(l1, l2, [3], [])]
+    assert str(diffs[0]) == 'Exclusive items: [6] != []'
+
+    # Cycles are compared once
+    z = [1]
+    z.append(z)
+    w = [2]
+    w.append(w)
+    assert list(diff(z, w)) == [DiffersAtIndex(z, w, 0)]
+
+    # Deep structures do not exhaust the stack
+    d1 = d2 = None
+    for k in range(5000):
+        d1 = dict(k=k, next=d1)
+        d2 = dict(k=k if k else -1, next=d2)
+    diffs = list(diff(d1, d2))
+    assert len(diffs) == 1
+    assert diffs[0].path == ('next',) * 4999 + ('k',)
+
+    # Deeply nested sequences are aligned without recursion
+    s1 = s2 = 1
+    for k in range(3000):
+        s1 = [s1]
+        s2 = [s2]
+    s1 = [s1, 2]
+    s2 = [0, s2, 2]
+    diffs = list(diff(s1, s2))
+    assert diffs == [ItemDifferences(s1, s2, [], [0])]
+    assert diffs[0].path == ()
+
+def test_walk():
+    from syn.types.a import walk, OrderIndex
+
+    class Foo(object):
+        def __init__(self, a, b):
+            self.a = a
+            self.b = b
+
+    obj = dict(b=[1, u'xy', {3}], a=Foo(2.5, None))
+    assert list(walk(obj)) == [((), obj),
+                               (('a',), obj['a']),
+                               (('a', 'a'), 2.5),
+                               (('a', 'b'), None),
+                               (('b',), obj['b']),
+                               (('b', 0), 1),
+                               (('b', 1), u'xy'),
+                               (('b', 2), {3}),
+                               (('b', 2, 0), 3)]
+    assert [path for path, value in walk(obj, leaves_only=True)] == \
+        [('a', 'a'), ('a', 'b'), ('b', 0), ('b', 1), ('b', 2, 0)]
+    assert list(walk(5)) == [((), 5)]
+    assert list(walk([])) == [((), [])]
+
+    # Orders from the index, or iteration order past max_buffer
+    d = {k: k for k in range(20)}
+    index = OrderIndex(d)
+    assert d in index and {} not in index and len(index) == 1
+    index.add(d, list(range(19, -1, -1)))
+    assert [v for p, v in walk(d, True, index=index)] == list(range(19, -1, -1))
+    assert [v for p, v in walk(d, True, max_buffer=10)] == list(d)
+    assert [v for p, v in walk(d, True, max_buffer=20)] == list(range(20))
+
+    # Mappings and sets are visited in the same orders
+    from syn.types.a import visit, walk_order, WALK_MAX_BUFFER
+    assert [v for k, v in visit(d, index=index)] == list(range(19, -1, -1))
+    assert [v for k, v in visit(d, max_buffer=10)] == list(d)
+    assert list(visit(d)) == sorted(d.items())
+    s = set(range(20))
+    assert list(visit(s, max_buffer=10)) == list(s)
+    assert walk_order(s) == list(range(20))
+    big = dict.fromkeys(range(WALK_MAX_BUFFER + 1))
+    assert walk_order(big) is big
+    assert list(visit(s, 5, step=5, max_buffer=10)) == list(s)[5::5]
+    assert list(visit(d, -1, step=-7, max_buffer=10)) == \
+        [(k, d[k]) for k in list(d)[::-7]]
+
+    # Large containers are visited without copying them
+    from syn.types.a import OrderCursor
+    cur = OrderCursor(s, max_buffer=10)
+    assert cur.order is s
+    assert [cur[k] for k in (0, 1, 5, 2, -1)] == \
+        [list(s)[k] for k in (0, 1, 5, 2, -1)]
+    assert_raises(IndexError, cur.__getitem__, 20)
+    cur = OrderCursor(s, index=OrderIndex(s), max_buffer=10)
+    assert cur[3] == 3
+
+    # Cycles
+    l = [1]
+    l.append(l)
+    assert list(walk(l)) == [((), l), ((0,), 1), ((1,), l)]
+
+    # Deep nesting
+    deep = []
+    for k in range(5000):
+        deep = [deep]
+    assert len(list(walk(deep))) == 5001
+
 def test_is_visit_primitive():
     from syn.types.a import is_visit_primitive
 
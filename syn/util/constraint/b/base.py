@@ -67,7 +67,8 @@ class Constraint(Base):
                               init=lambda self: tuple()))
     _opts = dict(init_validate = True,
                  args = ('args',),
-                 make_hashable = True)
+                 make_hashable = True,
+                 cache_hash = True)
 
     def check(self, **kwargs):
         raise NotImplementedError